@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark the cgroup collector against a fake cgroupfs tree.
+
+Writes a cgroup v2 hierarchy with N container cgroups (split between a
+systemd slice and kubepods pods) to a temporary directory, advances their
+counters between ticks and times CgroupMonitor.sample(). Midway a
+container is added and one removed, so the output also shows that the
+hierarchy is only re-walked when it changes, and that the cgroup made to
+throttle and stall ranks first.
+
+Usage: python benchmarks/bench_cgroups.py [--cgroups 500] [--ticks 50]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.cgroups import CgroupMonitor
+
+PRESSURE = "some avg10={some:.2f} avg60=0.00 avg300=0.00 total=0\nfull avg10={full:.2f} avg60=0.00 avg300=0.00 total=0\n"
+
+
+class FakeCgroupfs:
+    """A cgroup2-shaped directory tree whose counters can be advanced"""
+
+    def __init__(self, root, seed=1):
+        self.root = root
+        self.rng = random.Random(seed)
+        self.counters = {}
+        with open(os.path.join(root, "cgroup.controllers"), "w") as f:
+            f.write("cpuset cpu io memory pids\n")
+
+    def path(self, relative):
+        return os.path.join(self.root, relative)
+
+    def add(self, relative):
+        # Every directory in cgroupfs is a cgroup, including the slices and pods above a container
+        parent = os.path.dirname(relative)
+        if parent and parent not in self.counters:
+            self.add(parent)
+        directory = self.path(relative)
+        os.makedirs(directory, exist_ok=True)
+        self.counters[relative] = {"usage": 0, "throttled": 0, "periods": 0, "nr_throttled": 0,
+                                   "rbytes": 0, "wbytes": 0, "memory": self.rng.randint(10, 2000) * 2 ** 20}
+        self.write(relative)
+        self.write_descendants()
+
+    def remove(self, relative):
+        shutil.rmtree(self.path(relative))
+        del self.counters[relative]
+        self.write_descendants()
+
+    def write_descendants(self):
+        with open(self.path("cgroup.stat"), "w") as f:
+            f.write(f"nr_descendants {len(self.counters)}\nnr_dying_descendants 0\n")
+
+    def advance(self, seconds, hot=None):
+        """Move every counter forward by `seconds` of plausible activity"""
+        for relative, counters in self.counters.items():
+            counters["usage"] += int(self.rng.uniform(0, 0.5) * seconds * 1e6)
+            counters["periods"] += int(seconds * 10)
+            counters["rbytes"] += self.rng.randint(0, 2 ** 20)
+            counters["wbytes"] += self.rng.randint(0, 2 ** 20)
+            if relative == hot:
+                counters["throttled"] += int(seconds * 4e5)
+                counters["nr_throttled"] += int(seconds * 8)
+            self.write(relative, stalled=relative == hot)
+
+    def write(self, relative, stalled=False):
+        counters = self.counters[relative]
+        directory = self.path(relative)
+        files = {
+            "cpu.stat": (f"usage_usec {counters['usage']}\nuser_usec {counters['usage'] // 2}\n"
+                         f"system_usec {counters['usage'] // 2}\nnr_periods {counters['periods']}\n"
+                         f"nr_throttled {counters['nr_throttled']}\nthrottled_usec {counters['throttled']}\n"),
+            "memory.current": f"{counters['memory']}\n",
+            "memory.stat": (f"anon {counters['memory'] * 3 // 4}\nfile {counters['memory'] // 4}\nkernel 0\n"
+                            "sock 0\nshmem 0\nfile_mapped 0\nfile_dirty 0\npgfault 0\npgmajfault 0\n"),
+            "io.stat": (f"8:0 rbytes={counters['rbytes']} wbytes={counters['wbytes']} rios=0 wios=0 dbytes=0 dios=0\n"
+                        "259:0 rbytes=0 wbytes=0 rios=0 wios=0 dbytes=0 dios=0\n"),
+            "cpu.pressure": PRESSURE.format(some=30.0 if stalled else 0.1, full=0.0),
+            "memory.pressure": PRESSURE.format(some=25.0 if stalled else 0.0, full=10.0 if stalled else 0.0),
+        }
+        for name, content in files.items():
+            with open(os.path.join(directory, name), "w") as f:
+                f.write(content)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cgroups", type=int, default=500)
+    parser.add_argument("--ticks", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="fake-cgroupfs-") as root:
+        fake = FakeCgroupfs(root)
+        for index in range(args.cgroups):
+            if index % 2:
+                fake.add(f"system.slice/docker-{index:064x}.scope")
+            else:
+                fake.add(f"kubepods.slice/pod{index // 10}/container{index}")
+        hot = f"kubepods.slice/pod{args.cgroups // 30}/container{args.cgroups // 30 * 10}"
+
+        monitor = CgroupMonitor(root)
+        monitor.sample()
+        timings = []
+        for tick in range(args.ticks):
+            fake.advance(1.0, hot=hot)
+            if tick == args.ticks // 2:
+                fake.add("system.slice/new-container.scope")
+                fake.remove(f"system.slice/docker-{1:064x}.scope")
+            started = time.perf_counter()
+            results = monitor.sample()
+            timings.append(time.perf_counter() - started)
+
+        print(f"{len(results)} cgroups (including slices and pods), {args.ticks} ticks")
+        print(f"sample(): median {statistics.median(timings) * 1000:.2f} ms, max {max(timings) * 1000:.2f} ms "
+              f"({statistics.median(timings) / len(results) * 1e6:.1f} us per cgroup)")
+        print(f"Hierarchy walks: {monitor.scans} (1 initial + 1 after the add/remove)")
+        top = results[0]
+        print(f"Worst: {top.path} throttled {top.throttled_percent:.0f}% "
+              f"memory stall {top.memory_pressure:.0f}% ({'expected' if top.path == '/' + hot else 'UNEXPECTED'})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Loopback load test for the /metrics endpoint.
+
+Starts a MetricsExporter on an ephemeral loopback port with one real
+sample, then has many concurrent keep-alive clients scrape it and reports
+throughput and latency percentiles. A re-render is triggered periodically
+during the run to show scrapes are unaffected by sample ticks.
+
+Usage: python benchmarks/bench_exporter.py [--clients 200] [--requests 50]
+"""
+
+import argparse
+import http.client
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.exporter import MetricsExporter
+from utils.sampler import Sampler
+
+
+def client(host, port, path, requests, latencies, failures, start_barrier):
+    connection = http.client.HTTPConnection(host, port, timeout=10)
+    start_barrier.wait()
+    for _ in range(requests):
+        started = time.perf_counter()
+        try:
+            connection.request("GET", path)
+            response = connection.getresponse()
+            response.read()
+            if response.status != 200:
+                failures.append(response.status)
+                continue
+        except (OSError, http.client.HTTPException) as e:
+            failures.append(str(e))
+            connection.close()
+            connection = http.client.HTTPConnection(host, port, timeout=10)
+            continue
+        latencies.append(time.perf_counter() - started)
+    connection.close()
+
+
+def check_exposition(body):
+    """Raise ValueError if a metric family's samples are not contiguous under its header"""
+    finished = set()
+    current = None
+    for line in body.decode("utf-8").splitlines():
+        if line.startswith("# HELP "):
+            name = line.split()[2]
+        elif line.startswith("#"):
+            continue
+        else:
+            name = line.split("{", 1)[0].split(" ", 1)[0]
+        if name != current:
+            if name in finished:
+                raise ValueError(f"samples of {name} are split by other families")
+            if current is not None:
+                finished.add(current)
+            current = name
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=50, help="Requests per client")
+    parser.add_argument("--path", default="/metrics")
+    args = parser.parse_args()
+
+    sampler = Sampler()
+    exporter = MetricsExporter(port=0)
+    exporter.update(sampler.sample_once())
+    check_exposition(exporter.body("/metrics")[1])
+    host, port = exporter.start()
+    print(f"exporter on {host}:{port}, {len(exporter.body(args.path)[1])} byte body")
+
+    # Keep re-rendering at 1 Hz as the sampler would in production
+    stop = threading.Event()
+    render_times = []
+
+    def ticker():
+        while not stop.wait(1.0):
+            sample = sampler.sample_once()
+            started = time.perf_counter()
+            exporter.update(sample)
+            render_times.append(time.perf_counter() - started)
+    threading.Thread(target=ticker, daemon=True).start()
+
+    latencies, failures = [], []
+    barrier = threading.Barrier(args.clients + 1)
+    threads = [threading.Thread(target=client, args=(host, port, args.path, args.requests, latencies, failures, barrier))
+               for _ in range(args.clients)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    exporter.close()
+
+    print(f"{args.clients} clients x {args.requests} requests: {len(latencies)} ok, {len(failures)} failed")
+    print(f"throughput: {len(latencies) / elapsed:.0f} req/s over {elapsed:.2f}s")
+    if latencies:
+        print(f"latency ms: p50 {percentile(latencies, 0.5) * 1000:.2f}  p95 {percentile(latencies, 0.95) * 1000:.2f}"
+              f"  p99 {percentile(latencies, 0.99) * 1000:.2f}  max {max(latencies) * 1000:.2f}")
+    if render_times:
+        print(f"render per tick: {statistics.median(render_times) * 1000:.2f} ms (median of {len(render_times)})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Loopback load test for the fleet aggregator.
+
+Starts a FleetAggregator on an ephemeral loopback port in this process,
+then forks a child process that runs many stand-in agents (one asyncio
+connection each) streaming a real compact record at 1 Hz. Reports the
+aggregator's CPU use, records per second, memory and how long building
+the worst-first host list takes.
+
+Usage: python benchmarks/bench_fleet.py [--hosts 500] [--seconds 20]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import time
+
+import psutil
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.fleet import FleetAggregator, compact_record, encode_frame
+from utils.sampler import Sampler
+
+
+async def stand_in_agent(index, port, record, seconds):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(encode_frame({"type": "hello", "host": f"host-{index:04d}"}))
+    slow_parts = {name: record[name] for name in ("mounts", "processes") if name in record}
+    fast_record = {name: value for name, value in record.items() if name not in slow_parts}
+
+    # Spread the agents across the second like independent hosts would be
+    await asyncio.sleep(random.random())
+    deadline = time.monotonic() + seconds
+    tick = 0
+    while time.monotonic() < deadline:
+        message = dict(fast_record, timestamp=time.time(), cpu_percent=random.uniform(0, 100))
+        # Processes change every other tick and mounts every tenth, as with the real agent
+        if tick % 2 == 0 and "processes" in slow_parts:
+            message["processes"] = slow_parts["processes"]
+        if tick % 10 == 0 and "mounts" in slow_parts:
+            message["mounts"] = slow_parts["mounts"]
+        writer.write(encode_frame(message))
+        await writer.drain()
+        tick += 1
+        await asyncio.sleep(1.0)
+    writer.close()
+
+
+def run_agents(hosts, port, record, seconds):
+    async def main():
+        await asyncio.gather(*(stand_in_agent(index, port, record, seconds) for index in range(hosts)))
+    asyncio.run(main())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--hosts", type=int, default=500)
+    parser.add_argument("--seconds", type=float, default=20.0)
+    args = parser.parse_args()
+    # The first 2 s are connection ramp-up and the last 1 s lets agents finish
+    if args.seconds <= 3:
+        parser.error("--seconds must be more than 3 to leave a window to measure")
+
+    sampler = Sampler()
+    record = compact_record(sampler.sample_once())
+    print(f"Record size: {len(encode_frame(record))} bytes with processes and mounts, "
+          f"{len(encode_frame({k: v for k, v in record.items() if k not in ('processes', 'mounts')}))} without")
+
+    aggregator = FleetAggregator(host="127.0.0.1", port=0)
+    host, port = aggregator.start()
+    process = psutil.Process()
+    rss_before = process.memory_info().rss
+
+    agents = multiprocessing.Process(target=run_agents, args=(args.hosts, port, record, args.seconds))
+    agents.start()
+
+    # Skip the connection ramp-up, then measure a steady-state window
+    time.sleep(2.0)
+    cpu_start = process.cpu_times()
+    received_start = aggregator.records_received
+    started = time.monotonic()
+    list_timings = []
+    hosts = []
+    while time.monotonic() - started < args.seconds - 3:
+        list_started = time.perf_counter()
+        hosts = aggregator.hosts()
+        list_timings.append(time.perf_counter() - list_started)
+        time.sleep(1.0)
+    elapsed = time.monotonic() - started
+    cpu_end = process.cpu_times()
+    received = aggregator.records_received - received_start
+
+    agents.join()
+    cpu_seconds = (cpu_end.user + cpu_end.system) - (cpu_start.user + cpu_start.system)
+    print(f"Hosts connected: {len(hosts)}")
+    print(f"Records: {received / elapsed:.0f}/s")
+    print(f"Aggregator CPU: {cpu_seconds / elapsed * 100:.1f}% of one core "
+          f"({cpu_seconds / max(received, 1) * 1e6:.0f} us per record)")
+    print(f"Memory growth: {(process.memory_info().rss - rss_before) / (1024 * 1024):.1f} MB")
+    print(f"hosts() list: median {statistics.median(list_timings) * 1000:.2f} ms, max {max(list_timings) * 1000:.2f} ms")
+    if hosts:
+        started = time.perf_counter()
+        aggregator.host_sample(hosts[0]["host"])
+        print(f"host_sample() drill-down: {(time.perf_counter() - started) * 1000:.2f} ms")
+    aggregator.close()
+
+
+if __name__ == "__main__":
+    main()
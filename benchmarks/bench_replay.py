@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Reproducible per-tick benchmark of the collection and render hot paths.
+
+Feeds a recording (from `main_gui.py agent --record`) or a synthetic host
+into the unmodified collectors as fast as they run, then times every
+collector and the main consumers of a sample: JSON records, the
+Prometheus exporter, the chart history, chart rendering (Agg, no display
+needed), the process explorer index and the alert engine. A second pass
+under tracemalloc reports allocations per tick.
+
+Results can be saved and compared between two versions of the code:
+
+    python benchmarks/bench_replay.py --source synthetic:processes=5000 --json before.json
+    (change something)
+    python benchmarks/bench_replay.py --source synthetic:processes=5000 --compare before.json
+
+Usage: python benchmarks/bench_replay.py [--source SOURCE] [--ticks 200] [--alloc-ticks 50]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ui.charts import BlitChart
+from utils.agent import sample_record
+from utils.alerts import AlertEngine, AlertRule
+from utils.exporter import render_prometheus
+from utils.process_index import ProcessIndex
+from utils.replay import UNREPLAYABLE, install, open_backend, uninstall
+from utils.sampler import Sampler, default_collectors
+from utils.scheduler import CollectorSpec, EXPENSIVE
+from utils.system_info import get_process_list
+from utils.timeseries import MetricsStore
+
+DEFAULT_SOURCE = "synthetic:processes=2000,mounts=10,nics=4,disks=4"
+
+
+class Harness:
+    """Everything a tick touches, driven by one backend"""
+
+    def __init__(self, source):
+        self.backend = open_backend(source, loop=True)
+        install(self.backend)
+        collectors = default_collectors(process_limit=10)
+        for name in UNREPLAYABLE:
+            del collectors[name]
+        collectors['process_list'] = CollectorSpec(get_process_list, 2.0, EXPENSIVE)
+        self.sampler = Sampler(collectors)
+        self.history = MetricsStore(['cpu', 'memory'], retention=3600, resolution=1.0)
+        self.index = ProcessIndex()
+        self.alerts = AlertEngine([
+            AlertRule("cpu", "cpu_percent", ">", 90, duration=60, clear=80),
+            AlertRule("disk", "free_gb", "<", 5, scope="mount"),
+            AlertRule("leak", "rss_growth_mb_min", ">", 100, duration=120, scope="process"),
+        ])
+
+        figure = Figure(figsize=(6, 3), dpi=100)
+        self.canvas = FigureCanvasAgg(figure)
+        ax = figure.add_subplot(111)
+        ax.set_ylim(0, 100)
+        self.chart = BlitChart(self.canvas, ax, '#3498db', window_seconds=120)
+
+    def tick(self, timings):
+        def timed(name, func, *args):
+            started = time.perf_counter()
+            result = func(*args)
+            timings.setdefault(name, []).append(time.perf_counter() - started)
+            return result
+
+        self.backend.advance()
+        sample = timed("tick.total_collect", self.sampler.sample_once)
+        for name, seconds in sample['timings'].items():
+            timings.setdefault(f"collector.{name}", []).append(seconds)
+
+        snapshot = sample['data']['snapshot']
+        timed("render.json_record", lambda: json.dumps(sample_record(sample), default=str))
+        timed("render.prometheus", render_prometheus, sample)
+        timed("consume.alerts", self.alerts, sample)
+        timed("consume.history", self.history.append, snapshot.timestamp,
+              (snapshot.cpu_percent, snapshot.memory_percent))
+
+        def draw_chart():
+            times, values = self.history.series('cpu', 120)
+            self.chart.set_data(times, values, snapshot.timestamp)
+            self.chart.draw()
+        timed("render.chart", draw_chart)
+
+        def explore():
+            self.index.update(sample['data']['process_list'])
+            self.index.rows(0, 40)
+        timed("consume.process_index", explore)
+        return sample
+
+
+def summarize(timings):
+    return {
+        name: {
+            "p50_ms": statistics.median(values) * 1000,
+            "p95_ms": sorted(values)[int(len(values) * 0.95) - 1] * 1000,
+            "max_ms": max(values) * 1000,
+        }
+        for name, values in sorted(timings.items())
+    }
+
+
+def measure_allocations(harness, ticks):
+    tracemalloc.start()
+    harness.tick({})
+    baseline = tracemalloc.take_snapshot()
+    peaks = []
+    blocks = []
+    for _ in range(ticks):
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        harness.tick({})
+        current, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - before)
+        blocks.append(current - before)
+    growth = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(baseline, "filename"))
+    tracemalloc.stop()
+    return {
+        "peak_kb_per_tick": statistics.median(peaks) / 1024,
+        "retained_kb_per_tick": statistics.mean(blocks) / 1024,
+        "growth_kb_total": growth / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--source", default=DEFAULT_SOURCE,
+                        help="Recording file or 'synthetic:processes=N,mounts=M,nics=K,disks=D,cores=C'")
+    parser.add_argument("--ticks", type=int, default=200)
+    parser.add_argument("--alloc-ticks", type=int, default=50)
+    parser.add_argument("--json", default=None, help="Write the results to this file")
+    parser.add_argument("--compare", default=None, help="Compare against results written by --json")
+    args = parser.parse_args()
+
+    harness = Harness(args.source)
+    # Warm up: first ticks populate caches and the process index
+    for _ in range(3):
+        harness.tick({})
+
+    timings = {}
+    started = time.perf_counter()
+    for _ in range(args.ticks):
+        harness.tick(timings)
+    elapsed = time.perf_counter() - started
+
+    results = {
+        "source": args.source,
+        "ticks_per_second": args.ticks / elapsed,
+        "timings": summarize(timings),
+        "allocations": measure_allocations(harness, args.alloc_ticks),
+    }
+    uninstall()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print(f"Source: {args.source}")
+    print(f"Replayed {args.ticks} ticks at {results['ticks_per_second']:.1f} ticks/s")
+    print(f"{'phase':32} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}" + (f" {'p50 vs base':>12}" if baseline else ""))
+    for name, stats in results["timings"].items():
+        line = f"{name:32} {stats['p50_ms']:9.3f} {stats['p95_ms']:9.3f} {stats['max_ms']:9.3f}"
+        if baseline and name in baseline["timings"]:
+            before = baseline["timings"][name]["p50_ms"]
+            line += f" {stats['p50_ms'] / before:11.2f}x" if before else f" {'n/a':>12}"
+        print(line)
+    allocations = results["allocations"]
+    print(f"Allocations: peak {allocations['peak_kb_per_tick']:.0f} KB/tick, "
+          f"retained {allocations['retained_kb_per_tick']:.1f} KB/tick, "
+          f"growth {allocations['growth_kb_total']:.0f} KB over {args.alloc_ticks} ticks")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
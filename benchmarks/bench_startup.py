@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for the headless agent and the dashboard.
+
+Each mode is measured in a fresh interpreter: the time to import its entry
+module, the time to take the first sample, and the peak resident memory of
+that interpreter. The dashboard is measured up to import only, since
+creating a Tk window needs a display.
+
+Usage: python benchmarks/bench_startup.py [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child interpreter; prints one JSON line with its measurements
+PROBE = r"""
+import json, resource, sys, time
+sys.path.insert(0, {root!r})
+started = time.perf_counter()
+import {module}
+imported = time.perf_counter()
+first_sample = None
+if {sample!r}:
+    from utils.sampler import Sampler
+    Sampler().sample_once()
+    first_sample = time.perf_counter() - imported
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == "darwin":
+    rss_kb //= 1024
+print(json.dumps({{
+    "import_ms": (imported - started) * 1000,
+    "first_sample_ms": first_sample * 1000 if first_sample is not None else None,
+    "max_rss_mb": rss_kb / 1024,
+    "gui_loaded": "tkinter" in sys.modules or "matplotlib" in sys.modules,
+}}))
+"""
+
+MODES = (
+    ("agent", "utils.agent", True),
+    ("dashboard", "ui.dashboard", False),
+)
+
+
+def measure(module, sample):
+    code = PROBE.format(root=ROOT, module=module, sample=sample)
+    output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'mode':<10} {'import (ms)':>12} {'1st sample (ms)':>16} {'max RSS (MB)':>13} {'GUI loaded':>11}")
+    for name, module, sample in MODES:
+        try:
+            runs = [measure(module, sample) for _ in range(args.repeat)]
+        except subprocess.CalledProcessError as e:
+            print(f"{name:<10} failed: {e.stderr.strip().splitlines()[-1] if e.stderr else e}")
+            continue
+        import_ms = statistics.median(run["import_ms"] for run in runs)
+        rss_mb = statistics.median(run["max_rss_mb"] for run in runs)
+        first = [run["first_sample_ms"] for run in runs if run["first_sample_ms"] is not None]
+        first_text = f"{statistics.median(first):.1f}" if first else "-"
+        print(f"{name:<10} {import_ms:>12.1f} {first_text:>16} {rss_mb:>13.1f} {str(runs[0]['gui_loaded']):>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for process ranking.
+
+Compares the bounded-heap top_k() selection over ProcessColumns against the
+previous approach of building one dict per process and sorting the whole
+list once per ranking, on synthetic process tables.
+
+Usage: python benchmarks/bench_top_processes.py [--limit 10] [--repeat 20]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.processes import ProcessColumns, RANKINGS, top_k
+
+SIZES = (1_000, 10_000, 50_000)
+
+
+def synthetic_columns(count, seed=0):
+    rng = random.Random(seed)
+    columns = ProcessColumns()
+    for pid in range(1, count + 1):
+        columns.pid.append(pid)
+        columns.name.append(f"proc-{pid}")
+        # Most processes idle, a few busy: roughly what real hosts look like
+        columns.cpu_percent.append(rng.expovariate(2.0))
+        columns.memory_percent.append(rng.random() * 2)
+        columns.rss.append(rng.randrange(1 << 20, 1 << 30))
+        columns.rss_growth.append(rng.gauss(0, 4096))
+        columns.io_bytes.append(rng.randrange(0, 1 << 34))
+        columns.num_threads.append(rng.randrange(1, 64))
+        columns.num_fds.append(rng.randrange(3, 1024))
+    return columns
+
+
+def sort_based(columns, rankings, limit):
+    rows = [columns.row(index) for index in range(len(columns))]
+    keys = {'cpu': 'cpu_percent', 'memory': 'memory_percent', 'io': 'io_bytes',
+            'threads': 'num_threads', 'fds': 'num_fds', 'rss_growth': 'rss_growth_mb_s'}
+    return {ranking: sorted(rows, key=lambda row: row[keys[ranking]], reverse=True)[:limit]
+            for ranking in rankings}
+
+
+def heap_based(columns, rankings, limit):
+    selected = top_k(columns, rankings, limit)
+    return {ranking: [columns.row(index) for index in indices] for ranking, indices in selected.items()}
+
+
+def timeit(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    for rankings in (('cpu', 'memory'), tuple(RANKINGS)):
+        print(f"rankings: {', '.join(rankings)} (limit={args.limit}, best of {args.repeat})")
+        print(f"{'processes':>10} {'sort (ms)':>12} {'top_k (ms)':>12} {'speedup':>8}")
+        for size in SIZES:
+            columns = synthetic_columns(size)
+            sort_time = timeit(lambda: sort_based(columns, rankings, args.limit), args.repeat)
+            heap_time = timeit(lambda: heap_based(columns, rankings, args.limit), args.repeat)
+            print(f"{size:>10} {sort_time * 1000:>12.2f} {heap_time * 1000:>12.2f} {sort_time / heap_time:>7.1f}x")
+        print()
+
+
+if __name__ == '__main__':
+    main()
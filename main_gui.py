@@ -2,17 +2,172 @@
 """
 System Health Checker - GUI Version
 A modern dashboard for monitoring system resources in real-time.
+
+Run without arguments for the dashboard, or with `agent` for a headless
+collector that never imports the GUI stack:
+
+    python main_gui.py agent --interval 1 --output metrics.jsonl
+
+Alert rules (see utils/alerts.py for the file format) can be checked
+against such a recording with:
+
+    python main_gui.py alerts alerts.example.json --replay metrics.jsonl
+
+Raw collector inputs can be recorded and played back into the dashboard
+(or generated, e.g. "synthetic:processes=5000,mounts=20"):
+
+    python main_gui.py agent --count 600 --record capture.jsonl.gz
+    python main_gui.py dashboard --replay capture.jsonl.gz --replay-speed 10
 """
 
+import argparse
 import sys
 import os
 
 # Add the current directory to the path to import ui modules
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from ui.dashboard import main
 
-if __name__ == "__main__":
+def add_process_backend_args(parser):
+    parser.add_argument("--process-backend", choices=("auto", "procfs", "psutil"), default="auto",
+                        help="How to scan processes: 'auto' reads /proc directly on Linux (default)")
+    parser.add_argument("--process-workers", type=int, default=0,
+                        help="Threads to shard the /proc scan across (default: 0, scan inline)")
+
+
+def configure_process_backend(args):
+    from utils.system_info import set_process_backend
+    try:
+        set_process_backend(getattr(args, "process_backend", "auto"), getattr(args, "process_workers", 0))
+    except ValueError as e:
+        sys.exit(str(e))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="System Health Checker")
+    subparsers = parser.add_subparsers(dest="mode")
+
+    dashboard_parser = subparsers.add_parser("dashboard", help="Start the Tk dashboard (default)")
+    dashboard_parser.add_argument("--log-dir", default=None,
+                                  help="Metrics log directory to preload history from and append to")
+    dashboard_parser.add_argument("--http-port", type=int, default=None,
+                                  help="Serve /metrics and /snapshot.json on this loopback port")
+    dashboard_parser.add_argument("--process-rows", type=int, default=200,
+                                  help="Rows shown in each process table (default: 200)")
+    dashboard_parser.add_argument("--alerts", default=None, help="Evaluate the alert rules in this JSON file")
+    dashboard_parser.add_argument("--fleet-port", type=int, default=None,
+                                  help="Aggregate agents started with --fleet on this TCP port and add a Fleet tab")
+    dashboard_parser.add_argument("--fleet-host", default="127.0.0.1",
+                                  help="Address for --fleet-port (default: 127.0.0.1). Agents are not authenticated; "
+                                       "use 0.0.0.0 only on a trusted network")
+    dashboard_parser.add_argument("--replay", default=None, metavar="SOURCE",
+                                  help="Show a recording (from agent --record) or 'synthetic:key=value,...' instead of this host")
+    dashboard_parser.add_argument("--replay-speed", type=float, default=1.0,
+                                  help="Replayed ticks per second (default: 1)")
+    dashboard_parser.add_argument("--kill-grace", type=float, default=3.0,
+                                  help="Seconds killed processes get to exit after SIGTERM before SIGKILL (default: 3)")
+    add_process_backend_args(dashboard_parser)
+
+    agent_parser = subparsers.add_parser("agent", help="Run headless and write snapshots out")
+    agent_parser.add_argument("--interval", type=float, default=1.0, help="Seconds between samples (default: 1)")
+    agent_parser.add_argument("--output", default="-", help="JSON lines file to append to, '-' for stdout (default)")
+    agent_parser.add_argument("--count", type=int, default=None, help="Stop after this many samples")
+    agent_parser.add_argument("--processes", type=int, default=10,
+                              help="Top processes to include per ranking, 0 to skip the process scan")
+    agent_parser.add_argument("--log-dir", default=None, help="Also append snapshots to a binary metrics log here")
+    agent_parser.add_argument("--http-port", type=int, default=None,
+                              help="Serve /metrics and /snapshot.json on this port")
+    agent_parser.add_argument("--profile-ticks", type=int, default=0,
+                              help="Profile the first N ticks with cProfile/tracemalloc")
+    agent_parser.add_argument("--profile-out", default="health-profile",
+                              help="Path prefix for the .prof/.txt profile output (default: health-profile)")
+    agent_parser.add_argument("--http-host", default="127.0.0.1", help="Address for --http-port (default: 127.0.0.1)")
+    agent_parser.add_argument("--alerts", default=None, help="Evaluate the alert rules in this JSON file")
+    agent_parser.add_argument("--fleet", default=None, metavar="HOST:PORT",
+                              help="Stream samples to a dashboard started with --fleet-port")
+    agent_parser.add_argument("--name", default=None, help="Host name to report to the fleet (default: hostname)")
+    agent_parser.add_argument("--record", default=None, metavar="FILE",
+                              help="Record the raw psutil results of every tick for replay (.gz to compress)")
+    add_process_backend_args(agent_parser)
+
+    alerts_parser = subparsers.add_parser("alerts", help="Evaluate alert rules against a recorded JSON lines file")
+    alerts_parser.add_argument("rules", help="JSON alert rules file")
+    alerts_parser.add_argument("--replay", default="-", help="Agent JSON lines output to replay, '-' for stdin (default)")
+    alerts_parser.add_argument("--no-sinks", action="store_true", help="Only print alerts; skip the sinks in the rules file")
+
+    return parser.parse_args(argv)
+
+
+def run_agent_mode(args):
+    # Only the collectors are imported here; tkinter and matplotlib stay unloaded
+    from utils.agent import JsonLinesSink, run_agent
+
+    print(f"Starting System Health Checker agent (every {args.interval}s)...", file=sys.stderr)
+    configure_process_backend(args)
+    sinks = [JsonLinesSink(args.output)]
+    if args.record:
+        from utils.replay import RecordingBackend, install
+        recorder = RecordingBackend(args.record)
+        install(recorder)
+        # Closes each tick after the other sinks have seen it
+        sinks.append(recorder)
+    if args.log_dir:
+        from utils.metrics_log import MetricsLogSink
+        sinks.append(MetricsLogSink(args.log_dir))
+    if args.http_port is not None:
+        from utils.exporter import MetricsExporter
+        exporter = MetricsExporter(args.http_host, args.http_port)
+        host, port = exporter.start()
+        print(f"Serving metrics on http://{host}:{port}/metrics", file=sys.stderr)
+        sinks.append(exporter)
+    if args.alerts:
+        from utils.alerts import load_alert_engine
+        sinks.append(load_alert_engine(args.alerts))
+    if args.fleet:
+        from utils.fleet import FleetSink
+        sinks.append(FleetSink(args.fleet, name=args.name))
+    try:
+        run_agent(sinks, interval=args.interval, count=args.count, process_limit=args.processes,
+                  profile_ticks=args.profile_ticks, profile_path=args.profile_out)
+    except KeyboardInterrupt:
+        pass
+
+
+def run_alerts_mode(args):
+    import json
+    from utils.alerts import AlertEngine, load_alert_engine, replay_records
+
+    engine = load_alert_engine(args.rules)
+    if args.no_sinks:
+        engine = AlertEngine(engine.rules, stale_after=engine.stale_after)
+    lines = sys.stdin if args.replay == "-" else open(args.replay, encoding="utf-8")
+    try:
+        alerts = replay_records(engine, lines)
+    finally:
+        if lines is not sys.stdin:
+            lines.close()
+    for alert in alerts:
+        print(json.dumps(alert._asdict()))
+    print(f"{len(alerts)} alert transitions, {len(engine.active())} still firing", file=sys.stderr)
+
+
+def run_dashboard_mode(args):
+    from ui.dashboard import main
+
+    configure_process_backend(args)
     print("Starting System Health Checker Dashboard...")
     print("Press Ctrl+C to exit")
-    main()
+    main(log_dir=getattr(args, "log_dir", None), http_port=getattr(args, "http_port", None),
+         process_rows=getattr(args, "process_rows", 200), alerts=getattr(args, "alerts", None),
+         fleet_port=getattr(args, "fleet_port", None), fleet_host=getattr(args, "fleet_host", "127.0.0.1"),
+         replay=getattr(args, "replay", None), replay_speed=getattr(args, "replay_speed", 1.0), kill_grace=getattr(args, "kill_grace", 3.0))
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.mode == "agent":
+        run_agent_mode(args)
+    elif args.mode == "alerts":
+        run_alerts_mode(args)
+    else:
+        run_dashboard_mode(args)
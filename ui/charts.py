@@ -0,0 +1,71 @@
+import numpy as np
+from matplotlib.patches import Polygon
+
+
+class BlitChart:
+    """Time-series line with a filled area, redrawn by blitting.
+
+    The line and fill artists are created once and marked animated, so a full
+    canvas draw only renders the static parts (axes, grid, labels). That
+    render is cached with copy_from_bbox and every update just restores it,
+    draws the two artists and blits the axes region. The x axis is fixed at
+    "seconds ago" so tick labels never change between frames.
+    """
+
+    def __init__(self, canvas, ax, color, window_seconds=100):
+        self.canvas = canvas
+        self.ax = ax
+        self.window_seconds = window_seconds
+        self.background = None
+
+        self.ax.set_xlim(-window_seconds, 0)
+        self.line, = self.ax.plot([], [], linewidth=2, color=color, animated=True)
+        self.fill = Polygon(np.zeros((1, 2)), closed=True, alpha=0.3, color=color, animated=True)
+        self.ax.add_patch(self.fill)
+
+        # Any full draw (first show, resize) refreshes the cached background
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+
+    def set_window(self, window_seconds):
+        """Change the visible time span; this needs one full redraw"""
+        self.window_seconds = window_seconds
+        self.ax.set_xlim(-window_seconds, 0)
+        self.invalidate()
+
+    def set_data(self, timestamps, values, now=None):
+        """Update the artists in place; timestamps are epoch seconds"""
+        if len(timestamps) == 0:
+            return
+        timestamps = np.asarray(timestamps, dtype=float)
+        values = np.asarray(values, dtype=float)
+        x = timestamps - (timestamps[-1] if now is None else now)
+        self.line.set_data(x, values)
+
+        outline = np.empty((len(x) + 2, 2))
+        outline[0] = (x[0], 0)
+        outline[1:-1, 0] = x
+        outline[1:-1, 1] = values
+        outline[-1] = (x[-1], 0)
+        self.fill.set_xy(outline)
+
+    def invalidate(self):
+        """Drop the cached background so the next draw() re-renders everything"""
+        self.background = None
+
+    def draw(self):
+        if self.background is None:
+            # Full render; _on_draw captures the background and blits the artists
+            self.canvas.draw()
+            return
+        self.canvas.restore_region(self.background)
+        self._draw_artists()
+        self.canvas.blit(self.ax.bbox)
+
+    def _on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self._draw_artists()
+        self.canvas.blit(self.ax.bbox)
+
+    def _draw_artists(self):
+        self.ax.draw_artist(self.fill)
+        self.ax.draw_artist(self.line)
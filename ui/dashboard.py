@@ -1,39 +1,192 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import threading
 import time
-from datetime import datetime
-import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
-from collections import deque
 import sys
 import os
-import psutil
-import signal
 
 # Add the parent directory to the path to import utils
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from utils.system_info import get_memory_info, get_disk_info, get_network_info, get_cpu_info, get_uptime_info, get_top_processes
+from ui.charts import BlitChart
+from ui.render import RenderLoop, WidgetCache
+from ui.sparkline import ProcessHistoryWindow
+from ui.tables import TreeTable
+from utils.alerts import load_alert_engine
+from utils.exporter import MetricsExporter
+from utils.fleet import FleetAggregator
+from utils.instrumentation import ProfileCapture, instrumentation
+from utils.process_index import ProcessIndex
+from utils.replay import install, open_backend, replay_collectors
+from utils.metrics_log import MetricsLogReader, MetricsLogSink
+from utils.sampler import Sampler, default_collectors
+from utils.scheduler import CollectorSpec, EXPENSIVE
+from utils.sensors import hottest_temperature
+from utils.terminator import DEFAULT_GRACE, ProcessTerminator, summarize
+from utils.timeseries import MetricsStore
+from utils.system_info import get_process_history, pin_process
+from utils.system_info import get_process_list, get_cpu_info, get_memory_info, get_disk_info, get_disk_io_info, get_network_info, get_uptime_info
+
+# (label, seconds) choices for the Overview charts
+CHART_RANGES = (("2 minutes", 120), ("1 hour", 3600), ("1 day", 86400))
+CHART_MAX_POINTS = 1500
+
+# Metrics kept in the Overview chart history
+HISTORY_METRICS = ('cpu', 'memory', 'temperature')
+
+# Overview sensor table columns: (column id, heading, width, anchor)
+SENSOR_COLUMNS = (
+    ('Sensor', 'Sensor', 260, 'w'),
+    ('Reading', 'Reading', 100, 'center'),
+    ('High', 'High', 100, 'center'),
+    ('Critical', 'Critical', 100, 'center'),
+    ('Status', 'Status', 100, 'center'),
+)
+
+# Rows per process table; the tables scroll and are reconciled in place, so this can be generous
+PROCESS_ROWS = 200
+
+# Process explorer columns: (column id, heading, width, anchor, ProcessIndex sort column)
+EXPLORER_COLUMNS = (
+    ('PID', 'PID', 80, 'center', 'pid'),
+    ('Name', 'Name', 220, 'w', 'name'),
+    ('User', 'User', 100, 'w', 'user'),
+    ('CPU%', 'CPU %', 80, 'center', 'cpu'),
+    ('Memory%', 'Memory %', 90, 'center', 'memory'),
+    ('Memory(MB)', 'Memory (MB)', 110, 'center', 'rss'),
+    ('Command', 'Command', 500, 'w', 'command'),
+)
+
+# Fleet host list columns: (column id, heading, width, anchor)
+FLEET_COLUMNS = (
+    ('Host', 'Host', 220, 'w'),
+    ('Address', 'Address', 140, 'w'),
+    ('Worst%', 'Worst %', 90, 'center'),
+    ('CPU%', 'CPU %', 80, 'center'),
+    ('Memory%', 'Memory %', 90, 'center'),
+    ('Disk%', 'Disk %', 80, 'center'),
+    ('LastSeen', 'Last Seen', 120, 'center'),
+)
+
+# Containers tab columns: (column id, heading, width, anchor, CgroupUsage field to sort by)
+CONTAINER_COLUMNS = (
+    ('Cgroup', 'Cgroup', 360, 'w', 'path'),
+    ('CPU%', 'CPU %', 80, 'center', 'cpu_percent'),
+    ('Throttled%', 'Throttled %', 100, 'center', 'throttled_percent'),
+    ('ThrottledMs', 'Throttled ms/s', 110, 'center', 'throttled_ms'),
+    ('Memory(MB)', 'Memory (MB)', 110, 'center', 'memory_bytes'),
+    ('MemPSI', 'Mem Stall %', 100, 'center', 'memory_pressure'),
+    ('MemPSIFull', 'Mem Full %', 90, 'center', 'memory_full_pressure'),
+    ('CPUPSI', 'CPU Wait %', 90, 'center', 'cpu_pressure'),
+    ('Read', 'Read MB/s', 90, 'center', 'read_bytes'),
+    ('Write', 'Write MB/s', 90, 'center', 'write_bytes'),
+)
+
+# Throttled % or memory stall % above which a cgroup row is highlighted
+CONTAINER_WARNING_PERCENT = 10.0
 
 class SystemHealthDashboard:
-    def __init__(self, root):
+    def __init__(self, root, log_dir=None, http_port=None, process_rows=PROCESS_ROWS, alerts=None, fleet_port=None,
+                 fleet_host="127.0.0.1", replay=None, replay_speed=1.0, kill_grace=DEFAULT_GRACE):
         self.root = root
         self.root.title("System Health Checker Dashboard")
         self.root.geometry("1400x900")
         self.root.configure(bg='#f0f0f0')
         
-        # Data storage for charts
-        self.cpu_history = deque(maxlen=50)
-        self.memory_history = deque(maxlen=50)
-        self.time_history = deque(maxlen=50)
+        # Metric collection runs on its own thread; the UI only reads the latest sample
+        interval = 1.0 / replay_speed if replay else 1.0
+        collectors = default_collectors(process_limit=process_rows, interval=interval)
+        # The explorer needs every process; it only runs while its tab is open
+        collectors['process_list'] = CollectorSpec(get_process_list, interval * 2, EXPENSIVE)
+        if replay:
+            # Collectors read a recorded or synthetic host, advanced one tick per sample
+            backend = open_backend(replay)
+            install(backend)
+            collectors = replay_collectors(backend, collectors, interval)
+            self.root.title(f"System Health Checker Dashboard - replay of {replay}")
+        self.sampler = Sampler(collectors, interval=interval)
+        self.last_sequence = 0
+        self.ui_profile = None
+        # (target, ProfileCapture) for captures whose outcome has not been shown yet
+        self.profiles = []
+        # Open per-process history windows by PID
+        self.history_windows = {}
+        # Kills run in the background; finished ones are picked up in update_data
+        self.terminator = ProcessTerminator(grace=kill_grace)
+        # All periodic UI work goes through one loop; labels are only reconfigured when their text changes
+        self.widgets = WidgetCache()
+        self.render_loop = RenderLoop(root, self.update_data, interval_ms=250, on_error=self.show_update_error)
+        
+        # Chart history: raw samples for an hour plus downsampled tiers for longer ranges
+        self.local_history = MetricsStore(HISTORY_METRICS, retention=3600, resolution=1.0)
+        self.history = self.local_history
+        self.chart_range = CHART_RANGES[0][1]
+        
+        # Optional on-disk history: preload the charts from it and keep appending to it
+        self.metrics_log = None
+        if log_dir:
+            self.preload_history(log_dir)
+            self.metrics_log = MetricsLogSink(log_dir)
+            self.sampler.add_listener(self.metrics_log)
+        
+        # Optional Prometheus endpoint, re-rendered on the sampler thread once per tick
+        self.exporter = None
+        if http_port is not None:
+            self.exporter = MetricsExporter(port=http_port)
+            self.exporter.start()
+            self.sampler.add_listener(self.exporter)
+        
+        # Optional fleet aggregator; Overview/Processes show `self.source` (None for this host)
+        self.fleet = None
+        self.source = None
+        self.fleet_rendered_at = 0.0
+        if fleet_port is not None:
+            self.fleet = FleetAggregator(host=fleet_host, port=fleet_port)
+            self.fleet.start()
+        
+        # Optional alert rules, evaluated on the sampler thread
+        self.alert_engine = None
+        if alerts:
+            self.alert_engine = load_alert_engine(alerts)
+            self.sampler.add_listener(self.alert_engine)
         
         # Setup UI
         self.setup_ui()
         self.setup_charts()
         
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        # Only the Overview tab is visible at startup
+        self.sampler.set_active('processes', False)
+        self.sampler.set_active('process_list', False)
+        self.sampler.set_active('cgroups', False)
+        
         # Start real-time updates
-        self.update_data()
+        self.sampler.start()
+        self.render_loop.start()
+        
+    def preload_history(self, log_dir):
+        """Fill the chart history from the metrics log written by earlier runs"""
+        try:
+            start = time.time() - CHART_RANGES[-1][1]
+            timestamps, columns = MetricsLogReader(log_dir).query(
+                start, fields=['cpu_percent', 'memory_percent', 'temperature_max_c'])
+            self.history.extend(timestamps, {'cpu': columns['cpu_percent'], 'memory': columns['memory_percent'],
+                                             'temperature': columns['temperature_max_c']})
+        except Exception as e:
+            print(f"Error loading history from {log_dir}: {e}")
+    
+    def on_close(self):
+        """Stop the background sampler before tearing down the window"""
+        self.render_loop.stop()
+        self.sampler.stop(timeout=1)
+        if self.metrics_log is not None:
+            self.metrics_log.close()
+        if self.exporter is not None:
+            self.exporter.close()
+        if self.fleet is not None:
+            self.fleet.close()
+        self.root.destroy()
         
     def setup_ui(self):
         # Main container
@@ -43,7 +196,11 @@ class SystemHealthDashboard:
         # Title
         title_label = tk.Label(main_frame, text="System Health Dashboard", 
                               font=('Arial', 24, 'bold'), bg='#f0f0f0', fg='#2c3e50')
-        title_label.pack(pady=(0, 20))
+        title_label.pack(pady=(0, 5))
+        
+        # Currently firing alerts
+        self.alerts_label = tk.Label(main_frame, text="", font=('Arial', 11, 'bold'), bg='#f0f0f0', fg='#27ae60')
+        self.alerts_label.pack(pady=(0, 10))
         
         # Create notebook for tabs
         self.notebook = ttk.Notebook(main_frame)
@@ -57,12 +214,42 @@ class SystemHealthDashboard:
         self.processes_frame = tk.Frame(self.notebook, bg='white')
         self.notebook.add(self.processes_frame, text="Processes")
         
+        # Fleet tab, only when aggregating remote agents
+        if self.fleet is not None:
+            self.fleet_frame = tk.Frame(self.notebook, bg='white')
+            self.notebook.add(self.fleet_frame, text="Fleet")
+        
+        # Containers (cgroup v2) tab
+        self.containers_frame = tk.Frame(self.notebook, bg='white')
+        self.notebook.add(self.containers_frame, text="Containers")
+        
+        # Process explorer tab
+        self.explorer_frame = tk.Frame(self.notebook, bg='white')
+        self.notebook.add(self.explorer_frame, text="Process Explorer")
+        
+        # Diagnostics tab
+        self.diagnostics_frame = tk.Frame(self.notebook, bg='white')
+        self.notebook.add(self.diagnostics_frame, text="Diagnostics")
+        
         # Setup overview tab
         self.setup_overview_tab()
         
         # Setup processes tab
         self.setup_processes_tab()
         
+        # Setup fleet tab
+        if self.fleet is not None:
+            self.setup_fleet_tab()
+        
+        # Setup containers tab
+        self.setup_containers_tab()
+        
+        # Setup process explorer tab
+        self.setup_explorer_tab()
+        
+        # Setup diagnostics tab
+        self.setup_diagnostics_tab()
+        
     def setup_overview_tab(self):
         # System info frame
         info_frame = tk.Frame(self.overview_frame, bg='white')
@@ -79,7 +266,13 @@ class SystemHealthDashboard:
         self.cpu_cores_label.pack()
         
         self.cpu_freq_label = tk.Label(cpu_frame, text="Frequency: -- MHz", font=('Arial', 12), bg='white', fg='#2c3e50')
-        self.cpu_freq_label.pack(pady=(0, 10))
+        self.cpu_freq_label.pack()
+        
+        self.cpu_breakdown_label = tk.Label(cpu_frame, text="User: --% System: --%", font=('Arial', 10), bg='white', fg='#2c3e50')
+        self.cpu_breakdown_label.pack()
+        
+        self.cpu_wait_label = tk.Label(cpu_frame, text="I/O Wait: --% Steal: --%", font=('Arial', 10), bg='white', fg='#2c3e50')
+        self.cpu_wait_label.pack(pady=(0, 10))
         
         # Memory Info
         memory_frame = tk.LabelFrame(info_frame, text="Memory Information", font=('Arial', 12, 'bold'), bg='white', fg='#2c3e50')
@@ -111,7 +304,13 @@ class SystemHealthDashboard:
         self.disk_used_label.pack()
         
         self.disk_free_label = tk.Label(disk_frame, text="Free: -- GB", font=('Arial', 12), bg='white', fg='#2c3e50')
-        self.disk_free_label.pack(pady=(0, 10))
+        self.disk_free_label.pack()
+        
+        self.disk_read_label = tk.Label(disk_frame, text="Read: -- MB/s (-- IOPS)", font=('Arial', 10), bg='white', fg='#2c3e50')
+        self.disk_read_label.pack()
+        
+        self.disk_write_label = tk.Label(disk_frame, text="Write: -- MB/s (-- IOPS)", font=('Arial', 10), bg='white', fg='#2c3e50')
+        self.disk_write_label.pack(pady=(0, 10))
         
         # Network Info
         network_frame = tk.LabelFrame(self.overview_frame, text="Network Information", font=('Arial', 12, 'bold'), bg='white', fg='#2c3e50')
@@ -123,6 +322,41 @@ class SystemHealthDashboard:
         self.network_recv_label = tk.Label(network_frame, text="Bytes Received: -- GB", font=('Arial', 12), bg='white', fg='#2c3e50')
         self.network_recv_label.pack(side=tk.LEFT, padx=20, pady=10)
         
+        self.network_send_rate_label = tk.Label(network_frame, text="Send: -- MB/s", font=('Arial', 12), bg='white', fg='#2c3e50')
+        self.network_send_rate_label.pack(side=tk.LEFT, padx=20, pady=10)
+        
+        self.network_recv_rate_label = tk.Label(network_frame, text="Receive: -- MB/s", font=('Arial', 12), bg='white', fg='#2c3e50')
+        self.network_recv_rate_label.pack(side=tk.LEFT, padx=20, pady=10)
+        
+        # Filesystems, fullest or unresponsive first
+        mounts_frame = tk.LabelFrame(self.overview_frame, text="Filesystems", font=('Arial', 12, 'bold'), bg='white', fg='#2c3e50')
+        mounts_frame.pack(fill=tk.X, padx=20, pady=(0, 10))
+        
+        self.mounts_tree = ttk.Treeview(mounts_frame, columns=('Mount', 'Device', 'Type', 'Usage%', 'Free(GB)', 'Total(GB)'),
+                                        show='headings', height=4)
+        for column, heading, width, anchor in (('Mount', 'Mount', 240, 'w'), ('Device', 'Device', 160, 'w'),
+                                               ('Type', 'Type', 80, 'center'), ('Usage%', 'Usage %', 80, 'center'),
+                                               ('Free(GB)', 'Free (GB)', 100, 'center'), ('Total(GB)', 'Total (GB)', 100, 'center')):
+            self.mounts_tree.heading(column, text=heading)
+            self.mounts_tree.column(column, width=width, anchor=anchor)
+        self.mounts_tree.pack(fill=tk.X, padx=10, pady=5)
+        self.mounts_table = TreeTable(self.mounts_tree)
+        
+        # Temperatures and fans, read in the background by the sensor monitor
+        sensors_frame = tk.LabelFrame(self.overview_frame, text="Sensors", font=('Arial', 12, 'bold'), bg='white', fg='#2c3e50')
+        sensors_frame.pack(fill=tk.X, padx=20, pady=(0, 10))
+        
+        self.sensors_tree = ttk.Treeview(sensors_frame, columns=[column[0] for column in SENSOR_COLUMNS],
+                                         show='headings', height=4)
+        for column, heading, width, anchor in SENSOR_COLUMNS:
+            self.sensors_tree.heading(column, text=heading)
+            self.sensors_tree.column(column, width=width, anchor=anchor)
+        self.sensors_tree.tag_configure('high', foreground='#e67e22')
+        self.sensors_tree.tag_configure('critical', foreground='#e74c3c')
+        self.sensors_tree.tag_configure('inactive', foreground='#95a5a6')
+        self.sensors_tree.pack(fill=tk.X, padx=10, pady=5)
+        self.sensors_table = TreeTable(self.sensors_tree)
+        
         # Uptime Info
         uptime_frame = tk.LabelFrame(self.overview_frame, text="System Uptime", font=('Arial', 12, 'bold'), bg='white', fg='#2c3e50')
         uptime_frame.pack(fill=tk.X, padx=20, pady=(0, 10))
@@ -130,6 +364,21 @@ class SystemHealthDashboard:
         self.uptime_label = tk.Label(uptime_frame, text="Uptime: --", font=('Arial', 12), bg='white', fg='#2c3e50')
         self.uptime_label.pack(pady=10)
         
+        # Per-collector timings from the background sampler
+        self.sample_timing_label = tk.Label(uptime_frame, text="Last sample: --", font=('Arial', 10), bg='white', fg='#7f8c8d')
+        self.sample_timing_label.pack(pady=(0, 10))
+        
+        # Chart time range selector
+        range_frame = tk.Frame(self.overview_frame, bg='white')
+        range_frame.pack(fill=tk.X, padx=20)
+        
+        tk.Label(range_frame, text="Chart range:", font=('Arial', 10), bg='white', fg='#2c3e50').pack(side=tk.LEFT)
+        self.chart_range_var = tk.StringVar(value=CHART_RANGES[0][0])
+        chart_range_box = ttk.Combobox(range_frame, textvariable=self.chart_range_var, state='readonly', width=12,
+                                       values=[label for label, _ in CHART_RANGES])
+        chart_range_box.pack(side=tk.LEFT, padx=5)
+        chart_range_box.bind("<<ComboboxSelected>>", self.on_chart_range_changed)
+        
         # Charts frame
         charts_frame = tk.Frame(self.overview_frame, bg='white')
         charts_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=(0, 20))
@@ -152,11 +401,24 @@ class SystemHealthDashboard:
         self.memory_canvas = FigureCanvasTkAgg(self.memory_figure, memory_chart_frame)
         self.memory_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
         
+        # Temperature Chart
+        temperature_chart_frame = tk.LabelFrame(charts_frame, text="Hottest Sensor Over Time", font=('Arial', 12, 'bold'), bg='white', fg='#2c3e50')
+        temperature_chart_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(10, 0))
+        
+        self.temperature_figure = Figure(figsize=(6, 4), facecolor='white')
+        self.temperature_ax = self.temperature_figure.add_subplot(111)
+        self.temperature_canvas = FigureCanvasTkAgg(self.temperature_figure, temperature_chart_frame)
+        self.temperature_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        
     def setup_processes_tab(self):
         # Top processes frame
         processes_container = tk.Frame(self.processes_frame, bg='white')
         processes_container.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
         
+        self.kill_status_label = tk.Label(processes_container, text="Ctrl/Shift-click to select several processes",
+                                          font=('Arial', 10), bg='white', fg='#7f8c8d', anchor='w')
+        self.kill_status_label.pack(fill=tk.X, pady=(0, 5))
+        
         # CPU Processes
         cpu_processes_frame = tk.LabelFrame(processes_container, text="Top Processes by CPU Usage (Right-click to kill)", 
                                           font=('Arial', 12, 'bold'), bg='white', fg='#2c3e50')
@@ -178,7 +440,11 @@ class SystemHealthDashboard:
         self.cpu_tree.column('Memory%', width=100, anchor='center')
         self.cpu_tree.column('Memory(MB)', width=120, anchor='center')
         
-        self.cpu_tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        cpu_scrollbar = ttk.Scrollbar(cpu_processes_frame, orient=tk.VERTICAL, command=self.cpu_tree.yview)
+        self.cpu_tree.configure(yscrollcommand=cpu_scrollbar.set)
+        cpu_scrollbar.pack(side=tk.RIGHT, fill=tk.Y, pady=10)
+        self.cpu_tree.pack(fill=tk.BOTH, expand=True, padx=(10, 0), pady=10)
+        self.cpu_table = TreeTable(self.cpu_tree)
         
         # Memory Processes
         memory_processes_frame = tk.LabelFrame(processes_container, text="Top Processes by Memory Usage (Right-click to kill)", 
@@ -201,7 +467,11 @@ class SystemHealthDashboard:
         self.memory_tree.column('Memory(MB)', width=120, anchor='center')
         self.memory_tree.column('CPU%', width=80, anchor='center')
         
-        self.memory_tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        memory_scrollbar = ttk.Scrollbar(memory_processes_frame, orient=tk.VERTICAL, command=self.memory_tree.yview)
+        self.memory_tree.configure(yscrollcommand=memory_scrollbar.set)
+        memory_scrollbar.pack(side=tk.RIGHT, fill=tk.Y, pady=10)
+        self.memory_tree.pack(fill=tk.BOTH, expand=True, padx=(10, 0), pady=10)
+        self.memory_table = TreeTable(self.memory_tree)
         
         # Bind right-click events for context menus (cross-platform)
         if sys.platform == "darwin":  # macOS
@@ -213,24 +483,434 @@ class SystemHealthDashboard:
             self.cpu_tree.bind("<Button-3>", self.show_cpu_context_menu)
             self.memory_tree.bind("<Button-3>", self.show_memory_context_menu)
         
+        # Clicking a row opens that process's history
+        self.cpu_tree.bind("<ButtonRelease-1>", lambda event: self.on_process_row_clicked(self.cpu_tree, event))
+        self.memory_tree.bind("<ButtonRelease-1>", lambda event: self.on_process_row_clicked(self.memory_tree, event))
+        
         # Create context menus
-        self.cpu_context_menu = tk.Menu(self.root, tearoff=0)
-        self.cpu_context_menu.add_command(label="Kill Process", command=self.kill_cpu_process)
-        self.cpu_context_menu.add_separator()
-        self.cpu_context_menu.add_command(label="Refresh", command=self.update_data)
+        self.cpu_context_menu = self.make_kill_menu(self.cpu_tree)
+        self.memory_context_menu = self.make_kill_menu(self.memory_tree)
+        
+    def make_kill_menu(self, tree):
+        menu = tk.Menu(self.root, tearoff=0)
+        menu.add_command(label="Kill Selected", command=lambda: self.kill_selected(tree))
+        menu.add_command(label="Kill Process Tree", command=lambda: self.kill_selected(tree, include_children=True))
+        menu.add_separator()
+        menu.add_command(label="Refresh", command=self.refresh_now)
+        return menu
+        
+    def on_process_row_clicked(self, tree, event):
+        # Shift/Control-click extend the selection (Control-click is also the macOS context menu)
+        if event.state & 0x5:
+            return
+        item = tree.identify_row(event.y)
+        if not item:
+            return
+        if self.source is not None:
+            messagebox.showinfo("Process History", "Process history is only kept for this host.")
+            return
+        pid = int(item)
+        window = self.history_windows.get(pid)
+        if window is not None:
+            window.lift()
+            return
+        
+        # Pin while the window is open so the process is tracked even outside the top of the rankings
+        pin_process(pid)
+        name = tree.item(item, 'values')[1]
+        window = ProcessHistoryWindow(self.root, pid, name, self.on_history_window_closed, pin_process)
+        self.history_windows[pid] = window
+        self.sampler.set_active('processes', True)
+        window.update(get_process_history(pid))
+    
+    def on_history_window_closed(self, pid, keep_pinned):
+        self.history_windows.pop(pid, None)
+        if not keep_pinned:
+            pin_process(pid, False)
+        self.sampler.set_active('processes', self.processes_visible() or bool(self.history_windows))
+    
+    def update_history_windows(self):
+        for pid, window in self.history_windows.items():
+            window.update(get_process_history(pid))
+    
+    def setup_containers_tab(self):
+        self.containers_label = tk.Label(self.containers_frame, text="Waiting for cgroup data...", font=('Arial', 10),
+                                         bg='white', fg='#7f8c8d', anchor='w')
+        self.containers_label.pack(fill=tk.X, padx=20, pady=(20, 10))
+        
+        cgroups_frame = tk.LabelFrame(self.containers_frame, text="Cgroups, most throttled or memory-stalled first",
+                                      font=('Arial', 12, 'bold'), bg='white', fg='#2c3e50')
+        cgroups_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=(0, 20))
+        
+        self.containers_tree = ttk.Treeview(cgroups_frame, columns=[column[0] for column in CONTAINER_COLUMNS],
+                                            show='headings', selectmode='browse')
+        for column, heading, width, anchor, sort_field in CONTAINER_COLUMNS:
+            self.containers_tree.heading(column, text=heading,
+                                         command=lambda field=sort_field: self.on_containers_sort(field))
+            self.containers_tree.column(column, width=width, anchor=anchor)
+        self.containers_tree.tag_configure('warning', foreground='#e74c3c')
+        
+        containers_scrollbar = ttk.Scrollbar(cgroups_frame, orient=tk.VERTICAL, command=self.containers_tree.yview)
+        self.containers_tree.configure(yscrollcommand=containers_scrollbar.set)
+        containers_scrollbar.pack(side=tk.RIGHT, fill=tk.Y, pady=10)
+        self.containers_tree.pack(fill=tk.BOTH, expand=True, padx=(10, 0), pady=10)
+        self.containers_table = TreeTable(self.containers_tree)
+        # None keeps the collector's worst-first order
+        self.containers_sort = None
+        self.containers_rows = []
+    
+    def containers_visible(self):
+        return self.notebook.select() == str(self.containers_frame)
+    
+    def on_containers_sort(self, field):
+        self.containers_sort = None if field == self.containers_sort else field
+        self.update_containers(self.containers_rows)
+    
+    def update_containers(self, cgroups):
+        self.containers_rows = cgroups
+        if self.containers_sort == 'path':
+            cgroups = sorted(cgroups, key=lambda cgroup: cgroup.path)
+        elif self.containers_sort is not None:
+            cgroups = sorted(cgroups, key=lambda cgroup: getattr(cgroup, self.containers_sort), reverse=True)
+        
+        rows = []
+        for cgroup in cgroups:
+            values = (
+                cgroup.path,
+                f"{cgroup.cpu_percent:.1f}",
+                f"{cgroup.throttled_percent:.1f}",
+                f"{cgroup.throttled_ms:.1f}",
+                f"{cgroup.memory_bytes / (1024 * 1024):.1f}",
+                f"{cgroup.memory_pressure:.2f}",
+                f"{cgroup.memory_full_pressure:.2f}",
+                f"{cgroup.cpu_pressure:.2f}",
+                f"{cgroup.read_bytes / (1024 * 1024):.2f}",
+                f"{cgroup.write_bytes / (1024 * 1024):.2f}",
+            )
+            warning = max(cgroup.throttled_percent, cgroup.memory_pressure) >= CONTAINER_WARNING_PERCENT
+            rows.append((cgroup.path, values, ('warning',) if warning else ()))
+        self.containers_table.update(rows)
+        
+        if cgroups:
+            self.widgets.config(self.containers_label, text=f"{len(cgroups)} cgroups")
+        else:
+            self.widgets.config(self.containers_label, text="No cgroups found (this host may not use cgroup v2)")
+    
+    def setup_fleet_tab(self):
+        toolbar = tk.Frame(self.fleet_frame, bg='white')
+        toolbar.pack(fill=tk.X, padx=20, pady=(20, 10))
+        
+        self.fleet_source_label = tk.Label(toolbar, text="Viewing: this host", font=('Arial', 12, 'bold'), bg='white', fg='#2c3e50')
+        self.fleet_source_label.pack(side=tk.LEFT)
+        tk.Button(toolbar, text="Show This Host", command=lambda: self.select_source(None)).pack(side=tk.LEFT, padx=20)
+        
+        self.fleet_count_label = tk.Label(toolbar, text="Hosts: 0", font=('Arial', 10), bg='white', fg='#7f8c8d')
+        self.fleet_count_label.pack(side=tk.RIGHT)
+        
+        hosts_frame = tk.LabelFrame(self.fleet_frame, text="Hosts, worst first (double-click to drill down)",
+                                    font=('Arial', 12, 'bold'), bg='white', fg='#2c3e50')
+        hosts_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=(0, 20))
+        
+        self.fleet_tree = ttk.Treeview(hosts_frame, columns=[column[0] for column in FLEET_COLUMNS],
+                                       show='headings', selectmode='browse')
+        for column, heading, width, anchor in FLEET_COLUMNS:
+            self.fleet_tree.heading(column, text=heading)
+            self.fleet_tree.column(column, width=width, anchor=anchor)
+        self.fleet_tree.tag_configure('stale', foreground='#95a5a6')
+        self.fleet_tree.tag_configure('critical', foreground='#e74c3c')
+        
+        fleet_scrollbar = ttk.Scrollbar(hosts_frame, orient=tk.VERTICAL, command=self.fleet_tree.yview)
+        self.fleet_tree.configure(yscrollcommand=fleet_scrollbar.set)
+        fleet_scrollbar.pack(side=tk.RIGHT, fill=tk.Y, pady=10)
+        self.fleet_tree.pack(fill=tk.BOTH, expand=True, padx=(10, 0), pady=10)
+        self.fleet_table = TreeTable(self.fleet_tree)
+        
+        self.fleet_tree.bind("<Double-1>", self.on_fleet_host_opened)
+        
+    def fleet_visible(self):
+        return self.fleet is not None and self.notebook.select() == str(self.fleet_frame)
+    
+    def update_fleet(self):
+        """Refresh the host list at most once a second"""
+        now = time.monotonic()
+        if now - self.fleet_rendered_at < 1.0:
+            return
+        self.fleet_rendered_at = now
+        
+        hosts = self.fleet.hosts()
+        self.fleet_table.update([(host['host'], (
+            host['host'],
+            host['address'],
+            f"{host['worst']:.1f}",
+            f"{host['cpu_percent']:.1f}",
+            f"{host['memory_percent']:.1f}",
+            f"{host['disk_percent']:.1f}",
+            "never" if host['age'] is None else f"{host['age']:.0f}s ago"
+        ), ('stale',) if host['stale'] else ('critical',) if host['worst'] >= 90 else ()) for host in hosts])
+        
+        stale = sum(1 for host in hosts if host['stale'])
+        rejecting = sum(1 for host in hosts if host['rejected'])
+        text = f"Hosts: {len(hosts)} ({stale} not reporting"
+        text += f", {rejecting} sending malformed records)" if rejecting else ")"
+        self.widgets.config(self.fleet_count_label, text=text)
+    
+    def on_fleet_host_opened(self, event):
+        item = self.fleet_tree.identify_row(event.y)
+        if item:
+            self.select_source(item)
+            self.notebook.select(self.overview_frame)
+    
+    def select_source(self, host):
+        """Point the Overview and Processes tabs at a fleet host, or back at this one (None)"""
+        self.source = host
+        self.last_sequence = 0
+        # Updates queued for the previous source would briefly show its data
+        self.render_loop.discard()
+        self.render_loop.request()
+        if host is None:
+            self.history = self.local_history
+            self.root.title("System Health Checker Dashboard")
+        else:
+            # Remote charts start from the short history the aggregator keeps
+            self.history = MetricsStore(HISTORY_METRICS, retention=3600, resolution=1.0)
+            timestamps, cpu, memory = self.fleet.host_history(host)
+            if timestamps:
+                self.history.extend(timestamps, {'cpu': cpu, 'memory': memory})
+            self.root.title(f"System Health Checker Dashboard - {host}")
+        self.widgets.config(self.fleet_source_label, text=f"Viewing: {host or 'this host'}")
+        self.cpu_table.clear()
+        self.memory_table.clear()
+        self.cpu_chart.invalidate()
+        self.memory_chart.invalidate()
+        self.temperature_chart.invalidate()
+        self.sensors_table.clear()
+    
+    def setup_explorer_tab(self):
+        # Searching and sorting run against this in-memory copy, never against psutil
+        self.process_index = ProcessIndex()
+        self.explorer_offset = 0
+        self.explorer_page = 30
         
-        self.memory_context_menu = tk.Menu(self.root, tearoff=0)
-        self.memory_context_menu.add_command(label="Kill Process", command=self.kill_memory_process)
-        self.memory_context_menu.add_separator()
-        self.memory_context_menu.add_command(label="Refresh", command=self.update_data)
+        # Filter bar
+        toolbar = tk.Frame(self.explorer_frame, bg='white')
+        toolbar.pack(fill=tk.X, padx=20, pady=(20, 10))
+        
+        tk.Label(toolbar, text="Filter:", font=('Arial', 10), bg='white', fg='#2c3e50').pack(side=tk.LEFT)
+        self.explorer_filter_var = tk.StringVar()
+        self.explorer_filter_var.trace_add('write', self.on_explorer_filter_changed)
+        tk.Entry(toolbar, textvariable=self.explorer_filter_var, width=40).pack(side=tk.LEFT, padx=(5, 20))
+        
+        self.explorer_tree_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(toolbar, text="Group by process tree", variable=self.explorer_tree_var, bg='white',
+                       command=self.on_explorer_group_changed).pack(side=tk.LEFT)
+        
+        self.explorer_count_label = tk.Label(toolbar, text="", font=('Arial', 10), bg='white', fg='#7f8c8d')
+        self.explorer_count_label.pack(side=tk.RIGHT)
+        
+        # Virtualized list: the Treeview only ever holds the rows that fit on screen
+        list_frame = tk.Frame(self.explorer_frame, bg='white')
+        list_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=(0, 20))
+        
+        self.explorer_tree = ttk.Treeview(list_frame, columns=[column[0] for column in EXPLORER_COLUMNS],
+                                          show='headings', selectmode='browse')
+        for column, heading, width, anchor, sort_column in EXPLORER_COLUMNS:
+            self.explorer_tree.heading(column, text=heading,
+                                       command=lambda sort_column=sort_column: self.on_explorer_sort(sort_column))
+            self.explorer_tree.column(column, width=width, anchor=anchor, stretch=(column == 'Command'))
+        self.explorer_table = TreeTable(self.explorer_tree)
+        
+        self.explorer_scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.on_explorer_scroll)
+        self.explorer_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.explorer_tree.pack(fill=tk.BOTH, expand=True)
+        
+        self.explorer_tree.bind("<Configure>", self.on_explorer_resize)
+        self.explorer_tree.bind("<MouseWheel>", lambda event: self.scroll_explorer(-1 if event.delta > 0 else 1, 'units'))
+        self.explorer_tree.bind("<Button-4>", lambda event: self.scroll_explorer(-1, 'units'))
+        self.explorer_tree.bind("<Button-5>", lambda event: self.scroll_explorer(1, 'units'))
+        self.explorer_tree.bind("<Prior>", lambda event: self.scroll_explorer(-1, 'pages'))
+        self.explorer_tree.bind("<Next>", lambda event: self.scroll_explorer(1, 'pages'))
+        
+        self.explorer_context_menu = self.make_kill_menu(self.explorer_tree)
+        if sys.platform == "darwin":  # macOS
+            self.explorer_tree.bind("<Button-2>", self.show_explorer_context_menu)
+            self.explorer_tree.bind("<Control-Button-1>", self.show_explorer_context_menu)
+        else:  # Windows/Linux
+            self.explorer_tree.bind("<Button-3>", self.show_explorer_context_menu)
+        
+        self.update_explorer_headings()
+        
+    def update_explorer(self, process_list):
+        self.process_index.update(process_list)
+        self.render_explorer()
+    
+    def explorer_visible(self):
+        return self.notebook.select() == str(self.explorer_frame)
+    
+    def on_explorer_filter_changed(self, *args):
+        self.process_index.set_filter(self.explorer_filter_var.get())
+        self.explorer_offset = 0
+        self.render_explorer()
+    
+    def on_explorer_group_changed(self):
+        self.process_index.set_group_tree(self.explorer_tree_var.get())
+        self.render_explorer()
+    
+    def on_explorer_sort(self, sort_column):
+        self.process_index.set_sort(sort_column)
+        self.update_explorer_headings()
+        self.render_explorer()
+    
+    def update_explorer_headings(self):
+        arrow = ' \u25bc' if self.process_index.descending else ' \u25b2'
+        for column, heading, width, anchor, sort_column in EXPLORER_COLUMNS:
+            self.explorer_tree.heading(column, text=heading + (arrow if sort_column == self.process_index.sort_column else ''))
+    
+    def on_explorer_resize(self, event):
+        # Show as many rows as fit; the header takes roughly one row
+        row_height = int(ttk.Style().lookup('Treeview', 'rowheight') or 20)
+        page = max(1, event.height // row_height - 1)
+        if page != self.explorer_page:
+            self.explorer_page = page
+            self.render_explorer()
+    
+    def on_explorer_scroll(self, action, amount, unit=None):
+        # Scrollbar protocol: ('moveto', fraction) or ('scroll', count, 'units'|'pages')
+        if action == 'moveto':
+            self.explorer_offset = int(float(amount) * len(self.process_index))
+            self.render_explorer()
+        else:
+            self.scroll_explorer(int(amount), unit)
+    
+    def scroll_explorer(self, count, unit):
+        self.explorer_offset += count * (self.explorer_page if unit == 'pages' else 3)
+        self.render_explorer()
+        return "break"
+    
+    def render_explorer(self):
+        """Show the slice of the index that is currently scrolled into view"""
+        total = len(self.process_index)
+        self.explorer_offset = max(0, min(self.explorer_offset, total - self.explorer_page))
+        
+        rows = self.process_index.rows(self.explorer_offset, self.explorer_page)
+        self.explorer_table.update([(proc['pid'], (
+            proc['pid'],
+            '  ' * proc['depth'] + proc['name'],
+            proc['username'],
+            f"{proc['cpu_percent']:.1f}",
+            f"{proc['memory_percent']:.1f}",
+            f"{proc['memory_mb']:.1f}",
+            proc['cmdline']
+        )) for proc in rows])
+        
+        if total:
+            self.explorer_scrollbar.set(self.explorer_offset / total, (self.explorer_offset + len(rows)) / total)
+        else:
+            self.explorer_scrollbar.set(0, 1)
+        shown = f"{total} of {len(self.process_index.columns)}" if self.process_index.columns is not None else "0"
+        self.widgets.config(self.explorer_count_label, text=f"Processes: {shown}")
+    
+    def show_explorer_context_menu(self, event):
+        """Show context menu for the process explorer"""
+        try:
+            self.select_for_menu(self.explorer_tree, event)
+            if self.explorer_tree.selection():
+                self.explorer_context_menu.post(event.x_root, event.y_root)
+        except Exception as e:
+            print(f"Error showing explorer context menu: {e}")
+    
+    def setup_diagnostics_tab(self):
+        # Health checker's own footprint
+        usage_frame = tk.LabelFrame(self.diagnostics_frame, text="Health Checker Overhead", font=('Arial', 12, 'bold'), bg='white', fg='#2c3e50')
+        usage_frame.pack(fill=tk.X, padx=20, pady=20)
+        
+        self.self_usage_label = tk.Label(usage_frame, text="CPU: --%  RSS: -- MB  Threads: --", font=('Arial', 12), bg='white', fg='#2c3e50')
+        self.self_usage_label.pack(side=tk.LEFT, padx=20, pady=10)
+        
+        self.backoff_label = tk.Label(usage_frame, text="Backoff: --", font=('Arial', 10), bg='white', fg='#7f8c8d')
+        self.backoff_label.pack(side=tk.LEFT, padx=20, pady=10)
+        
+        self.render_label = tk.Label(usage_frame, text="UI frames: --", font=('Arial', 10), bg='white', fg='#7f8c8d')
+        self.render_label.pack(side=tk.LEFT, padx=20, pady=10)
+        
+        # Per-phase timing histograms
+        phases_frame = tk.LabelFrame(self.diagnostics_frame, text="Phase Timings (ms)", font=('Arial', 12, 'bold'), bg='white', fg='#2c3e50')
+        phases_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=(0, 10))
+        
+        self.phases_tree = ttk.Treeview(phases_frame, columns=('Phase', 'Count', 'Last', 'p50', 'p95', 'Max'), show='headings', height=12)
+        for column, width, anchor in (('Phase', 240, 'w'), ('Count', 80, 'center'), ('Last', 100, 'center'),
+                                      ('p50', 100, 'center'), ('p95', 100, 'center'), ('Max', 100, 'center')):
+            self.phases_tree.heading(column, text=column)
+            self.phases_tree.column(column, width=width, anchor=anchor)
+        self.phases_tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.phases_table = TreeTable(self.phases_tree)
+        
+        # Opt-in profiling of the sampler thread or the UI thread
+        profile_frame = tk.LabelFrame(self.diagnostics_frame, text="Profiling", font=('Arial', 12, 'bold'), bg='white', fg='#2c3e50')
+        profile_frame.pack(fill=tk.X, padx=20, pady=(0, 20))
+        
+        tk.Label(profile_frame, text="Ticks:", font=('Arial', 10), bg='white', fg='#2c3e50').pack(side=tk.LEFT, padx=(10, 5), pady=10)
+        self.profile_ticks_var = tk.IntVar(value=20)
+        tk.Spinbox(profile_frame, from_=1, to=1000, width=6, textvariable=self.profile_ticks_var).pack(side=tk.LEFT)
+        
+        tk.Button(profile_frame, text="Profile Sampler", command=lambda: self.start_profile('sampler')).pack(side=tk.LEFT, padx=10)
+        tk.Button(profile_frame, text="Profile UI", command=lambda: self.start_profile('ui')).pack(side=tk.LEFT)
+        
+        self.profile_status_label = tk.Label(profile_frame, text="", font=('Arial', 10), bg='white', fg='#7f8c8d')
+        self.profile_status_label.pack(side=tk.LEFT, padx=10)
+        
+    def start_profile(self, target):
+        """Capture cProfile/tracemalloc output for the next N ticks of the sampler or UI thread"""
+        path = os.path.join(os.getcwd(), f"health-profile-{target}-{time.strftime('%Y%m%d-%H%M%S')}")
+        ticks = self.profile_ticks_var.get()
+        try:
+            if target == 'sampler':
+                capture = self.sampler.start_profile(ticks, path)
+            else:
+                capture = self.ui_profile = ProfileCapture(ticks, path)
+        except RuntimeError as e:
+            # Only one profiler can run at a time
+            self.widgets.config(self.profile_status_label, text=f"Cannot profile {target}: {e}")
+            return
+        self.profiles.append((target, capture))
+        self.widgets.config(self.profile_status_label, text=f"Profiling {target} for {ticks} ticks -> {path}.prof/.txt")
+    
+    def check_profiles(self):
+        """Show how captures that have finished since the last poll ended"""
+        for target, capture in [profile for profile in self.profiles if profile[1].done]:
+            self.profiles.remove((target, capture))
+            if capture.error is not None:
+                text = f"Profiling {target} failed: {capture.error}"
+            else:
+                text = f"Profile of {target} written to {capture.path}.prof/.txt"
+            self.widgets.config(self.profile_status_label, text=text)
+    
+    def update_diagnostics(self, sample):
+        usage = sample['data'].get('self')
+        if usage is not None:
+            self.widgets.config(self.self_usage_label, text=f"CPU: {usage['cpu_percent']:.1f}%  RSS: {usage['rss'] / (1024 * 1024):.1f} MB  "
+                                                            f"Threads: {usage['threads']}")
+        
+        backoff = self.sampler.scheduler.backoff()
+        self.widgets.config(self.backoff_label, text="Interval multipliers: " + ", ".join(f"{name} x{factor:g}" for name, factor in backoff.items()))
+        
+        loop = self.render_loop
+        self.widgets.config(self.render_label, text=f"UI frames: {loop.frames} ({loop.overruns} over budget), "
+                                                    f"label updates skipped: {self.widgets.skipped}")
+        
+        self.phases_table.update([(phase, (
+            phase,
+            stats['count'],
+            f"{stats['last'] * 1000:.2f}",
+            f"{stats['p50'] * 1000:.2f}",
+            f"{stats['p95'] * 1000:.2f}",
+            f"{stats['max'] * 1000:.2f}"
+        )) for phase, stats in instrumentation.summary().items()])
         
     def show_cpu_context_menu(self, event):
         """Show context menu for CPU process tree"""
         try:
-            # Select the item that was right-clicked
-            item = self.cpu_tree.identify_row(event.y)
-            if item:
-                self.cpu_tree.selection_set(item)
+            self.select_for_menu(self.cpu_tree, event)
+            if self.cpu_tree.selection():
                 self.cpu_context_menu.post(event.x_root, event.y_root)
         except Exception as e:
             print(f"Error showing CPU context menu: {e}")
@@ -238,247 +918,389 @@ class SystemHealthDashboard:
     def show_memory_context_menu(self, event):
         """Show context menu for Memory process tree"""
         try:
-            # Select the item that was right-clicked
-            item = self.memory_tree.identify_row(event.y)
-            if item:
-                self.memory_tree.selection_set(item)
+            self.select_for_menu(self.memory_tree, event)
+            if self.memory_tree.selection():
                 self.memory_context_menu.post(event.x_root, event.y_root)
         except Exception as e:
             print(f"Error showing Memory context menu: {e}")
     
-    def kill_cpu_process(self):
-        """Kill the selected process from CPU tree"""
-        try:
-            selected_item = self.cpu_tree.selection()[0]
-            values = self.cpu_tree.item(selected_item, 'values')
-            pid = int(values[0])
-            process_name = values[1]
-            self.kill_process(pid, process_name)
-        except (IndexError, ValueError) as e:
-            messagebox.showerror("Error", "Please select a process to kill.")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to kill process: {str(e)}")
+    def select_for_menu(self, tree, event):
+        """Select the right-clicked row, keeping a multi-selection that already contains it"""
+        item = tree.identify_row(event.y)
+        if item and item not in tree.selection():
+            tree.selection_set(item)
     
-    def kill_memory_process(self):
-        """Kill the selected process from Memory tree"""
-        try:
-            selected_item = self.memory_tree.selection()[0]
-            values = self.memory_tree.item(selected_item, 'values')
-            pid = int(values[0])
-            process_name = values[1]
-            self.kill_process(pid, process_name)
-        except (IndexError, ValueError) as e:
+    def kill_selected(self, tree, include_children=False):
+        """Kill the processes selected in a process table (rows are keyed by PID)"""
+        processes = []
+        for item in tree.selection():
+            values = tree.item(item, 'values')
+            processes.append((int(values[0]), str(values[1]).strip()))
+        if not processes:
             messagebox.showerror("Error", "Please select a process to kill.")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to kill process: {str(e)}")
+            return
+        self.kill_processes(processes, include_children)
     
-    def kill_process(self, pid, process_name):
-        """Kill a process by PID with confirmation dialog"""
-        try:
-            # Show confirmation dialog
-            result = messagebox.askyesno(
-                "Confirm Process Termination",
-                f"Are you sure you want to kill the following process?\n\n"
-                f"PID: {pid}\n"
-                f"Name: {process_name}\n\n"
-                f"Warning: This action cannot be undone and may cause data loss!",
-                icon='warning'
-            )
-            
-            if not result:
-                return
-            
-            # Check if process exists
-            try:
-                process = psutil.Process(pid)
-                
-                # Try graceful termination first
-                process.terminate()
-                
-                # Wait a bit for graceful termination
-                try:
-                    process.wait(timeout=3)
-                    messagebox.showinfo("Success", f"Process {process_name} (PID: {pid}) terminated successfully.")
-                except psutil.TimeoutExpired:
-                    # Force kill if graceful termination didn't work
-                    process.kill()
-                    messagebox.showinfo("Success", f"Process {process_name} (PID: {pid}) forcefully killed.")
-                    
-            except psutil.NoSuchProcess:
-                messagebox.showwarning("Warning", f"Process {process_name} (PID: {pid}) no longer exists.")
-            except psutil.AccessDenied:
-                messagebox.showerror("Access Denied", 
-                                   f"Permission denied to kill process {process_name} (PID: {pid}).\n"
-                                   f"Try running the application as administrator/root.")
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to kill process: {str(e)}")
-                
-            # Refresh the process list
-            self.update_data()
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"An unexpected error occurred: {str(e)}")
+    def kill_processes(self, processes, include_children=False):
+        """Confirm, then terminate [(pid, name)] on the background terminator"""
+        if self.source is not None:
+            messagebox.showerror("Error", f"These processes run on {self.source}; "
+                                          "processes can only be killed on this host.")
+            return
+        listed = "\n".join(f"PID {pid}: {name}" for pid, name in processes[:10])
+        if len(processes) > 10:
+            listed += f"\n...and {len(processes) - 10} more"
+        children = "\n\nAll of their child processes will be killed too." if include_children else ""
+        result = messagebox.askyesno(
+            "Confirm Process Termination",
+            f"Are you sure you want to kill the following {'process' if len(processes) == 1 else 'processes'}?\n\n"
+            f"{listed}{children}\n\n"
+            f"Warning: This action cannot be undone and may cause data loss!",
+            icon='warning'
+        )
+        if not result:
+            return
+        
+        # SIGTERM, wait and SIGKILL all happen off the Tk thread
+        self.terminator.submit([pid for pid, name in processes], tree=include_children)
+        self.update_kill_status()
+    
+    def update_kill_status(self):
+        pending = self.terminator.pending()
+        if pending:
+            self.widgets.config(self.kill_status_label, text=f"Terminating processes ({pending} kill request(s) running)...", fg='#e67e22')
+        else:
+            self.widgets.config(self.kill_status_label, text="Ctrl/Shift-click to select several processes", fg='#7f8c8d')
+    
+    def on_kills_finished(self, reports):
+        self.update_kill_status()
+        for report in reports:
+            title = "Process Tree Termination" if report.tree else "Process Termination"
+            failed = [result for result in report.results if result.outcome in ('access_denied', 'survived', 'error')]
+            if failed:
+                names = ", ".join(f"{result.name or '?'} ({result.pid})" for result in failed[:5])
+                messagebox.showwarning(title, f"{summarize(report)}\n\nNot killed: {names}"
+                                              + ("\n\nTry running the application as administrator/root."
+                                                 if any(result.outcome == 'access_denied' for result in failed) else ""))
+            else:
+                messagebox.showinfo(title, summarize(report))
+        # Refresh the process list
+        self.refresh_now()
         
     def setup_charts(self):
-        # Setup CPU chart
-        self.cpu_ax.set_title('CPU Usage (%)', fontsize=12, fontweight='bold', color='#2c3e50')
-        self.cpu_ax.set_ylabel('CPU %', fontsize=10, color='#2c3e50')
-        self.cpu_ax.set_ylim(0, 100)
-        self.cpu_ax.grid(True, alpha=0.3, color='#bdc3c7')
-        self.cpu_ax.set_facecolor('#f8f9fa')
-        self.cpu_ax.tick_params(colors='#2c3e50')
-        
-        # Setup Memory chart
-        self.memory_ax.set_title('Memory Usage (%)', fontsize=12, fontweight='bold', color='#2c3e50')
-        self.memory_ax.set_ylabel('Memory %', fontsize=10, color='#2c3e50')
-        self.memory_ax.set_ylim(0, 100)
-        self.memory_ax.grid(True, alpha=0.3, color='#bdc3c7')
-        self.memory_ax.set_facecolor('#f8f9fa')
-        self.memory_ax.tick_params(colors='#2c3e50')
+        # Static chart decoration is drawn once; only the data artists change per tick
+        for ax, title, ylabel in ((self.cpu_ax, 'CPU Usage (%)', 'CPU %'),
+                                  (self.memory_ax, 'Memory Usage (%)', 'Memory %'),
+                                  (self.temperature_ax, 'Hottest Sensor (°C)', '°C')):
+            ax.set_title(title, fontsize=12, fontweight='bold', color='#2c3e50')
+            ax.set_ylabel(ylabel, fontsize=10, color='#2c3e50')
+            ax.set_xlabel('Seconds ago', fontsize=10, color='#2c3e50')
+            ax.set_ylim(0, 100)
+            ax.grid(True, alpha=0.3, color='#bdc3c7')
+            ax.set_facecolor('#f8f9fa')
+            ax.tick_params(colors='#2c3e50')
+        
+        self.cpu_chart = BlitChart(self.cpu_canvas, self.cpu_ax, '#007bff', self.chart_range)
+        self.memory_chart = BlitChart(self.memory_canvas, self.memory_ax, '#dc3545', self.chart_range)
+        self.temperature_ax.set_ylim(0, 110)
+        self.temperature_chart = BlitChart(self.temperature_canvas, self.temperature_ax, '#e67e22', self.chart_range)
+        # Part of the static background, so hiding it needs a full redraw (see update_sensors)
+        self.no_sensors_text = self.temperature_ax.text(0.5, 0.5, 'No sensors found', transform=self.temperature_ax.transAxes,
+                                                        ha='center', va='center', color='#7f8c8d', visible=False)
         
         # Adjust figure layout to prevent label overlap
         self.cpu_figure.tight_layout()
         self.memory_figure.tight_layout()
+        self.temperature_figure.tight_layout()
+        
+        # Charts are not redrawn while hidden; repaint them fully when the Overview tab comes back
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
+        
+    def processes_visible(self):
+        return self.notebook.select() == str(self.processes_frame)
+    
+    def overview_visible(self):
+        return self.notebook.select() == str(self.overview_frame)
+    
+    def on_tab_changed(self, event):
+        # Let the scheduler slow down expensive collectors nobody is looking at
+        self.sampler.set_active('processes', self.processes_visible() or bool(self.history_windows))
+        self.sampler.set_active('process_list', self.explorer_visible())
+        self.sampler.set_active('mounts', self.overview_visible())
+        self.sampler.set_active('cgroups', self.containers_visible())
+        
+        if self.overview_visible():
+            self.cpu_chart.invalidate()
+            self.memory_chart.invalidate()
+            self.temperature_chart.invalidate()
+            self.update_charts()
+            # The tables below are only kept up to date while the tab is shown
+            sequence, sample = self.sampler.latest() if self.source is None else self.fleet.host_sample(self.source)
+            if sample is not None and sample['data'].get('mounts') is not None:
+                self.update_mounts(sample['data']['mounts'])
+            if sample is not None and sample['data'].get('sensors') is not None:
+                self.update_sensors(sample['data']['sensors'])
+        
+        if self.processes_visible() and self.source is None:
+            sequence, sample = self.sampler.latest()
+            if sample is not None and sample['data'].get('processes') is not None:
+                self.update_process_trees(sample['data']['processes'])
+        
+        if self.containers_visible() and self.source is None:
+            sequence, sample = self.sampler.latest()
+            if sample is not None and sample['data'].get('cgroups') is not None:
+                self.update_containers(sample['data']['cgroups'])
+        
+        if self.explorer_visible():
+            sequence, sample = self.sampler.latest()
+            if sample is not None and sample['data'].get('process_list') is not None:
+                self.update_explorer(sample['data']['process_list'])
+        
+    def on_chart_range_changed(self, event):
+        self.chart_range = dict(CHART_RANGES)[self.chart_range_var.get()]
+        self.cpu_chart.set_window(self.chart_range)
+        self.memory_chart.set_window(self.chart_range)
+        self.temperature_chart.set_window(self.chart_range)
+        self.update_charts()
         
     def update_charts(self):
-        if len(self.time_history) > 1:
-            # Update CPU chart
-            self.cpu_ax.clear()
-            self.cpu_ax.plot(list(self.time_history), list(self.cpu_history), linewidth=2, color='#007bff')
-            self.cpu_ax.fill_between(list(self.time_history), list(self.cpu_history), alpha=0.3, color='#007bff')
-            self.cpu_ax.set_title('CPU Usage (%)', fontsize=12, fontweight='bold', color='#2c3e50')
-            self.cpu_ax.set_ylabel('CPU %', fontsize=10, color='#2c3e50')
-            self.cpu_ax.set_ylim(0, 100)
-            self.cpu_ax.grid(True, alpha=0.3, color='#bdc3c7')
-            self.cpu_ax.set_facecolor('#f8f9fa')
-            self.cpu_ax.tick_params(colors='#2c3e50')
-            
-            # Format x-axis to show fewer time labels
-            if len(self.time_history) > 10:
-                # Show every 5th time label to prevent overlapping
-                step = len(self.time_history) // 5
-                x_ticks = list(self.time_history)[::step]
-                self.cpu_ax.set_xticks(range(0, len(self.time_history), step))
-                self.cpu_ax.set_xticklabels(x_ticks, rotation=45, ha='right')
-            else:
-                self.cpu_ax.set_xticks(range(len(self.time_history)))
-                self.cpu_ax.set_xticklabels(list(self.time_history), rotation=45, ha='right')
-            
-            # Update Memory chart
-            self.memory_ax.clear()
-            self.memory_ax.plot(list(self.time_history), list(self.memory_history), linewidth=2, color='#dc3545')
-            self.memory_ax.fill_between(list(self.time_history), list(self.memory_history), alpha=0.3, color='#dc3545')
-            self.memory_ax.set_title('Memory Usage (%)', fontsize=12, fontweight='bold', color='#2c3e50')
-            self.memory_ax.set_ylabel('Memory %', fontsize=10, color='#2c3e50')
-            self.memory_ax.set_ylim(0, 100)
-            self.memory_ax.grid(True, alpha=0.3, color='#bdc3c7')
-            self.memory_ax.set_facecolor('#f8f9fa')
-            self.memory_ax.tick_params(colors='#2c3e50')
-            
-            # Format x-axis for memory chart
-            if len(self.time_history) > 10:
-                # Show every 5th time label to prevent overlapping
-                step = len(self.time_history) // 5
-                x_ticks = list(self.time_history)[::step]
-                self.memory_ax.set_xticks(range(0, len(self.time_history), step))
-                self.memory_ax.set_xticklabels(x_ticks, rotation=45, ha='right')
-            else:
-                self.memory_ax.set_xticks(range(len(self.time_history)))
-                self.memory_ax.set_xticklabels(list(self.time_history), rotation=45, ha='right')
-            
-            # Adjust layout to prevent overlap
-            self.cpu_figure.tight_layout()
-            self.memory_figure.tight_layout()
-            
-            self.cpu_canvas.draw()
-            self.memory_canvas.draw()
+        if len(self.history) < 2 or not self.overview_visible():
+            return
+        
+        # Longer ranges come from the downsampled tiers so the point count stays bounded
+        now = self.history.latest(1)[0][-1]
+        times, cpu_values = self.history.series('cpu', self.chart_range, max_points=CHART_MAX_POINTS)
+        self.cpu_chart.set_data(times, cpu_values, now)
+        times, memory_values = self.history.series('memory', self.chart_range, max_points=CHART_MAX_POINTS)
+        self.memory_chart.set_data(times, memory_values, now)
+        times, temperature_values = self.history.series('temperature', self.chart_range, max_points=CHART_MAX_POINTS)
+        self.temperature_chart.set_data(times, temperature_values, now)
+        self.cpu_chart.draw()
+        self.memory_chart.draw()
+        self.temperature_chart.draw()
     
     def update_data(self):
-        try:
-            # Get system information
-            cpu_info = get_cpu_info()
-            memory_info = get_memory_info()
-            disk_info = get_disk_info()
-            network_info = get_network_info()
-            uptime_info = get_uptime_info()
-            processes = get_top_processes(limit=10)
-            
-            # Validate that we got valid data
-            if not all([cpu_info, memory_info, disk_info, network_info, uptime_info]):
-                raise ValueError("Failed to get system information")
-            
-            # Update labels
-            self.cpu_usage_label.config(text=f"CPU Usage: {cpu_info['CPU Usage (%)']:.1f}%")
-            self.cpu_cores_label.config(text=f"Cores: {cpu_info['Logical Cores']} Logical, {cpu_info['Physical Cores']} Physical")
-            freq_text = f"Frequency: {cpu_info['Frequency (MHz)']:.0f} MHz" if cpu_info['Frequency (MHz)'] > 0 else "Frequency: N/A"
-            self.cpu_freq_label.config(text=freq_text)
-            
-            self.memory_usage_label.config(text=f"Memory Usage: {memory_info['Memory Usage (%)']:.1f}%")
-            self.memory_total_label.config(text=f"Total: {memory_info['Total Memory (GB)']:.1f} GB")
-            self.memory_used_label.config(text=f"Used: {memory_info['Used Memory (GB)']:.1f} GB")
-            self.memory_free_label.config(text=f"Free: {memory_info['Free Memory (GB)']:.1f} GB")
-            
-            self.disk_usage_label.config(text=f"Disk Usage: {disk_info['Disk Usage (%)']:.1f}%")
-            self.disk_total_label.config(text=f"Total: {disk_info['Total Disk (GB)']:.1f} GB")
-            self.disk_used_label.config(text=f"Used: {disk_info['Used Disk (GB)']:.1f} GB")
-            self.disk_free_label.config(text=f"Free: {disk_info['Free Disk (GB)']:.1f} GB")
-            
-            self.network_sent_label.config(text=f"Bytes Sent: {network_info['Total Network Sent (GB)']:.2f} GB")
-            self.network_recv_label.config(text=f"Bytes Received: {network_info['Total Network Received (GB)']:.2f} GB")
-            
-            # Format uptime
-            uptime_seconds = uptime_info['Uptime (seconds)'].total_seconds()
-            days = int(uptime_seconds // 86400)
-            hours = int((uptime_seconds % 86400) // 3600)
-            minutes = int((uptime_seconds % 3600) // 60)
-            self.uptime_label.config(text=f"Uptime: {days}d {hours}h {minutes}m")
-            
-            # Update charts data
-            current_time = datetime.now().strftime('%H:%M:%S')
-            self.cpu_history.append(cpu_info['CPU Usage (%)'])
-            self.memory_history.append(memory_info['Memory Usage (%)'])
-            self.time_history.append(current_time)
-            
-            # Update charts
-            self.update_charts()
-            
-            # Update process lists
-            if 'error' not in processes:
-                # Clear existing items
-                for item in self.cpu_tree.get_children():
-                    self.cpu_tree.delete(item)
-                for item in self.memory_tree.get_children():
-                    self.memory_tree.delete(item)
-                
-                # Add CPU processes
-                for proc in processes['top_cpu_processes']:
-                    self.cpu_tree.insert('', 'end', values=(
-                        proc['pid'],
-                        proc['name'][:30],
-                        f"{proc['cpu_percent']:.1f}",
-                        f"{proc['memory_percent']:.1f}",
-                        f"{proc['memory_mb']:.1f}"
-                    ))
-                
-                # Add Memory processes
-                for proc in processes['top_memory_processes']:
-                    self.memory_tree.insert('', 'end', values=(
-                        proc['pid'],
-                        proc['name'][:30],
-                        f"{proc['memory_percent']:.1f}",
-                        f"{proc['memory_mb']:.1f}",
-                        f"{proc['cpu_percent']:.1f}"
-                    ))
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to update data: {str(e)}")
+        """Apply the newest sample from the background sampler, if any"""
+        if self.ui_profile is not None:
+            self.ui_profile.tick()
+            if self.ui_profile.done:
+                self.ui_profile = None
+        if self.profiles:
+            self.check_profiles()
+        # Polls the sampler's latest-value slot; collection itself happens off the Tk thread
+        if self.source is None:
+            sequence, sample = self.sampler.latest()
+        else:
+            sequence, sample = self.fleet.host_sample(self.source)
+        if sample is not None and sequence != self.last_sequence:
+            self.last_sequence = sequence
+            with instrumentation.timer('ui.apply_sample'):
+                self.apply_sample(sample)
+        
+        if self.fleet_visible():
+            self.render_loop.defer('fleet', self.timed('ui.fleet', self.update_fleet))
+        
+        reports = self.terminator.completed()
+        if reports:
+            self.on_kills_finished(reports)
+    
+    def show_update_error(self, error):
+        if self.source is not None:
+            # A remote host's data is not ours to fix; a dialog every frame would lock up the UI
+            self.widgets.config(self.fleet_source_label, text=f"Viewing: {self.source} (cannot show: {error})")
+            return
+        messagebox.showerror("Error", f"Failed to update data: {str(error)}")
+    
+    def timed(self, phase, func, *args):
+        """func(*args) wrapped in an instrumentation timer, for RenderLoop.defer()"""
+        def run():
+            with instrumentation.timer(phase):
+                func(*args)
+        return run
+    
+    def refresh_now(self):
+        """Ask the sampler for an immediate sample"""
+        # Both requests coalesce: repeated refreshes before the next tick cost one sample and one poll
+        self.sampler.trigger()
+        self.render_loop.request()
+    
+    def apply_sample(self, sample):
+        snapshot = sample['data']['snapshot']
+        processes = sample['data']['processes']
+        mounts = sample['data'].get('mounts')
+        fresh = sample['fresh']
+        
+        # Validate that we got valid data
+        if snapshot is None:
+            raise ValueError(f"Failed to get system information: {sample['errors']}")
+        
+        # The labels and the chart history are updated right away; everything
+        # else is queued on the render loop, which spreads it over frames and
+        # drops an update that a newer sample replaces before it runs.
+        # Each phase is timed so the Diagnostics tab can show where UI time goes.
+        with instrumentation.timer('ui.labels'):
+            self.update_labels(snapshot)
+            self.update_sample_timing(sample)
+            self.update_alerts()
+        
+        sensors = sample['data'].get('sensors')
+        self.history.append(snapshot.timestamp, {'cpu': snapshot.cpu_percent, 'memory': snapshot.memory_percent,
+                                                 'temperature': hottest_temperature(sensors)})
+        
+        defer = self.render_loop.defer
+        if self.overview_visible():
+            defer('charts', self.timed('ui.charts', self.update_charts))
+            if mounts is not None and 'mounts' in fresh:
+                defer('mounts', self.timed('ui.mounts', self.update_mounts, mounts))
+            if sensors is not None and 'sensors' in fresh:
+                defer('sensors', self.timed('ui.sensors', self.update_sensors, sensors))
+        
+        # Hidden tables are brought up to date when their tab is selected
+        if processes is not None and 'processes' in fresh and self.processes_visible():
+            defer('process_trees', self.timed('ui.process_trees', self.update_process_trees, processes))
+        
+        if self.history_windows and 'processes' in fresh and self.source is None:
+            defer('process_history', self.timed('ui.process_history', self.update_history_windows))
+        
+        cgroups = sample['data'].get('cgroups')
+        if cgroups is not None and 'cgroups' in fresh and self.containers_visible():
+            defer('containers', self.timed('ui.containers', self.update_containers, cgroups))
+        
+        process_list = sample['data'].get('process_list')
+        if process_list is not None and 'process_list' in fresh and self.explorer_visible():
+            defer('explorer', self.timed('ui.explorer', self.update_explorer, process_list))
+        
+        if self.notebook.select() == str(self.diagnostics_frame):
+            defer('diagnostics', self.timed('ui.diagnostics', self.update_diagnostics, sample))
+    
+    def update_labels(self, snapshot):
+        # Every view below is derived from the same consistent snapshot
+        cpu_info = get_cpu_info(snapshot)
+        memory_info = get_memory_info(snapshot)
+        disk_info = get_disk_info(snapshot)
+        network_info = get_network_info(snapshot)
+        disk_io_info = get_disk_io_info(snapshot)
+        uptime_info = get_uptime_info(snapshot)
+        
+        # Update labels
+        self.widgets.config(self.cpu_usage_label, text=f"CPU Usage: {cpu_info['CPU Usage (%)']:.1f}%")
+        self.widgets.config(self.cpu_cores_label, text=f"Cores: {cpu_info['Logical Cores']} Logical, {cpu_info['Physical Cores']} Physical")
+        freq_text = f"Frequency: {cpu_info['Frequency (MHz)']:.0f} MHz" if cpu_info['Frequency (MHz)'] > 0 else "Frequency: N/A"
+        self.widgets.config(self.cpu_freq_label, text=freq_text)
+        self.widgets.config(self.cpu_breakdown_label, text=f"User: {cpu_info['User (%)']:.1f}% System: {cpu_info['System (%)']:.1f}%")
+        self.widgets.config(self.cpu_wait_label, text=f"I/O Wait: {cpu_info['I/O Wait (%)']:.1f}% Steal: {cpu_info['Steal (%)']:.1f}%")
         
-        # Schedule next update (every 2 seconds)
-        self.root.after(2000, self.update_data)
+        self.widgets.config(self.memory_usage_label, text=f"Memory Usage: {memory_info['Memory Usage (%)']:.1f}%")
+        self.widgets.config(self.memory_total_label, text=f"Total: {memory_info['Total Memory (GB)']:.1f} GB")
+        self.widgets.config(self.memory_used_label, text=f"Used: {memory_info['Used Memory (GB)']:.1f} GB")
+        self.widgets.config(self.memory_free_label, text=f"Free: {memory_info['Free Memory (GB)']:.1f} GB")
+        
+        self.widgets.config(self.disk_usage_label, text=f"Disk Usage: {disk_info['Disk Usage (%)']:.1f}%")
+        self.widgets.config(self.disk_total_label, text=f"Total: {disk_info['Total Disk (GB)']:.1f} GB")
+        self.widgets.config(self.disk_used_label, text=f"Used: {disk_info['Used Disk (GB)']:.1f} GB")
+        self.widgets.config(self.disk_free_label, text=f"Free: {disk_info['Free Disk (GB)']:.1f} GB")
+        
+        self.widgets.config(self.network_sent_label, text=f"Bytes Sent: {network_info['Total Network Sent (GB)']:.2f} GB")
+        self.widgets.config(self.network_recv_label, text=f"Bytes Received: {network_info['Total Network Received (GB)']:.2f} GB")
+        self.widgets.config(self.network_send_rate_label, text=f"Send: {network_info['Send Rate (MB/s)']:.2f} MB/s "
+                                                               f"({network_info['Packets Sent (/s)']:.0f} pkt/s)")
+        self.widgets.config(self.network_recv_rate_label, text=f"Receive: {network_info['Receive Rate (MB/s)']:.2f} MB/s "
+                                                               f"({network_info['Packets Received (/s)']:.0f} pkt/s)")
+        
+        self.widgets.config(self.disk_read_label, text=f"Read: {disk_io_info['Read Rate (MB/s)']:.2f} MB/s ({disk_io_info['Read IOPS']:.0f} IOPS)")
+        self.widgets.config(self.disk_write_label, text=f"Write: {disk_io_info['Write Rate (MB/s)']:.2f} MB/s ({disk_io_info['Write IOPS']:.0f} IOPS)")
+        
+        # Format uptime
+        uptime_seconds = uptime_info['Uptime (seconds)'].total_seconds()
+        days = int(uptime_seconds // 86400)
+        hours = int((uptime_seconds % 86400) // 3600)
+        minutes = int((uptime_seconds % 3600) // 60)
+        self.widgets.config(self.uptime_label, text=f"Uptime: {days}d {hours}h {minutes}m")
+    
+    def update_mounts(self, mounts):
+        # Update filesystem list (already sorted worst first)
+        if mounts is not None:
+            rows = []
+            seen = {}
+            for mount in mounts:
+                if mount.status == 'ok':
+                    usage = (f"{mount.percent:.1f}", f"{mount.free / (1024 ** 3):.1f}", f"{mount.total / (1024 ** 3):.1f}")
+                else:
+                    usage = (mount.status, '--', '--')
+                # A mountpoint can be listed twice when something is mounted over it
+                seen[mount.mountpoint] = seen.get(mount.mountpoint, 0) + 1
+                rows.append((f"{mount.mountpoint}#{seen[mount.mountpoint]}",
+                             (mount.mountpoint, mount.device, mount.fstype) + usage))
+            self.mounts_table.update(rows)
+    
+    def update_sensors(self, readings):
+        rows = []
+        seen = {}
+        for reading in readings:
+            unit = '°C' if reading.kind == 'temperature' else ' RPM'
+            value, high, critical = (f"{number:.0f}{unit}" if number is not None else '--'
+                                     for number in (reading.value, reading.high, reading.critical))
+            if reading.status in ('high', 'critical'):
+                tags = (reading.status,)
+            elif reading.status in ('stale', 'timeout', 'error'):
+                tags = ('inactive',)
+            else:
+                tags = ()
+            # Chips of one kind (e.g. per-socket coretemp) repeat labels, so number the duplicates
+            name = f"{reading.chip} {reading.label}"
+            seen[name] = seen.get(name, 0) + 1
+            rows.append((f"{name}#{seen[name]}", (name, value, high, critical, reading.status), tags))
+        self.sensors_table.update(rows)
+        
+        if self.no_sensors_text.get_visible() != (not readings):
+            self.no_sensors_text.set_visible(not readings)
+            self.temperature_chart.invalidate()
+    
+    def update_process_trees(self, processes):
+        # Reconcile both tables by PID so selections survive refreshes
+        if 'error' not in processes:
+            self.cpu_table.update([(proc['pid'], (
+                proc['pid'],
+                proc['name'][:30],
+                f"{proc['cpu_percent']:.1f}",
+                f"{proc['memory_percent']:.1f}",
+                f"{proc['memory_mb']:.1f}"
+            )) for proc in processes['top_cpu_processes']])
+            
+            self.memory_table.update([(proc['pid'], (
+                proc['pid'],
+                proc['name'][:30],
+                f"{proc['memory_percent']:.1f}",
+                f"{proc['memory_mb']:.1f}",
+                f"{proc['cpu_percent']:.1f}"
+            )) for proc in processes['top_memory_processes']])
+    
+    def update_alerts(self):
+        if self.alert_engine is None:
+            return
+        active = self.alert_engine.active()
+        if active:
+            names = ", ".join(f"{rule} ({key})" if key else rule for rule, key in active[:5])
+            more = f" +{len(active) - 5} more" if len(active) > 5 else ""
+            self.widgets.config(self.alerts_label, text=f"\u26a0 {len(active)} alert(s) firing: {names}{more}", fg='#e74c3c')
+        else:
+            self.widgets.config(self.alerts_label, text="No alerts firing", fg='#27ae60')
+    
+    def update_sample_timing(self, sample):
+        # Show which collector dominated this tick
+        if sample['timings']:
+            slowest = max(sample['timings'], key=sample['timings'].get)
+            self.widgets.config(
+                self.sample_timing_label,
+                text=f"Last sample: {sample['duration'] * 1000:.0f} ms "
+                     f"(slowest: {slowest} {sample['timings'][slowest] * 1000:.0f} ms)")
 
-def main():
+def main(log_dir=None, http_port=None, process_rows=PROCESS_ROWS, alerts=None, fleet_port=None,
+         fleet_host="127.0.0.1", replay=None, replay_speed=1.0, kill_grace=DEFAULT_GRACE):
     root = tk.Tk()
-    app = SystemHealthDashboard(root)
+    app = SystemHealthDashboard(root, log_dir=log_dir, http_port=http_port, process_rows=process_rows, alerts=alerts,
+                                fleet_port=fleet_port, fleet_host=fleet_host, replay=replay, replay_speed=replay_speed,
+                                kill_grace=kill_grace)
     root.mainloop()
 
 if __name__ == "__main__":
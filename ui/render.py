@@ -0,0 +1,141 @@
+import math
+import time
+from collections import OrderedDict
+
+
+class WidgetCache:
+    """Skips Tk configure calls that would not change anything.
+
+    Remembers the options last set on each widget through config() and only
+    passes on the ones whose value differs, so redrawing a view that did not
+    change costs a dict lookup per widget instead of a Tcl round trip and a
+    relayout. A widget must then always be configured through the cache.
+    """
+
+    def __init__(self):
+        self._options = {}
+        self.skipped = 0
+        self.applied = 0
+
+    def config(self, widget, **options):
+        current = self._options.setdefault(widget, {})
+        changed = {key: value for key, value in options.items() if current.get(key, self) != value}
+        self.skipped += len(options) - len(changed)
+        if changed:
+            widget.config(**changed)
+            current.update(changed)
+            self.applied += len(changed)
+
+    def forget(self, widget):
+        """Drop what is known about a destroyed or externally changed widget"""
+        self._options.pop(widget, None)
+
+
+class RenderLoop:
+    """The dashboard's one scheduling loop.
+
+    There is only ever a single pending Tk callback. Every `interval_ms` it
+    calls `poll` (which picks up new samples), and request() pulls that call
+    forward; any number of requests made before it runs are merged into it.
+    Slower view updates are queued with defer() under a name, and a newer
+    update for the same name replaces one that has not run yet. Queued
+    updates run in order until `budget_ms` of a frame is used up; the rest
+    wait for the next frame, so Tk gets to handle input in between.
+
+    Errors from `poll` or a queued update go to `on_error` and do not stop
+    the loop.
+    """
+
+    def __init__(self, root, poll, interval_ms=250, budget_ms=12, on_error=None):
+        self.root = root
+        self.poll = poll
+        self.interval_ms = interval_ms
+        self.budget_ms = budget_ms
+        self.on_error = on_error
+        self._tasks = OrderedDict()
+        self._after = None
+        self._due = None
+        self._next_poll = 0.0
+        self._requested = False
+        self._in_frame = False
+        self.frames = 0
+        self.overruns = 0
+
+    def start(self):
+        self.request()
+
+    def stop(self):
+        if self._after is not None:
+            self.root.after_cancel(self._after)
+            self._after = None
+        self._tasks.clear()
+
+    def discard(self):
+        """Drop the queued updates, e.g. when the data they would show is no longer wanted"""
+        self._tasks.clear()
+
+    def request(self):
+        """Poll as soon as possible"""
+        self._requested = True
+        self._schedule(0)
+
+    def defer(self, name, func):
+        """Run func in a later frame, replacing a queued update with the same name"""
+        self._tasks[name] = func
+        self._schedule(0)
+
+    def pending(self):
+        return list(self._tasks)
+
+    def _schedule(self, delay_ms):
+        # A dialog opened during a frame runs a nested event loop; calls made
+        # from it are picked up when the frame reschedules itself
+        if self._in_frame:
+            return
+        due = time.monotonic() + delay_ms / 1000
+        if self._after is not None:
+            if self._due <= due:
+                return
+            self.root.after_cancel(self._after)
+        self._due = due
+        # Rounded up: firing a hair early would only cost an empty frame
+        self._after = self.root.after(math.ceil(delay_ms), self._frame)
+
+    def _run(self, func):
+        try:
+            func()
+        except Exception as e:
+            if self.on_error is None:
+                raise
+            self.on_error(e)
+
+    def _frame(self):
+        self._after = None
+        self.frames += 1
+        self._in_frame = True
+        try:
+            self._run_frame()
+        finally:
+            self._in_frame = False
+        if self._tasks or self._requested:
+            # Yield to Tk for pending input and continue in the next frame
+            self._schedule(1)
+        else:
+            self._schedule(max(0.0, (self._next_poll - time.monotonic()) * 1000))
+
+    def _run_frame(self):
+        started = time.perf_counter()
+        if self._requested or time.monotonic() >= self._next_poll:
+            self._requested = False
+            self._next_poll = time.monotonic() + self.interval_ms / 1000
+            self._run(self.poll)
+
+        # At least one queued update per frame, so a slow poll cannot starve them
+        ran = False
+        while self._tasks:
+            if ran and (time.perf_counter() - started) * 1000 >= self.budget_ms:
+                self.overruns += 1
+                break
+            name, func = self._tasks.popitem(last=False)
+            self._run(func)
+            ran = True
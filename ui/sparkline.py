@@ -0,0 +1,95 @@
+import tkinter as tk
+
+import numpy as np
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.figure import Figure
+
+# (series key, label, color) for each sparkline, top to bottom
+SPARKLINES = (
+    ('memory_mb', 'RSS (MB)', '#9b59b6'),
+    ('cpu_percent', 'CPU %', '#3498db'),
+    ('num_fds', 'FDs', '#16a085'),
+    ('num_threads', 'Threads', '#e67e22'),
+)
+
+
+class ProcessHistoryWindow:
+    """Small window of sparklines for one process's recorded history.
+
+    The artists are created once; update() only swaps their data and
+    rescales, so keeping a few of these open costs one small draw per
+    process refresh.
+    """
+
+    def __init__(self, root, pid, name, on_close, on_pin):
+        self.pid = pid
+        self.on_close = on_close
+        self.on_pin = on_pin
+        self.window = tk.Toplevel(root)
+        self.window.title(f"{name} (PID {pid}) history")
+        self.window.geometry("520x420")
+        self.window.configure(bg='white')
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        header = tk.Frame(self.window, bg='white')
+        header.pack(fill=tk.X, padx=10, pady=(10, 0))
+        self.trend_label = tk.Label(header, text="Collecting history...", font=('Arial', 10), bg='white', anchor='w')
+        self.trend_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.pinned = tk.BooleanVar(value=False)
+        tk.Checkbutton(header, text="Keep tracking after closing", variable=self.pinned,
+                       bg='white', command=self.on_pin_changed).pack(side=tk.RIGHT)
+
+        figure = Figure(figsize=(5, 3.6), dpi=100)
+        figure.subplots_adjust(left=0.14, right=0.97, top=0.97, bottom=0.08, hspace=0.15)
+        self.axes = []
+        self.lines = []
+        for index, (_, label, color) in enumerate(SPARKLINES):
+            ax = figure.add_subplot(len(SPARKLINES), 1, index + 1)
+            ax.set_ylabel(label, fontsize=8)
+            ax.tick_params(labelsize=7)
+            ax.grid(True, alpha=0.3)
+            if index < len(SPARKLINES) - 1:
+                ax.tick_params(labelbottom=False)
+            line, = ax.plot([], [], linewidth=1.5, color=color)
+            self.axes.append(ax)
+            self.lines.append(line)
+        self.axes[-1].set_xlabel("Minutes ago", fontsize=8)
+        self.canvas = FigureCanvasTkAgg(figure, self.window)
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+    def lift(self):
+        self.window.deiconify()
+        self.window.lift()
+
+    def on_pin_changed(self):
+        self.on_pin(self.pid, self.pinned.get())
+
+    def update(self, series):
+        """Redraw from a ProcessHistory.series() dict (None once it is evicted)"""
+        if series is None:
+            self.trend_label.config(text="No history for this process (it may have exited)", fg='#7f8c8d')
+            return
+        timestamps = series['timestamps']
+        if len(timestamps) == 0:
+            return
+        minutes = (timestamps - timestamps[-1]) / 60.0
+        for (key, _, _), ax, line in zip(SPARKLINES, self.axes, self.lines):
+            values = series[key]
+            line.set_data(minutes, values)
+            low, high = float(np.min(values)), float(np.max(values))
+            padding = max((high - low) * 0.1, 0.5)
+            ax.set_ylim(low - padding, high + padding)
+            ax.set_xlim(min(float(minutes[0]), -1.0), 0)
+
+        trend = series['rss_trend']
+        text = (f"RSS {series['memory_mb'][-1]:.1f} MB, trend {trend['slope_per_min']:+.2f} MB/min "
+                f"(r² {trend['r2']:.2f} over {trend['span'] / 60:.0f} min)")
+        if trend['growing']:
+            self.trend_label.config(text=f"⚠ Steady growth: {text}", fg='#e74c3c')
+        else:
+            self.trend_label.config(text=text, fg='#2c3e50')
+        self.canvas.draw_idle()
+
+    def close(self):
+        self.on_close(self.pid, self.pinned.get())
+        self.window.destroy()
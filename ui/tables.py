@@ -0,0 +1,54 @@
+class TreeTable:
+    """Keeps a flat ttk.Treeview in sync with a ranked list of rows.
+
+    Rows are keyed by a stable id (the PID for process tables). update()
+    reconciles the widget against the new list instead of rebuilding it:
+    rows that disappeared are deleted, new ones inserted at their rank,
+    changed rows are edited in place and only rows out of position are
+    moved. Unchanged rows cost no Tk calls at all, and because item ids
+    survive across refreshes the user's selection does too.
+
+    A row may carry a third element, a tuple of Treeview tags; tags are
+    compared along with the values, so they also cost nothing unless they
+    change.
+    """
+
+    def __init__(self, tree):
+        self.tree = tree
+        self._order = []
+        self._content = {}
+
+    def update(self, rows):
+        """rows is an ordered list of (key, values) or (key, values, tags) with values a tuple of strings"""
+        tree = self.tree
+        rows = [(row[0], (row[1], row[2] if len(row) > 2 else ())) for row in rows]
+        wanted = {str(key): content for key, content in rows}
+
+        stale = [iid for iid in self._order if iid not in wanted]
+        if stale:
+            tree.delete(*stale)
+            for iid in stale:
+                del self._content[iid]
+            self._order = [iid for iid in self._order if iid in wanted]
+
+        for index, (key, content) in enumerate(rows):
+            iid = str(key)
+            previous = self._content.get(iid)
+            if previous is None:
+                tree.insert('', index, iid=iid, values=content[0], tags=content[1])
+                self._order.insert(index, iid)
+                self._content[iid] = content
+                continue
+            if previous != content:
+                tree.item(iid, values=content[0], tags=content[1])
+                self._content[iid] = content
+            if self._order[index] != iid:
+                tree.move(iid, '', index)
+                self._order.remove(iid)
+                self._order.insert(index, iid)
+
+    def clear(self):
+        if self._order:
+            self.tree.delete(*self._order)
+        self._order = []
+        self._content = {}
@@ -0,0 +1,93 @@
+"""
+Headless collector: samples the system_info collectors on an interval and
+hands every sample to a list of sinks. Nothing here imports tkinter or
+matplotlib, so it is safe to run on servers without a display.
+"""
+
+import json
+import sys
+import time
+
+from utils.sampler import Sampler, default_collectors
+
+
+def sample_record(sample):
+    """Flatten a Sampler sample into a JSON-serializable dict"""
+    data = sample['data']
+    record = {"timestamp": sample['timestamp']}
+    if data.get('snapshot') is not None:
+        for field, value in data['snapshot']._asdict().items():
+            # Per-interface/per-device rates are namedtuples; keep their field names
+            if isinstance(value, tuple) and value and hasattr(value[0], '_asdict'):
+                value = [item._asdict() for item in value]
+            record[field] = value
+    if data.get('mounts') is not None:
+        record["mounts"] = [mount._asdict() for mount in data['mounts']]
+    if data.get('processes') is not None:
+        record["processes"] = data['processes']
+    if data.get('cgroups') is not None:
+        record["cgroups"] = [cgroup._asdict() for cgroup in data['cgroups']]
+    if data.get('sensors') is not None:
+        record["sensors"] = [reading._asdict() for reading in data['sensors']]
+    if data.get('self') is not None:
+        record["self"] = data['self']
+    record["timings"] = sample['timings']
+    if sample['errors']:
+        record["errors"] = sample['errors']
+    return record
+
+
+class JsonLinesSink:
+    """Writes one JSON object per sample to a file path, or stdout for '-'"""
+
+    def __init__(self, path='-'):
+        self.path = path
+        self._file = sys.stdout if path == '-' else open(path, 'a', encoding='utf-8')
+
+    def __call__(self, sample):
+        self._file.write(json.dumps(sample_record(sample), default=str))
+        self._file.write("\n")
+        self._file.flush()
+
+    def close(self):
+        if self._file is not sys.stdout:
+            self._file.close()
+
+
+def run_agent(sinks, interval=1.0, count=None, process_limit=10, profile_ticks=0, profile_path=None):
+    """Collect samples and pass each one to every sink.
+
+    Host gauges are sampled every `interval` seconds; slower collectors run
+    on their own schedule (see default_collectors). Runs until `count`
+    samples have been taken (forever if None). Sampling happens on the
+    calling thread, since there is no UI to keep responsive.
+
+    With profile_ticks > 0 the first ticks are profiled and written to
+    profile_path (see utils.instrumentation.ProfileCapture).
+    """
+    collectors = default_collectors(process_limit, interval)
+    if process_limit <= 0:
+        del collectors['processes']
+    sampler = Sampler(collectors, interval=interval)
+    profile = sampler.start_profile(profile_ticks, profile_path) if profile_ticks > 0 else None
+
+    taken = 0
+    try:
+        while count is None or taken < count:
+            sample = sampler.run_due()
+            if sample is None:
+                time.sleep(sampler.seconds_until_due())
+                continue
+            for sink in sinks:
+                sink(sample)
+            taken += 1
+
+            if count is None or taken < count:
+                time.sleep(sampler.seconds_until_due())
+    finally:
+        if profile is not None:
+            profile.finish()
+        for sink in sinks:
+            close = getattr(sink, 'close', None)
+            if close is not None:
+                close()
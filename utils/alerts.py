@@ -0,0 +1,434 @@
+"""
+Threshold alerting over the sample stream.
+
+Rules are evaluated against the flat records produced by
+utils.agent.sample_record, so the same engine runs live (as a Sampler
+listener or agent sink) and over a recorded JSON lines file. Each rule
+keeps an incremental rolling window per series, making evaluation O(1)
+per sample however long the window is.
+
+A rules file is JSON:
+
+    {
+      "rules": [
+        {"name": "cpu-high", "metric": "cpu_percent", "op": ">", "threshold": 90,
+         "for": 60, "clear": 80},
+        {"name": "disk-full", "scope": "mount", "metric": "free_gb", "op": "<",
+         "threshold": 5, "clear": 6, "severity": "critical"},
+        {"name": "rss-leak", "scope": "process", "metric": "rss_growth_mb_min",
+         "op": ">", "threshold": 100, "for": 120}
+      ],
+      "sinks": [
+        {"type": "log", "path": "alerts.log"},
+        {"type": "webhook", "url": "http://127.0.0.1:9000/alerts"},
+        {"type": "desktop"}
+      ]
+    }
+"""
+
+import json
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+import urllib.request
+from collections import deque, namedtuple
+
+from utils.agent import sample_record
+
+GB = 1024 ** 3
+MB = 1024 ** 2
+
+Alert = namedtuple("Alert", [
+    "rule", "key", "state", "severity", "value", "threshold", "timestamp", "message",
+])
+
+OPERATORS = {
+    ">": lambda value, threshold: value > threshold,
+    ">=": lambda value, threshold: value >= threshold,
+    "<": lambda value, threshold: value < threshold,
+    "<=": lambda value, threshold: value <= threshold,
+}
+
+SCOPES = ("host", "mount", "process")
+
+
+def host_metrics(record):
+    """Scalar host metrics of a record, plus a few derived conveniences"""
+    metrics = {field: value for field, value in record.items()
+               if isinstance(value, (int, float)) and not isinstance(value, bool) and field != "timestamp"}
+    if "memory_free" in metrics:
+        metrics["memory_free_gb"] = metrics["memory_free"] / GB
+    if "disk_free" in metrics:
+        metrics["disk_free_gb"] = metrics["disk_free"] / GB
+    temperatures = [reading["value"] for reading in record.get("sensors") or ()
+                    if reading["kind"] == "temperature" and reading["value"] is not None]
+    if temperatures:
+        metrics["temperature_max_c"] = max(temperatures)
+    return metrics
+
+
+def mount_metrics(record):
+    """{mountpoint: metrics} for every mount that answered"""
+    result = {}
+    for mount in record.get("mounts") or ():
+        if mount.get("status") != "ok":
+            continue
+        result[mount["mountpoint"]] = {
+            "percent": mount["percent"],
+            "free_gb": mount["free"] / GB,
+            "used_gb": mount["used"] / GB,
+        }
+    return result
+
+
+def process_metrics(record):
+    """{"name (pid)": metrics} for every process in any of the record's top lists"""
+    result = {}
+    processes = record.get("processes") or {}
+    for key, rows in processes.items():
+        if not key.startswith("top_"):
+            continue
+        for proc in rows:
+            result[f"{proc['name']} ({proc['pid']})"] = {
+                "cpu_percent": proc["cpu_percent"],
+                "memory_percent": proc["memory_percent"],
+                "memory_mb": proc["memory_mb"],
+                "rss_growth_mb_min": proc.get("rss_growth_mb_s", 0.0) * 60,
+            }
+    # Steady RSS growth found by the per-process trend detector
+    for leak in processes.get("leaking_processes") or ():
+        key = f"{leak['name']} ({leak['pid']})"
+        result.setdefault(key, {})["rss_trend_mb_min"] = leak["rss_trend_mb_min"]
+    return result
+
+
+_SCOPE_METRICS = {
+    "mount": mount_metrics,
+    "process": process_metrics,
+}
+
+
+class RollingWindow:
+    """Min, max and mean of the values seen in the last `seconds`.
+
+    Monotonic deques give amortized O(1) min/max per append and a running
+    sum gives the mean, so no sample is ever rescanned.
+    """
+
+    __slots__ = ("seconds", "_values", "_mins", "_maxes", "_sum")
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self._values = deque()
+        self._mins = deque()
+        self._maxes = deque()
+        self._sum = 0.0
+
+    def append(self, timestamp, value):
+        self._values.append((timestamp, value))
+        self._sum += value
+        while self._mins and self._mins[-1][1] >= value:
+            self._mins.pop()
+        self._mins.append((timestamp, value))
+        while self._maxes and self._maxes[-1][1] <= value:
+            self._maxes.pop()
+        self._maxes.append((timestamp, value))
+
+        # Keep the newest sample at or before the window start so the window spans `seconds`
+        horizon = timestamp - self.seconds
+        while len(self._values) > 1 and self._values[1][0] <= horizon:
+            _, expired = self._values.popleft()
+            self._sum -= expired
+            oldest = self._values[0][0]
+            if self._mins[0][0] < oldest:
+                self._mins.popleft()
+            if self._maxes[0][0] < oldest:
+                self._maxes.popleft()
+
+    def span(self):
+        """Seconds covered by the samples currently in the window"""
+        if not self._values:
+            return 0.0
+        return self._values[-1][0] - self._values[0][0]
+
+    def min(self):
+        return self._mins[0][1]
+
+    def max(self):
+        return self._maxes[0][1]
+
+    def mean(self):
+        return self._sum / len(self._values)
+
+    def last(self):
+        return self._values[-1][1]
+
+
+class AlertRule:
+    """One threshold condition.
+
+    The rule fires when `metric` has been on the wrong side of `threshold`
+    for `for` seconds ("CPU > 90 for 60 s" means the window minimum is above
+    90), or when the window mean crosses it if stat is "mean". It resolves
+    once the latest value is back on the good side of `clear` (defaults to
+    the threshold), which gives hysteresis around the boundary.
+    """
+
+    def __init__(self, name, metric, op, threshold, duration=0, clear=None,
+                 scope="host", stat="sustained", severity="warning", repeat=0):
+        if op not in OPERATORS:
+            raise ValueError(f"Rule {name!r}: unknown operator {op!r}")
+        if scope not in SCOPES:
+            raise ValueError(f"Rule {name!r}: scope must be one of {', '.join(SCOPES)}")
+        if stat not in ("sustained", "mean"):
+            raise ValueError(f"Rule {name!r}: stat must be 'sustained' or 'mean'")
+        self.name = name
+        self.metric = metric
+        self.op = op
+        self.threshold = float(threshold)
+        self.duration = float(duration)
+        self.clear = self.threshold if clear is None else float(clear)
+        self.scope = scope
+        self.stat = stat
+        self.severity = severity
+        self.repeat = float(repeat)
+        self._breached = OPERATORS[op]
+
+    @classmethod
+    def from_config(cls, config):
+        try:
+            return cls(
+                name=config["name"],
+                metric=config["metric"],
+                op=config.get("op", ">"),
+                threshold=config["threshold"],
+                duration=config.get("for", 0),
+                clear=config.get("clear"),
+                scope=config.get("scope", "host"),
+                stat=config.get("stat", "sustained"),
+                severity=config.get("severity", "warning"),
+                repeat=config.get("repeat", 0),
+            )
+        except KeyError as e:
+            raise ValueError(f"Alert rule {config.get('name', config)!r} is missing {e.args[0]!r}") from None
+
+    def window_value(self, window):
+        """The value compared against the threshold"""
+        if self.stat == "mean":
+            return window.mean()
+        # Sustained: every sample in the window must be in breach
+        return window.min() if self.op in (">", ">=") else window.max()
+
+    def firing(self, window):
+        return window.span() >= self.duration and self._breached(self.window_value(window), self.threshold)
+
+    def resolved(self, window):
+        return not self._breached(window.last(), self.clear)
+
+    def describe(self, key, value):
+        subject = f"{self.metric} on {key}" if key else self.metric
+        suffix = f" for {self.duration:g}s" if self.duration else ""
+        return f"{self.name}: {subject} = {value:.2f} ({self.op} {self.threshold:g}{suffix})"
+
+
+class _SeriesState:
+    __slots__ = ("window", "firing", "notified_at", "seen_at")
+
+    def __init__(self, seconds):
+        self.window = RollingWindow(seconds)
+        self.firing = False
+        self.notified_at = 0.0
+        self.seen_at = 0.0
+
+
+class AlertEngine:
+    """Evaluates rules on each record and sends state changes to sinks.
+
+    Every (rule, series) pair is deduplicated: sinks hear about an alert
+    when it starts firing, again every `repeat` seconds while it keeps
+    firing (if the rule sets repeat), and once when it resolves. Mount and
+    process series that stop appearing for `stale_after` seconds (or the
+    rule's duration, if longer) are resolved and forgotten.
+    """
+
+    def __init__(self, rules, sinks=(), stale_after=60.0):
+        self.rules = list(rules)
+        self.sinks = list(sinks)
+        self.stale_after = stale_after
+        self._lock = threading.Lock()
+        self._states = {}
+
+    def __call__(self, sample):
+        """Sampler listener / agent sink entry point"""
+        if 'snapshot' in sample['fresh']:
+            self.evaluate(sample_record(sample))
+
+    def evaluate(self, record):
+        """Evaluate every rule against one record and return the alerts raised"""
+        timestamp = record["timestamp"]
+        series_by_scope = {"host": {"": host_metrics(record)}}
+        alerts = []
+
+        with self._lock:
+            for rule in self.rules:
+                series = series_by_scope.get(rule.scope)
+                if series is None:
+                    series = series_by_scope[rule.scope] = _SCOPE_METRICS[rule.scope](record)
+                for key, metrics in series.items():
+                    value = metrics.get(rule.metric)
+                    if value is None:
+                        continue
+                    alert = self._update(rule, key, timestamp, value)
+                    if alert is not None:
+                        alerts.append(alert)
+                if rule.scope != "host":
+                    alerts.extend(self._expire(rule, series, timestamp))
+
+        for alert in alerts:
+            for sink in self.sinks:
+                sink(alert)
+        return alerts
+
+    def active(self):
+        """Return the currently firing alerts as (rule, key) pairs"""
+        with self._lock:
+            return [(rule.name, key) for (rule, key), state in self._states.items() if state.firing]
+
+    def _update(self, rule, key, timestamp, value):
+        state = self._states.get((rule, key))
+        if state is None:
+            state = self._states[(rule, key)] = _SeriesState(rule.duration)
+        state.window.append(timestamp, value)
+        state.seen_at = timestamp
+
+        if not state.firing:
+            if rule.firing(state.window):
+                state.firing = True
+                state.notified_at = timestamp
+                return self._alert(rule, key, "firing", rule.window_value(state.window), timestamp)
+        elif rule.resolved(state.window):
+            state.firing = False
+            return self._alert(rule, key, "resolved", value, timestamp)
+        elif rule.repeat and timestamp - state.notified_at >= rule.repeat:
+            state.notified_at = timestamp
+            return self._alert(rule, key, "firing", rule.window_value(state.window), timestamp)
+        return None
+
+    def _expire(self, rule, series, timestamp):
+        expired = []
+        horizon = timestamp - max(self.stale_after, rule.duration)
+        for (state_rule, key), state in list(self._states.items()):
+            if state_rule is not rule or key in series or state.seen_at > horizon:
+                continue
+            del self._states[(rule, key)]
+            if state.firing:
+                expired.append(self._alert(rule, key, "resolved", state.window.last(), timestamp))
+        return expired
+
+    @staticmethod
+    def _alert(rule, key, state, value, timestamp):
+        message = rule.describe(key, value)
+        if state == "resolved":
+            message = f"RESOLVED {message}"
+        return Alert(rule.name, key, state, rule.severity, value, rule.threshold, timestamp, message)
+
+
+class LogFileSink:
+    """Appends one JSON object per alert to a file"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, alert):
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(alert._asdict()) + "\n")
+
+
+class _BackgroundSink:
+    """Delivers alerts from a worker thread so a slow receiver never stalls sampling"""
+
+    def __init__(self, max_pending=100):
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def __call__(self, alert):
+        try:
+            self._queue.put_nowait(alert)
+        except queue.Full:
+            print(f"Dropping alert, {type(self).__name__} is backed up: {alert.message}", file=sys.stderr)
+
+    def _run(self):
+        while True:
+            alert = self._queue.get()
+            try:
+                self.deliver(alert)
+            except Exception as e:
+                print(f"{type(self).__name__} failed: {e}", file=sys.stderr)
+
+    def deliver(self, alert):
+        raise NotImplementedError
+
+
+class WebhookSink(_BackgroundSink):
+    """POSTs each alert as JSON to a URL, e.g. a local relay"""
+
+    def __init__(self, url, timeout=5.0):
+        self.url = url
+        self.timeout = timeout
+        super().__init__()
+
+    def deliver(self, alert):
+        request = urllib.request.Request(self.url, data=json.dumps(alert._asdict()).encode("utf-8"),
+                                         headers={"Content-Type": "application/json"}, method="POST")
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class DesktopSink(_BackgroundSink):
+    """Shows a desktop notification via notify-send (Linux) or osascript (macOS)"""
+
+    def deliver(self, alert):
+        title = f"System Health: {alert.rule}"
+        if sys.platform == "darwin":
+            script = f"display notification {json.dumps(alert.message)} with title {json.dumps(title)}"
+            command = ["osascript", "-e", script]
+        elif shutil.which("notify-send"):
+            urgency = "critical" if alert.severity == "critical" and alert.state == "firing" else "normal"
+            command = ["notify-send", "-u", urgency, title, alert.message]
+        else:
+            return
+        subprocess.run(command, timeout=10, check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def make_sink(config):
+    sink_type = config.get("type")
+    if sink_type == "log":
+        return LogFileSink(config["path"])
+    if sink_type == "webhook":
+        return WebhookSink(config["url"], timeout=config.get("timeout", 5.0))
+    if sink_type == "desktop":
+        return DesktopSink()
+    raise ValueError(f"Unknown alert sink type {sink_type!r}")
+
+
+def load_alert_engine(path, extra_sinks=()):
+    """Build an AlertEngine from a JSON rules file"""
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    rules = [AlertRule.from_config(rule) for rule in config.get("rules", [])]
+    sinks = [make_sink(sink) for sink in config.get("sinks", [])]
+    return AlertEngine(rules, sinks + list(extra_sinks), stale_after=config.get("stale_after", 60.0))
+
+
+def replay_records(engine, lines):
+    """Run recorded JSON lines (agent output) through an engine, returning every alert"""
+    alerts = []
+    for line in lines:
+        line = line.strip()
+        if line:
+            alerts.extend(engine.evaluate(json.loads(line)))
+    return alerts
@@ -0,0 +1,217 @@
+"""
+Per-cgroup resource accounting for cgroup v2 hosts.
+
+CgroupMonitor keeps the list of cgroups under a cgroup2 mount and, on each
+sample(), reads cpu.stat, memory.current, memory.stat, io.stat and the
+cpu/memory PSI files of every one of them, turning the cumulative counters
+into per-second rates against the previous reading. The hierarchy is only
+re-walked when the root's cgroup.stat reports a different number of
+descendants, a cgroup vanishes mid-read, or `rescan_interval` has passed
+(which catches a create and a remove that cancel out).
+
+`root` can be any directory laid out like cgroupfs, e.g. a fake tree
+written by benchmarks/bench_cgroups.py.
+"""
+
+import os
+import threading
+import time
+from collections import namedtuple
+
+CgroupUsage = namedtuple("CgroupUsage", [
+    "path", "cpu_percent", "throttled_percent", "throttled_ms", "memory_bytes", "memory_anon",
+    "memory_file", "read_bytes", "write_bytes", "cpu_pressure", "memory_pressure", "memory_full_pressure",
+])
+
+# Cumulative counters kept between samples for the rates
+_Counters = namedtuple("_Counters", ["usage_usec", "throttled_usec", "nr_periods", "nr_throttled", "rbytes", "wbytes"])
+
+DEFAULT_ROOT = "/sys/fs/cgroup"
+
+# Large enough for memory.stat and io.stat of a busy cgroup
+_READ_SIZE = 65536
+
+
+def find_cgroup2_root(root=DEFAULT_ROOT):
+    """The cgroup2 mount at `root` (unified or hybrid layout), or None"""
+    for candidate in (root, os.path.join(root, "unified")):
+        if os.path.exists(os.path.join(candidate, "cgroup.controllers")):
+            return candidate
+    return None
+
+
+def _read(path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        return os.read(fd, _READ_SIZE)
+    finally:
+        os.close(fd)
+
+
+def _read_optional(path):
+    # Controllers that are not enabled for a cgroup simply have no file
+    try:
+        return _read(path)
+    except OSError:
+        return b""
+
+
+def parse_flat_keyed(data, wanted):
+    """{key: int} for the `wanted` keys of a "key value" per line file (cpu.stat, memory.stat)"""
+    values = {}
+    for line in data.splitlines():
+        key, _, value = line.partition(b" ")
+        if key in wanted:
+            values[key] = int(value)
+    return values
+
+
+def parse_io_stat(data):
+    """(read bytes, written bytes) summed over every device in io.stat"""
+    read = written = 0
+    for line in data.splitlines():
+        for item in line.split()[1:]:
+            if item.startswith(b"rbytes="):
+                read += int(item[7:])
+            elif item.startswith(b"wbytes="):
+                written += int(item[7:])
+    return read, written
+
+
+def parse_pressure(data):
+    """(some avg10, full avg10) from a PSI file; full is 0.0 when absent (cpu on older kernels)"""
+    some = full = 0.0
+    for line in data.splitlines():
+        kind, _, rest = line.partition(b" ")
+        if not rest.startswith(b"avg10="):
+            continue
+        value = float(rest[6:rest.index(b" ")])
+        if kind == b"some":
+            some = value
+        elif kind == b"full":
+            full = value
+    return some, full
+
+
+# Files read from every cgroup, in the order _read_cgroup() expects them
+_FILES = ("cpu.stat", "memory.current", "memory.stat", "io.stat", "cpu.pressure", "memory.pressure")
+
+_CPU_KEYS = frozenset([b"usage_usec", b"throttled_usec", b"nr_periods", b"nr_throttled"])
+_MEMORY_STAT_KEYS = frozenset([b"anon", b"file"])
+
+
+class CgroupMonitor:
+    """Samples every cgroup below `root`; see the module docstring.
+
+    The root cgroup itself is skipped since it is the whole host.
+    """
+
+    def __init__(self, root=None, rescan_interval=30.0):
+        self.root = root or find_cgroup2_root() or DEFAULT_ROOT
+        self.rescan_interval = rescan_interval
+        self._lock = threading.Lock()
+        # [(directory, name relative to root, paths of _FILES)], built by _walk()
+        self._cgroups = None
+        self._descendants = None
+        self._scanned_at = 0.0
+        self._previous = {}
+        self.scans = 0
+
+    def _count_descendants(self):
+        try:
+            stat = parse_flat_keyed(_read(os.path.join(self.root, "cgroup.stat")), (b"nr_descendants",))
+        except OSError:
+            return None
+        return stat.get(b"nr_descendants")
+
+    def _changed(self):
+        if self._cgroups is None or time.monotonic() - self._scanned_at >= self.rescan_interval:
+            return True
+        return self._count_descendants() != self._descendants
+
+    def _walk(self):
+        self._descendants = self._count_descendants()
+        paths = []
+        pending = [self.root]
+        while pending:
+            directory = pending.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            paths.append(entry.path)
+                            pending.append(entry.path)
+            except FileNotFoundError:
+                continue
+        paths.sort()
+        prefix = len(self.root)
+        self._cgroups = [(path, path[prefix:], tuple(os.path.join(path, name) for name in _FILES))
+                         for path in paths]
+        self._scanned_at = time.monotonic()
+        self.scans += 1
+
+    def sample(self):
+        """Return CgroupUsage for every cgroup, worst (most throttled or memory-stalled) first"""
+        with self._lock:
+            if self._changed():
+                self._walk()
+            now = time.monotonic()
+            results = []
+            counters = {}
+            vanished = False
+            for path, name, files in self._cgroups:
+                try:
+                    usage, current = self._read_cgroup(path, name, files, now)
+                except FileNotFoundError:
+                    # Removed since the last walk; pick up the new layout next time
+                    vanished = vanished or not os.path.isdir(path)
+                    continue
+                counters[path] = current
+                results.append(usage)
+            if vanished:
+                self._cgroups = None
+            self._previous = counters
+
+        results.sort(key=lambda usage: -max(usage.throttled_percent, usage.memory_pressure))
+        return results
+
+    def _read_cgroup(self, path, name, files, now):
+        cpu_stat, memory_current, memory_stat, io_stat, cpu_psi, memory_psi = files
+        # cpu.stat exists in every cgroup whatever its controllers, so its absence means the cgroup is gone
+        cpu = parse_flat_keyed(_read(cpu_stat), _CPU_KEYS)
+        memory = _read_optional(memory_current)
+        memory_stat = parse_flat_keyed(_read_optional(memory_stat), _MEMORY_STAT_KEYS)
+        read_bytes, write_bytes = parse_io_stat(_read_optional(io_stat))
+        cpu_pressure, _ = parse_pressure(_read_optional(cpu_psi))
+        memory_pressure, memory_full = parse_pressure(_read_optional(memory_psi))
+
+        current = (_Counters(cpu.get(b"usage_usec", 0), cpu.get(b"throttled_usec", 0), cpu.get(b"nr_periods", 0),
+                             cpu.get(b"nr_throttled", 0), read_bytes, write_bytes), now)
+        rates = self._rates(path, current)
+        return CgroupUsage(
+            path=name or "/",
+            cpu_percent=rates.usage_usec / 1e4,
+            throttled_percent=rates.nr_throttled / rates.nr_periods * 100 if rates.nr_periods else 0.0,
+            throttled_ms=rates.throttled_usec / 1e3,
+            memory_bytes=int(memory) if memory.strip() else 0,
+            memory_anon=memory_stat.get(b"anon", 0),
+            memory_file=memory_stat.get(b"file", 0),
+            read_bytes=rates.rbytes,
+            write_bytes=rates.wbytes,
+            cpu_pressure=cpu_pressure,
+            memory_pressure=memory_pressure,
+            memory_full_pressure=memory_full,
+        ), current
+
+    def _rates(self, path, current):
+        """Per-second deltas against the previous reading (zeros for a new or recreated cgroup)"""
+        counters, now = current
+        previous = self._previous.get(path)
+        if previous is None or now <= previous[1]:
+            return _Counters(0, 0, 0, 0, 0.0, 0.0)
+        before, then = previous
+        # cgroup counters are 64-bit and never wrap, so going backwards means the cgroup was recreated
+        if any(after < earlier for after, earlier in zip(counters, before)):
+            return _Counters(0, 0, 0, 0, 0.0, 0.0)
+        elapsed = now - then
+        return _Counters(*((after - earlier) / elapsed for after, earlier in zip(counters, before)))
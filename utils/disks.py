@@ -0,0 +1,164 @@
+import os
+import select
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+import psutil
+
+MountUsage = namedtuple("MountUsage", [
+    "mountpoint", "device", "fstype", "total", "used", "free", "percent", "status",
+])
+
+# Kernel and container filesystems that do not represent real storage
+PSEUDO_FILESYSTEMS = frozenset([
+    "autofs", "binfmt_misc", "bpf", "cgroup", "cgroup2", "configfs", "debugfs", "devpts",
+    "devtmpfs", "efivarfs", "fusectl", "hugetlbfs", "mqueue", "nsfs", "overlay", "proc",
+    "pstore", "ramfs", "rpc_pipefs", "securityfs", "selinuxfs", "squashfs", "sysfs",
+    "tmpfs", "tracefs", "fuse.lxcfs", "fuse.gvfsd-fuse", "fuse.portal",
+])
+
+_MOUNTS_FILE = "/proc/self/mounts"
+
+
+class MountTable:
+    """Cached list of real mounts, re-scanned only when the mount table changes.
+
+    On Linux the kernel flags /proc/self/mounts with POLLPRI whenever
+    something is mounted or unmounted, so checking for changes is a single
+    non-blocking poll(). Elsewhere the table is re-scanned every
+    `rescan_interval` seconds.
+    """
+
+    def __init__(self, exclude_fstypes=PSEUDO_FILESYSTEMS, rescan_interval=60.0):
+        self.exclude_fstypes = frozenset(exclude_fstypes)
+        self.rescan_interval = rescan_interval
+        self._lock = threading.Lock()
+        self._mounts = None
+        self._scanned_at = 0.0
+        self._poller = None
+        self._mounts_file = None
+
+        if hasattr(select, "poll") and os.path.exists(_MOUNTS_FILE):
+            try:
+                self._mounts_file = open(_MOUNTS_FILE, "rb")
+                self._poller = select.poll()
+                self._poller.register(self._mounts_file, select.POLLPRI | select.POLLERR)
+            except OSError:
+                self._mounts_file = None
+                self._poller = None
+
+    def mounts(self):
+        """Return the current list of psutil partitions for real filesystems"""
+        with self._lock:
+            if self._mounts is None or self._changed():
+                self._mounts = self._scan()
+                self._scanned_at = time.monotonic()
+            return self._mounts
+
+    def _changed(self):
+        if self._poller is not None:
+            return bool(self._poller.poll(0))
+        return time.monotonic() - self._scanned_at >= self.rescan_interval
+
+    def _scan(self):
+        if self._mounts_file is not None:
+            # Reading the file to the end re-arms the change notification
+            self._mounts_file.seek(0)
+            self._mounts_file.read()
+
+        mounts = []
+        seen_devices = set()
+        for partition in psutil.disk_partitions(all=True):
+            if partition.fstype in self.exclude_fstypes or not partition.fstype:
+                continue
+            # Bind mounts of one block device report identical usage; keep the first
+            if partition.device.startswith("/dev/"):
+                if partition.device in seen_devices:
+                    continue
+                seen_devices.add(partition.device)
+            mounts.append(partition)
+        return mounts
+
+
+def _probe(mountpoint):
+    """Start psutil.disk_usage(mountpoint) on its own daemon thread; returns a Future.
+
+    A statvfs() stuck on a dead server holds only its own thread, so it can
+    neither use up a shared pool that the healthy mounts need nor keep the
+    process from exiting.
+    """
+    future = Future()
+
+    def run():
+        try:
+            future.set_result(psutil.disk_usage(mountpoint))
+        except Exception as e:
+            future.set_exception(e)
+    threading.Thread(target=run, name="disk-usage", daemon=True).start()
+    return future
+
+
+class DiskMonitor:
+    """Samples disk_usage for every real mount concurrently with per-mount timeouts.
+
+    A mount whose statvfs() does not return within `timeout` (typically a
+    hung NFS server) is reported with status 'timeout' and is not queried
+    again until its outstanding call finishes, so it can neither stall the
+    tick nor pile up blocked threads: there is at most one per hung mount.
+    """
+
+    def __init__(self, mount_table=None, timeout=0.5):
+        self.mount_table = mount_table or MountTable()
+        self.timeout = timeout
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def sample(self):
+        """Return MountUsage for every mount, worst (fullest or unresponsive) first"""
+        mounts = self.mount_table.mounts()
+        futures = {}
+        still_hung = set()
+        with self._lock:
+            for partition in mounts:
+                future = self._pending.get(partition.mountpoint)
+                if future is None or future.done():
+                    future = _probe(partition.mountpoint)
+                    self._pending[partition.mountpoint] = future
+                else:
+                    still_hung.add(partition.mountpoint)
+                futures[partition.mountpoint] = future
+
+            # Forget mounts that have been unmounted
+            for mountpoint in list(self._pending):
+                if mountpoint not in futures:
+                    del self._pending[mountpoint]
+
+        deadline = time.monotonic() + self.timeout
+        results = []
+        for partition in mounts:
+            future = futures[partition.mountpoint]
+            try:
+                # Calls left over from an earlier tick already used up their timeout
+                remaining = 0.0 if partition.mountpoint in still_hung else max(0.0, deadline - time.monotonic())
+                usage = future.result(timeout=remaining)
+            except FutureTimeoutError:
+                results.append(MountUsage(partition.mountpoint, partition.device, partition.fstype,
+                                          0, 0, 0, 0.0, "timeout"))
+                continue
+            except OSError as e:
+                results.append(MountUsage(partition.mountpoint, partition.device, partition.fstype,
+                                          0, 0, 0, 0.0, f"error: {e.strerror or e}"))
+                continue
+            results.append(MountUsage(partition.mountpoint, partition.device, partition.fstype,
+                                      usage.total, usage.used, usage.free, usage.percent, "ok"))
+
+        # Unresponsive mounts first, then the fullest
+        results.sort(key=lambda mount: (mount.status == "ok", -mount.percent))
+        return results
+
+    def close(self):
+        # Hung probes are daemon threads; they are simply abandoned
+        with self._lock:
+            self._pending.clear()
@@ -0,0 +1,242 @@
+"""
+Embedded HTTP endpoint for the latest sample.
+
+Serves /metrics in the Prometheus text exposition format and /snapshot.json.
+Both bodies are rendered once per sample tick by update() and served as
+cached bytes, so the cost of a scrape does not depend on how often it
+happens or how many scrapers there are.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.agent import sample_record
+from utils.instrumentation import instrumentation
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+JSON_CONTENT_TYPE = "application/json"
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _MetricWriter:
+    """Accumulates exposition-format lines grouped by family.
+
+    The format requires all samples of a family to follow its HELP/TYPE
+    header without other families in between, so samples are collected per
+    family and render() writes each family in one piece. Callers can then
+    add every metric of one device before moving on to the next.
+    """
+
+    def __init__(self):
+        # family name -> header and sample lines, in order of first use
+        self._families = {}
+
+    def add(self, name, value, help_text, metric_type="gauge", labels=None):
+        if value is None:
+            return
+        lines = self._families.get(name)
+        if lines is None:
+            lines = self._families[name] = [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+        if labels:
+            label_text = ",".join(f'{key}="{_escape_label(val)}"' for key, val in labels.items())
+            lines.append(f"{name}{{{label_text}}} {float(value)!r}")
+        else:
+            lines.append(f"{name} {float(value)!r}")
+
+    def render(self):
+        return "".join("\n".join(lines) + "\n" for lines in self._families.values()).encode("utf-8")
+
+
+def render_prometheus(sample):
+    """Render a Sampler sample as Prometheus text exposition bytes"""
+    metrics = _MetricWriter()
+    snapshot = sample['data'].get('snapshot')
+
+    if snapshot is not None:
+        metrics.add("system_cpu_usage_percent", snapshot.cpu_percent, "Host CPU utilisation since the previous sample.")
+        for core, percent in enumerate(snapshot.cpu_per_core):
+            metrics.add("system_cpu_core_usage_percent", percent, "Per-core CPU utilisation.", labels={"core": core})
+        for mode in ("user", "system", "iowait", "steal"):
+            metrics.add("system_cpu_mode_percent", getattr(snapshot, f"cpu_{mode}"),
+                        "Share of CPU time spent in each mode.", labels={"mode": mode})
+        metrics.add("system_cpu_logical_cores", snapshot.logical_cores, "Number of logical CPUs.")
+        metrics.add("system_cpu_physical_cores", snapshot.physical_cores, "Number of physical CPU cores.")
+        metrics.add("system_cpu_frequency_mhz", snapshot.cpu_freq_mhz, "Current CPU frequency.")
+
+        for state in ("total", "used", "free"):
+            metrics.add("system_memory_bytes", getattr(snapshot, f"memory_{state}"),
+                        "Physical memory by state.", labels={"state": state})
+        metrics.add("system_memory_usage_percent", snapshot.memory_percent, "Physical memory in use.")
+
+        for state in ("total", "used", "free"):
+            metrics.add("system_disk_bytes", getattr(snapshot, f"disk_{state}"),
+                        "Root filesystem capacity by state.", labels={"state": state})
+        metrics.add("system_disk_usage_percent", snapshot.disk_percent, "Root filesystem capacity in use.")
+
+        metrics.add("system_network_bytes_total", snapshot.net_bytes_sent, "Bytes transferred on all interfaces.",
+                    "counter", {"direction": "sent"})
+        metrics.add("system_network_bytes_total", snapshot.net_bytes_recv, "Bytes transferred on all interfaces.",
+                    "counter", {"direction": "received"})
+        metrics.add("system_network_packets_total", snapshot.net_packets_sent, "Packets transferred on all interfaces.",
+                    "counter", {"direction": "sent"})
+        metrics.add("system_network_packets_total", snapshot.net_packets_recv, "Packets transferred on all interfaces.",
+                    "counter", {"direction": "received"})
+
+        for nic in snapshot.net_interfaces:
+            labels = {"interface": nic.name}
+            metrics.add("system_network_transmit_bytes_per_second", nic.bytes_sent, "Interface transmit throughput.", labels=labels)
+            metrics.add("system_network_receive_bytes_per_second", nic.bytes_recv, "Interface receive throughput.", labels=labels)
+            metrics.add("system_network_transmit_packets_per_second", nic.packets_sent, "Interface transmit packet rate.", labels=labels)
+            metrics.add("system_network_receive_packets_per_second", nic.packets_recv, "Interface receive packet rate.", labels=labels)
+            metrics.add("system_network_errors_per_second", nic.errors, "Interface errors in and out.", labels=labels)
+            metrics.add("system_network_drops_per_second", nic.drops, "Interface drops in and out.", labels=labels)
+
+        for device in snapshot.disk_devices:
+            labels = {"device": device.name}
+            metrics.add("system_disk_read_bytes_per_second", device.read_bytes, "Block device read throughput.", labels=labels)
+            metrics.add("system_disk_write_bytes_per_second", device.write_bytes, "Block device write throughput.", labels=labels)
+            metrics.add("system_disk_read_iops", device.read_iops, "Block device completed reads per second.", labels=labels)
+            metrics.add("system_disk_write_iops", device.write_iops, "Block device completed writes per second.", labels=labels)
+            metrics.add("system_disk_read_latency_milliseconds", device.read_latency_ms, "Average time per read.", labels=labels)
+            metrics.add("system_disk_write_latency_milliseconds", device.write_latency_ms, "Average time per write.", labels=labels)
+            metrics.add("system_disk_busy_percent", device.busy_percent, "Share of time the device was busy.", labels=labels)
+
+        metrics.add("system_boot_time_seconds", snapshot.boot_time, "Host boot time as a Unix timestamp.")
+
+    for mount in sample['data'].get('mounts') or ():
+        labels = {"mountpoint": mount.mountpoint, "device": mount.device, "fstype": mount.fstype}
+        metrics.add("system_filesystem_up", 1 if mount.status == "ok" else 0,
+                    "Whether the filesystem answered statvfs within the timeout.", labels=labels)
+        if mount.status == "ok":
+            metrics.add("system_filesystem_size_bytes", mount.total, "Filesystem size.", labels=labels)
+            metrics.add("system_filesystem_free_bytes", mount.free, "Filesystem free space.", labels=labels)
+            metrics.add("system_filesystem_usage_percent", mount.percent, "Filesystem space in use.", labels=labels)
+
+    for cgroup in sample['data'].get('cgroups') or ():
+        labels = {"cgroup": cgroup.path}
+        metrics.add("system_cgroup_cpu_percent", cgroup.cpu_percent, "CPU used by the cgroup, 100 per core.", labels=labels)
+        metrics.add("system_cgroup_cpu_throttled_percent", cgroup.throttled_percent,
+                    "Share of CFS periods in which the cgroup was throttled.", labels=labels)
+        metrics.add("system_cgroup_memory_bytes", cgroup.memory_bytes, "Memory charged to the cgroup.", labels=labels)
+        metrics.add("system_cgroup_cpu_pressure_percent", cgroup.cpu_pressure,
+                    "Share of time some tasks waited for CPU (PSI avg10).", labels=labels)
+        metrics.add("system_cgroup_memory_pressure_percent", cgroup.memory_pressure,
+                    "Share of time some tasks stalled on memory (PSI avg10).", labels=labels)
+
+    sensors = sample['data'].get('sensors') or ()
+    # Samples of one metric must be contiguous, so temperatures first, then fans
+    for kind, name, help_text in (("temperature", "system_temperature_celsius", "Hardware temperature sensor reading."),
+                                  ("fan", "system_fan_rpm", "Fan speed.")):
+        for reading in sensors:
+            if reading.kind == kind and reading.value is not None:
+                metrics.add(name, reading.value, help_text, labels={"chip": reading.chip, "sensor": reading.label})
+
+    processes = sample['data'].get('processes')
+    if processes is not None and 'error' not in processes:
+        metrics.add("system_processes", processes['total_processes'], "Number of running processes.")
+
+    for collector, seconds in sample['timings'].items():
+        metrics.add("health_checker_collector_duration_seconds", seconds,
+                    "Time spent in each collector during the last sample.", labels={"collector": collector})
+
+    for phase, stats in instrumentation.summary().items():
+        for quantile in ("p50", "p95"):
+            metrics.add("health_checker_phase_seconds", stats[quantile],
+                        "Recent duration quantiles of each instrumented phase.", "summary",
+                        labels={"phase": phase, "quantile": "0.5" if quantile == "p50" else "0.95"})
+        metrics.add("health_checker_phase_max_seconds", stats["max"], "Longest duration of each phase.",
+                    labels={"phase": phase})
+
+    usage = sample['data'].get('self')
+    if usage is not None:
+        metrics.add("health_checker_cpu_percent", usage["cpu_percent"], "CPU used by the health checker itself.")
+        metrics.add("health_checker_resident_memory_bytes", usage["rss"], "Resident memory of the health checker.")
+        metrics.add("health_checker_threads", usage["threads"], "Threads in the health checker process.")
+    metrics.add("health_checker_sample_timestamp_seconds", sample['timestamp'], "When the last sample was taken.")
+
+    return metrics.render()
+
+
+def render_json(sample):
+    return json.dumps(sample_record(sample), default=str).encode("utf-8")
+
+
+class MetricsExporter:
+    """Threaded HTTP server serving pre-rendered bodies for the latest sample.
+
+    Register it as a sink/listener: each call re-renders /metrics and
+    /snapshot.json once, and request handlers only copy the cached bytes.
+    """
+
+    def __init__(self, host="127.0.0.1", port=9184):
+        self.host = host
+        self.port = port
+        self._lock = threading.Lock()
+        self._bodies = {}
+        self._server = None
+        self._thread = None
+
+    def __call__(self, sample):
+        self.update(sample)
+
+    def update(self, sample):
+        bodies = {
+            "/metrics": (PROMETHEUS_CONTENT_TYPE, render_prometheus(sample)),
+            "/snapshot.json": (JSON_CONTENT_TYPE, render_json(sample)),
+        }
+        with self._lock:
+            self._bodies = bodies
+
+    def body(self, path):
+        with self._lock:
+            return self._bodies.get(path)
+
+    def start(self):
+        """Start serving on a daemon thread; returns the bound (host, port)"""
+        self._server = _ExporterServer((self.host, self.port), _ExporterHandler)
+        self._server.exporter = self
+        self.host, self.port = self._server.server_address[:2]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="health-exporter", daemon=True)
+        self._thread.start()
+        return self.host, self.port
+
+    def close(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+class _ExporterServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # socketserver's default backlog of 5 drops SYNs when many scrapers connect at once
+    request_queue_size = 256
+
+
+class _ExporterHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        cached = self.server.exporter.body(path)
+        if cached is None:
+            status = 503 if path in ("/metrics", "/snapshot.json") else 404
+            self.send_response(status)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        content_type, body = cached
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would flood stderr
+        pass
@@ -0,0 +1,379 @@
+"""
+Fleet mode: agents stream their samples to one aggregator over TCP.
+
+Every message is a 4-byte big-endian length followed by compact JSON.
+An agent opens with {"type": "hello", "host": name} and then sends one
+record per sample (see compact_record). The aggregator is a single
+asyncio loop that keeps the merged latest record and a short CPU/memory
+history per host, so memory stays bounded by hosts x history length.
+"""
+
+import asyncio
+import json
+import socket
+import struct
+import sys
+import threading
+import time
+from collections import deque
+
+from utils.agent import sample_record
+from utils.cgroups import CgroupUsage
+from utils.sensors import SensorReading
+from utils.disks import MountUsage
+from utils.rates import DeviceRates, InterfaceRates
+from utils.system_info import Snapshot
+
+_HEADER = struct.Struct("!I")
+MAX_FRAME = 1024 * 1024
+DEFAULT_PORT = 9185
+
+# Record parts that only change on some ticks; they are sent when fresh
+SLOW_PARTS = ("mounts", "processes", "cgroups", "sensors")
+
+# Snapshot fields that hold a list rather than a number
+_LIST_FIELDS = ("cpu_per_core", "net_interfaces", "disk_devices")
+
+
+def encode_frame(message):
+    payload = json.dumps(message, separators=(",", ":"), default=str).encode("utf-8")
+    return _HEADER.pack(len(payload)) + payload
+
+
+def compact_record(sample):
+    """sample_record without the parts that did not change this tick"""
+    record = sample_record(sample)
+    record.pop("timings", None)
+    record.pop("self", None)
+    for name in SLOW_PARTS:
+        if name not in sample['fresh']:
+            record.pop(name, None)
+    return record
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def validate_record(record):
+    """Raise ValueError unless `record` is a record this version can show.
+
+    Every record must carry all Snapshot fields (numbers or null); the slow
+    parts are only checked when present, since agents send them only when
+    they change.
+    """
+    if not isinstance(record, dict):
+        raise ValueError("record is not an object")
+    if not _is_number(record.get("timestamp")):
+        raise ValueError("record has no numeric timestamp")
+    for field in Snapshot._fields:
+        if field not in record:
+            raise ValueError(f"record has no {field}")
+        value = record[field]
+        if field in _LIST_FIELDS:
+            if value is not None and not isinstance(value, list):
+                raise ValueError(f"{field} is not a list")
+        elif value is not None and not _is_number(value):
+            raise ValueError(f"{field} is not a number")
+    if not all(_is_number(value) for value in record["cpu_per_core"] or ()):
+        raise ValueError("cpu_per_core is not a list of numbers")
+    for name in ("mounts", "cgroups", "sensors"):
+        items = record.get(name)
+        if items is not None and not (isinstance(items, list) and all(isinstance(item, dict) for item in items)):
+            raise ValueError(f"{name} is not a list of objects")
+    for mount in record.get("mounts") or ():
+        if mount.get("status") == "ok" and not _is_number(mount.get("percent")):
+            raise ValueError("mount percent is not a number")
+    processes = record.get("processes")
+    if processes is not None and not isinstance(processes, dict):
+        raise ValueError("processes is not an object")
+    if not isinstance(record.get("errors", {}), dict):
+        raise ValueError("errors is not an object")
+
+
+def record_to_sample(record):
+    """Rebuild a Sampler-style sample from a record so the dashboard can show a remote host"""
+    fields = {field: record.get(field) for field in Snapshot._fields}
+    fields["net_interfaces"] = tuple(InterfaceRates(**item) for item in record.get("net_interfaces") or ())
+    fields["disk_devices"] = tuple(DeviceRates(**item) for item in record.get("disk_devices") or ())
+    fields["cpu_per_core"] = tuple(record.get("cpu_per_core") or ())
+    mounts = record.get("mounts")
+    cgroups = record.get("cgroups")
+    sensors = record.get("sensors")
+    return {
+        "timestamp": record["timestamp"],
+        "data": {
+            "snapshot": Snapshot(**fields),
+            "mounts": [MountUsage(**mount) for mount in mounts] if mounts is not None else None,
+            "processes": record.get("processes"),
+            "cgroups": [CgroupUsage(**cgroup) for cgroup in cgroups] if cgroups is not None else None,
+            "sensors": [SensorReading(**reading) for reading in sensors] if sensors is not None else None,
+        },
+        "fresh": frozenset(["snapshot", *SLOW_PARTS]),
+        "timings": {},
+        "errors": record.get("errors", {}),
+        "duration": 0.0,
+    }
+
+
+class FleetSink:
+    """Agent sink that forwards compact records to an aggregator.
+
+    Sending happens on a background thread with a single-slot mailbox, so
+    a slow or unreachable aggregator only ever costs the agent the latest
+    record: older ones are replaced rather than queued. Connection failures
+    are retried with exponential backoff.
+    """
+
+    def __init__(self, address, name=None, max_backoff=30.0):
+        host, _, port = address.rpartition(":")
+        self.address = (host or "127.0.0.1", int(port or DEFAULT_PORT))
+        self.name = name or socket.gethostname()
+        self.max_backoff = max_backoff
+        self._condition = threading.Condition()
+        self._pending = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="fleet-sink", daemon=True)
+        self._thread.start()
+
+    def __call__(self, sample):
+        if 'snapshot' not in sample['fresh']:
+            return
+        record = compact_record(sample)
+        with self._condition:
+            if self._pending is not None:
+                # Keep slow-changing parts the aggregator has not received yet
+                for name in SLOW_PARTS:
+                    if name not in record and name in self._pending:
+                        record[name] = self._pending[name]
+            self._pending = record
+            self._condition.notify()
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join(timeout=2)
+
+    def _next_record(self):
+        with self._condition:
+            while self._pending is None and not self._closed:
+                self._condition.wait()
+            record, self._pending = self._pending, None
+            return record
+
+    def _run(self):
+        connection = None
+        backoff = 1.0
+        while True:
+            record = self._next_record()
+            if record is None:
+                break
+            try:
+                if connection is None:
+                    connection = socket.create_connection(self.address, timeout=5)
+                    connection.sendall(encode_frame({"type": "hello", "host": self.name}))
+                connection.sendall(encode_frame(record))
+                backoff = 1.0
+            except OSError as e:
+                print(f"Fleet: cannot reach {self.address[0]}:{self.address[1]} ({e}), retrying in {backoff:.0f}s",
+                      file=sys.stderr)
+                if connection is not None:
+                    connection.close()
+                    connection = None
+                with self._condition:
+                    self._condition.wait(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+        if connection is not None:
+            connection.close()
+
+
+class HostState:
+    """Latest merged record and short history for one host"""
+
+    __slots__ = ("name", "address", "record", "sample", "sequence", "last_seen", "connected", "history",
+                 "rejected", "error")
+
+    def __init__(self, name, address, history):
+        self.name = name
+        self.address = address
+        self.record = {}
+        self.sample = None
+        self.sequence = 0
+        self.last_seen = 0.0
+        self.connected = True
+        self.history = deque(maxlen=history)
+        self.rejected = 0
+        self.error = None
+
+    def update(self, record):
+        """Merge in a record, or raise ValueError and leave the state as it was"""
+        validate_record(record)
+        # The SLOW_PARTS are only sent when they change; keep the last ones
+        merged = dict(self.record)
+        merged.update(record)
+        try:
+            # Built here, off the UI thread, so a record the dashboard cannot show is never stored
+            sample = record_to_sample(merged)
+        except (TypeError, KeyError, AttributeError) as e:
+            raise ValueError(f"malformed record: {e}") from None
+        self.record = merged
+        self.sample = sample
+        self.sequence += 1
+        self.last_seen = time.monotonic()
+        self.history.append((record["timestamp"], record["cpu_percent"] or 0.0, record["memory_percent"] or 0.0))
+
+    def worst(self):
+        """Highest of CPU, memory and fullest-filesystem usage, in percent"""
+        record = self.record
+        disk = record.get("disk_percent") or 0.0
+        for mount in record.get("mounts") or ():
+            if mount.get("status") == "ok":
+                disk = max(disk, mount["percent"])
+        return max(record.get("cpu_percent") or 0.0, record.get("memory_percent") or 0.0, disk)
+
+
+class FleetAggregator:
+    """asyncio TCP server collecting agent records.
+
+    Runs its event loop on a background thread; hosts(), host_sample() and
+    host_history() are safe to call from any thread (the Tk loop). Hosts
+    that have been disconnected for `forget_after` seconds are dropped and
+    at most `max_hosts` are tracked. A record that fails validate_record()
+    is dropped and counted against its host; the connection stays open.
+
+    Agents are not authenticated, so the server only listens on the
+    loopback interface unless another `host` (e.g. "0.0.0.0") is given.
+    """
+
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, history=300, stale_after=5.0,
+                 forget_after=3600.0, max_hosts=5000):
+        self.host = host
+        self.port = port
+        self.history = history
+        self.stale_after = stale_after
+        self.forget_after = forget_after
+        self.max_hosts = max_hosts
+        self.records_received = 0
+        self._lock = threading.Lock()
+        self._hosts = {}
+        self._loop = None
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        """Start serving on a background thread and return the bound (host, port)"""
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(ready,), name="fleet-aggregator", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self._server.sockets[0].getsockname()[:2]
+
+    def close(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=2)
+
+    def _run(self, ready):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._server = self._loop.run_until_complete(
+            asyncio.start_server(self._handle, self.host, self.port, backlog=1024))
+        self._loop.call_later(60, self._forget_stale)
+        ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._server.close()
+            self._loop.close()
+
+    async def _handle(self, reader, writer):
+        state = None
+        try:
+            hello = await self._read_frame(reader)
+            if hello.get("type") != "hello" or not hello.get("host"):
+                return
+            state = self._register(hello["host"], writer.get_extra_info("peername"))
+            if state is None:
+                return
+            while True:
+                record = await self._read_frame(reader)
+                with self._lock:
+                    self.records_received += 1
+                    try:
+                        state.update(record)
+                    except ValueError as e:
+                        state.rejected += 1
+                        state.error = str(e)
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError, KeyError, TypeError):
+            pass
+        finally:
+            if state is not None:
+                state.connected = False
+            writer.close()
+
+    async def _read_frame(self, reader):
+        size, = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+        if size > MAX_FRAME:
+            raise ValueError(f"frame of {size} bytes exceeds {MAX_FRAME}")
+        return json.loads(await reader.readexactly(size))
+
+    def _register(self, name, address):
+        with self._lock:
+            state = self._hosts.get(name)
+            if state is None:
+                if len(self._hosts) >= self.max_hosts:
+                    return None
+                state = self._hosts[name] = HostState(name, address, self.history)
+            state.address = address
+            state.connected = True
+            return state
+
+    def _forget_stale(self):
+        horizon = time.monotonic() - self.forget_after
+        with self._lock:
+            for name, state in list(self._hosts.items()):
+                if not state.connected and state.last_seen < horizon:
+                    del self._hosts[name]
+        self._loop.call_later(60, self._forget_stale)
+
+    def hosts(self):
+        """Summaries of every host, worst first, stale hosts ahead of healthy ones"""
+        now = time.monotonic()
+        with self._lock:
+            summaries = []
+            for state in self._hosts.values():
+                record = state.record
+                age = now - state.last_seen if state.last_seen else None
+                summaries.append({
+                    "host": state.name,
+                    "address": state.address[0] if state.address else "",
+                    "cpu_percent": record.get("cpu_percent") or 0.0,
+                    "memory_percent": record.get("memory_percent") or 0.0,
+                    "disk_percent": record.get("disk_percent") or 0.0,
+                    "worst": state.worst(),
+                    "age": age,
+                    "stale": not state.connected or age is None or age > self.stale_after,
+                    "rejected": state.rejected,
+                    "error": state.error,
+                })
+        summaries.sort(key=lambda summary: (not summary["stale"], -summary["worst"], summary["host"]))
+        return summaries
+
+    def host_sample(self, name):
+        """Return (sequence, sample) for a host, like Sampler.latest()"""
+        with self._lock:
+            state = self._hosts.get(name)
+            if state is None or state.sample is None:
+                return 0, None
+            return state.sequence, state.sample
+
+    def host_history(self, name):
+        """Return (timestamps, cpu, memory) lists from a host's short history"""
+        with self._lock:
+            state = self._hosts.get(name)
+            history = list(state.history) if state is not None else []
+        if not history:
+            return [], [], []
+        timestamps, cpu, memory = zip(*history)
+        return list(timestamps), list(cpu), list(memory)
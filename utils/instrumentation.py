@@ -0,0 +1,185 @@
+"""
+Self-overhead instrumentation.
+
+Times the collectors and dashboard phases into small rolling histograms,
+reports the health checker's own CPU and RSS, and can capture a cProfile
+and tracemalloc dump over a fixed number of ticks.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+
+import psutil
+
+
+class Histogram:
+    """Rolling window of the most recent durations for one timed phase"""
+
+    def __init__(self, size=1024):
+        self._values = deque(maxlen=size)
+        self.count = 0
+        self.max = 0.0
+        self.last = 0.0
+
+    def record(self, seconds):
+        self._values.append(seconds)
+        self.count += 1
+        self.last = seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, fraction):
+        if not self._values:
+            return 0.0
+        ordered = sorted(self._values)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "last": self.last,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "max": self.max,
+        }
+
+
+class Instrumentation:
+    """Registry of phase histograms plus the process's own resource usage"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._process = psutil.Process()
+        self._last_cpu = None
+
+    def record(self, name, seconds):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.record(seconds)
+
+    @contextmanager
+    def timer(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def summary(self):
+        """Return {phase: {count, last, p50, p95, max}} in seconds, sorted by name"""
+        with self._lock:
+            return {name: self._histograms[name].summary() for name in sorted(self._histograms)}
+
+    def self_usage(self):
+        """Return this process's CPU % since the previous call, RSS bytes and thread count"""
+        now = time.monotonic()
+        with self._process.oneshot():
+            times = self._process.cpu_times()
+            rss = self._process.memory_info().rss
+            threads = self._process.num_threads()
+        cpu_time = times.user + times.system
+
+        with self._lock:
+            previous, self._last_cpu = self._last_cpu, (now, cpu_time)
+        if previous is None or now <= previous[0]:
+            cpu_percent = 0.0
+        else:
+            cpu_percent = (cpu_time - previous[1]) / (now - previous[0]) * 100
+        return {"cpu_percent": cpu_percent, "rss": rss, "threads": threads}
+
+
+# Shared by the sampler, the dashboard and the exporter
+instrumentation = Instrumentation()
+
+
+class ProfileCapture:
+    """Profiles one thread for a fixed number of ticks, then writes the results.
+
+    Call tick() at the start of every tick on the thread to profile; the
+    first call enables cProfile (and tracemalloc), and the call after
+    `ticks` ticks disables them and writes `<path>.prof` (pstats format)
+    and `<path>.txt` (top functions and allocation sites).
+
+    Python 3.12+ allows only one active profiler per process, so creating a
+    capture while another is unfinished raises RuntimeError. If enabling
+    cProfile fails anyway (a profiler started elsewhere), the capture ends
+    with `error` set instead of raising into the profiled thread.
+    """
+
+    _lock = threading.Lock()
+    _current = None
+
+    def __init__(self, ticks, path, top=30):
+        with ProfileCapture._lock:
+            if ProfileCapture._current is not None:
+                raise RuntimeError(f"already capturing a profile to {ProfileCapture._current.path}")
+            ProfileCapture._current = self
+        self.ticks = ticks
+        self.path = path
+        self.top = top
+        self.done = False
+        self.error = None
+        self._seen = 0
+        self._profile = None
+        self._started_tracemalloc = False
+
+    def _release(self):
+        with ProfileCapture._lock:
+            if ProfileCapture._current is self:
+                ProfileCapture._current = None
+
+    def tick(self):
+        if self.done:
+            return
+        if self._profile is None:
+            self._profile = cProfile.Profile()
+            try:
+                self._profile.enable()
+            except ValueError as e:
+                self.error = str(e)
+                self.done = True
+                self._release()
+                return
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(10)
+                self._started_tracemalloc = True
+            return
+        self._seen += 1
+        if self._seen >= self.ticks:
+            self.finish()
+
+    def finish(self):
+        if self.done or self._profile is None:
+            self.done = True
+            self._release()
+            return
+        self._profile.disable()
+        self.done = True
+        self._release()
+        memory = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._profile.dump_stats(f"{self.path}.prof")
+
+        report = io.StringIO()
+        report.write(f"Profile of {self._seen} ticks\n\n")
+        pstats.Stats(self._profile, stream=report).sort_stats("cumulative").print_stats(self.top)
+        if memory is not None:
+            report.write("\nTop allocation sites\n")
+            for stat in memory.statistics("lineno")[:self.top]:
+                report.write(f"{stat}\n")
+        with open(f"{self.path}.txt", "w", encoding="utf-8") as f:
+            f.write(report.getvalue())
@@ -0,0 +1,261 @@
+"""
+Append-only on-disk metrics log.
+
+Samples are stored in segment files of fixed-width binary records: a
+float64 timestamp followed by one number per field, float32 except for the
+fields in DOUBLE_FIELDS. Each segment starts with a small header naming its
+fields and their formats, and segments are rotated on a fixed
+time period (or when the field list changes) and pruned oldest-first to
+stay within a disk budget. Readers memory-map segments and view them as
+NumPy record arrays, so range queries never parse text.
+
+Only one writer should append to a directory at a time.
+"""
+
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+
+from utils.sensors import hottest_temperature
+
+MAGIC = b"SHCLOG1\0"
+_HEADER_PREFIX = struct.Struct("<8sI")
+_SEGMENT_NAME = re.compile(r"^metrics-(\d+)(?:-(\d+))?\.seg$")
+
+# Absolute byte and packet counts and epoch times outgrow float32's 24-bit
+# mantissa (a 16 GB total would be off by up to 1 KB); they are stored as float64
+DOUBLE_FIELDS = frozenset([
+    "memory_total", "memory_used", "memory_free",
+    "disk_total", "disk_used", "disk_free",
+    "net_bytes_sent", "net_bytes_recv", "net_packets_sent", "net_packets_recv",
+    "boot_time",
+])
+
+# struct format character -> NumPy dtype of a stored field
+_DTYPES = {"f": "<f4", "d": "<f8"}
+
+
+def snapshot_values(snapshot):
+    """Flatten a Snapshot into {field: number}, one field per CPU core"""
+    values = {}
+    for field, value in snapshot._asdict().items():
+        if field == "timestamp":
+            continue
+        if isinstance(value, (tuple, list)):
+            # Per-device rate tuples are not logged, only plain per-core numbers
+            for index, item in enumerate(value):
+                if isinstance(item, (int, float)):
+                    values[f"{field}_{index}"] = item
+        elif isinstance(value, (int, float)):
+            values[field] = value
+    return values
+
+
+def _segment_path(directory, start, sequence=0):
+    suffix = f"-{sequence}" if sequence else ""
+    return os.path.join(directory, f"metrics-{int(start)}{suffix}.seg")
+
+
+def list_segments(directory):
+    """Return [(start_timestamp, path)] for every segment, oldest first"""
+    if not os.path.isdir(directory):
+        return []
+    segments = []
+    for name in os.listdir(directory):
+        match = _SEGMENT_NAME.match(name)
+        if match:
+            segments.append((int(match.group(1)), int(match.group(2) or 0), os.path.join(directory, name)))
+    segments.sort()
+    return [(start, path) for start, sequence, path in segments]
+
+
+class MetricsLogWriter:
+    """Appends samples to the current segment, rotating and pruning as needed.
+
+    With the defaults (1 hour segments, 512 MB budget) 50 metrics sampled at
+    1 Hz take about 22 MB a day, so roughly three weeks are retained.
+    """
+
+    def __init__(self, directory, segment_seconds=3600, max_total_bytes=512 * 1024 * 1024):
+        self.directory = directory
+        self.segment_seconds = segment_seconds
+        self.max_total_bytes = max_total_bytes
+        self._lock = threading.Lock()
+        self._file = None
+        self._fields = None
+        self._record = None
+        self._segment_end = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def append(self, timestamp, values):
+        """Append one sample; values is a {field: number} dict"""
+        fields = list(values)
+        with self._lock:
+            if self._file is None or fields != self._fields or timestamp >= self._segment_end:
+                self._rotate(timestamp, fields)
+            self._file.write(self._record.pack(timestamp, *(float(values[field]) for field in fields)))
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _rotate(self, timestamp, fields):
+        if self._file is not None:
+            self._file.close()
+
+        # A restart or field change within the same second would collide with
+        # the previous segment; a sequence suffix keeps the name's start honest
+        sequence = 0
+        path = _segment_path(self.directory, timestamp)
+        while os.path.exists(path):
+            sequence += 1
+            path = _segment_path(self.directory, timestamp, sequence)
+
+        formats = "".join("d" if field in DOUBLE_FIELDS else "f" for field in fields)
+        header = json.dumps({"fields": fields, "formats": formats}).encode("utf-8")
+        self._file = open(path, "ab")
+        self._file.write(_HEADER_PREFIX.pack(MAGIC, len(header)))
+        self._file.write(header)
+        self._fields = fields
+        self._record = struct.Struct(f"<d{formats}")
+        self._segment_end = (int(timestamp) // self.segment_seconds + 1) * self.segment_seconds
+
+        self._prune(keep=path)
+
+    def _prune(self, keep):
+        segments = list_segments(self.directory)
+        sizes = {path: os.path.getsize(path) for _, path in segments}
+        total = sum(sizes.values())
+        for _, path in segments:
+            if total <= self.max_total_bytes or path == keep:
+                break
+            total -= sizes[path]
+            os.remove(path)
+
+
+class _Segment:
+    """A memory-mapped segment viewed as a NumPy structured array"""
+
+    def __init__(self, start, path):
+        # numpy is only needed for reading; the agent's writer path stays import-light
+        import numpy as np
+
+        self.start = start
+        self.path = path
+        with open(path, "rb") as f:
+            magic, header_length = _HEADER_PREFIX.unpack(f.read(_HEADER_PREFIX.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a metrics log segment")
+            header = json.loads(f.read(header_length).decode("utf-8"))
+            self.fields = header["fields"]
+            # Segments written before per-field formats were all float32
+            formats = header.get("formats", "f" * len(self.fields))
+            data_offset = _HEADER_PREFIX.size + header_length
+            size = os.fstat(f.fileno()).st_size
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size > data_offset else None
+
+        self.dtype = np.dtype([("timestamp", "<f8")] + [(field, _DTYPES[kind])
+                                                        for field, kind in zip(self.fields, formats)])
+        if self._mmap is None:
+            self.records = np.empty(0, dtype=self.dtype)
+        else:
+            # A writer may be mid-record; ignore any trailing partial record
+            count = (size - data_offset) // self.dtype.itemsize
+            self.records = np.frombuffer(self._mmap, dtype=self.dtype, count=count, offset=data_offset)
+
+    def read_range(self, start, end, fields=None):
+        """Copy out (timestamps, {field: float64 values}) for [start, end].
+
+        Only `fields` (default: all) that this segment has are copied.
+        """
+        import numpy as np
+
+        records = self.records
+        first = np.searchsorted(records["timestamp"], start, side="left")
+        last = np.searchsorted(records["timestamp"], end, side="right")
+        records = records[first:last]
+        wanted = self.fields if fields is None else [field for field in fields if field in self.fields]
+        return records["timestamp"].copy(), {field: records[field].astype(np.float64) for field in wanted}
+
+    def close(self):
+        # Drop the array view first; an mmap cannot close while it is exported
+        self.records = None
+        if self._mmap is not None:
+            self._mmap.close()
+
+
+class MetricsLogReader:
+    """Answers time-range queries over the segments in a directory"""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def query(self, start, end=None, fields=None):
+        """Return (timestamps, {field: values}) for samples in [start, end].
+
+        Fields missing from a segment are filled with NaN. Arrays are copies,
+        so they stay valid after the segments are unmapped.
+        """
+        import numpy as np
+
+        end = time.time() if end is None else end
+        segments = list_segments(self.directory)
+
+        # A segment covers [its start, the next segment's start]; names are in
+        # whole seconds, so its last records can share the next one's second
+        selected = []
+        for index, (segment_start, path) in enumerate(segments):
+            next_start = segments[index + 1][0] + 1 if index + 1 < len(segments) else float("inf")
+            if segment_start <= end and next_start > start:
+                selected.append((segment_start, path))
+
+        timestamps = []
+        columns = {}
+        for segment_start, path in selected:
+            try:
+                segment = _Segment(segment_start, path)
+            except (OSError, ValueError):
+                continue
+            try:
+                segment_timestamps, segment_columns = segment.read_range(start, end, fields)
+            finally:
+                segment.close()
+
+            wanted = fields if fields is not None else segment.fields
+            for field in wanted:
+                if field not in columns:
+                    # Field first seen in this segment: pad the earlier rows
+                    columns[field] = [np.full(sum(len(t) for t in timestamps), np.nan)]
+            for field, parts in columns.items():
+                parts.append(segment_columns.get(field, np.full(len(segment_timestamps), np.nan)))
+            timestamps.append(segment_timestamps)
+
+        if not timestamps:
+            return np.empty(0), {field: np.empty(0) for field in (fields or [])}
+        return np.concatenate(timestamps), {field: np.concatenate(parts) for field, parts in columns.items()}
+
+
+class MetricsLogSink:
+    """Agent/sampler sink that appends each sample's snapshot to a MetricsLogWriter"""
+
+    def __init__(self, directory, **writer_options):
+        self.writer = MetricsLogWriter(directory, **writer_options)
+
+    def __call__(self, sample):
+        snapshot = sample['data'].get('snapshot')
+        if snapshot is not None and 'snapshot' in sample.get('fresh', ('snapshot',)):
+            values = snapshot_values(snapshot)
+            hottest = hottest_temperature(sample['data'].get('sensors'))
+            # Always present, so a reading coming and going does not rotate the segment
+            values["temperature_max_c"] = float("nan") if hottest is None else hottest
+            self.writer.append(snapshot.timestamp, values)
+
+    def close(self):
+        self.writer.close()
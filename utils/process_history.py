@@ -0,0 +1,226 @@
+import threading
+from array import array
+from collections import OrderedDict
+
+# Columns kept per tracked process
+HISTORY_COLUMNS = ('memory_mb', 'cpu_percent', 'num_fds', 'num_threads')
+
+
+class TrendDetector:
+    """Online least-squares fit of a value against time with exponential forgetting.
+
+    Each update() decays the running sums by the time elapsed (half_life
+    seconds) and adds the new point, so the fit follows the recent trend in
+    O(1) time and memory. A series is flagged as growing when it has been
+    watched for at least `min_span` seconds, the fitted slope is at least
+    `min_slope` units per minute, the fit explains most of the variance
+    (r^2 >= min_r2) and more of the recent steps went up than down, i.e. the growth is
+    steady rather than one jump.
+    """
+
+    __slots__ = ('half_life', 'min_span', 'min_slope', 'min_r2', 'min_rising',
+                 '_origin', '_last_time', '_last_value', '_w', '_sx', '_sy', '_sxx', '_sxy', '_syy',
+                 '_rises', '_falls')
+
+    def __init__(self, half_life=1800.0, min_span=600.0, min_slope=1.0, min_r2=0.8, min_rising=0.55):
+        self.half_life = half_life
+        self.min_span = min_span
+        self.min_slope = min_slope
+        self.min_r2 = min_r2
+        self.min_rising = min_rising
+        self._origin = None
+        self._last_time = None
+        self._last_value = None
+        self._w = self._sx = self._sy = self._sxx = self._sxy = self._syy = 0.0
+        self._rises = self._falls = 0.0
+
+    def update(self, timestamp, value):
+        if self._origin is None:
+            self._origin = timestamp
+        elif timestamp <= self._last_time:
+            return
+        else:
+            decay = 0.5 ** ((timestamp - self._last_time) / self.half_life)
+            self._w *= decay
+            self._sx *= decay
+            self._sy *= decay
+            self._sxx *= decay
+            self._sxy *= decay
+            self._syy *= decay
+            self._rises *= decay
+            self._falls *= decay
+            if value > self._last_value:
+                self._rises += 1
+            elif value < self._last_value:
+                self._falls += 1
+
+        # Minutes since the first point keeps the sums well-conditioned
+        x = (timestamp - self._origin) / 60.0
+        self._w += 1
+        self._sx += x
+        self._sy += value
+        self._sxx += x * x
+        self._sxy += x * value
+        self._syy += value * value
+        self._last_time = timestamp
+        self._last_value = value
+
+    def trend(self):
+        """Return {'slope_per_min', 'r2', 'span', 'growing'} for the current fit"""
+        span = (self._last_time - self._origin) if self._origin is not None else 0.0
+        slope = r2 = 0.0
+        if self._w > 1:
+            var_x = self._w * self._sxx - self._sx * self._sx
+            var_y = self._w * self._syy - self._sy * self._sy
+            cov = self._w * self._sxy - self._sx * self._sy
+            if var_x > 1e-12:
+                slope = cov / var_x
+                if var_y > 1e-12:
+                    r2 = min(cov * cov / (var_x * var_y), 1.0)
+        steps = self._rises + self._falls
+        rising = self._rises / steps if steps else 0.0
+        growing = (span >= self.min_span and slope >= self.min_slope
+                   and r2 >= self.min_r2 and rising >= self.min_rising)
+        return {'slope_per_min': slope, 'r2': r2, 'span': span, 'growing': growing}
+
+
+class _Ring:
+    """Fixed-capacity rows of float32 values with float64 timestamps.
+
+    Backed by array.array rather than numpy so that the headless agent,
+    which records history on every process tick, never loads numpy; only
+    view() (used by the dashboard) converts to numpy arrays.
+    """
+
+    __slots__ = ('capacity', 'columns', '_timestamps', '_values', '_next', '_count')
+
+    def __init__(self, capacity, columns):
+        self.capacity = capacity
+        self.columns = columns
+        self._timestamps = array('d', bytes(8 * capacity))
+        self._values = array('f', bytes(4 * capacity * columns))
+        self._next = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, timestamp, values):
+        index = self._next
+        self._timestamps[index] = timestamp
+        self._values[index * self.columns:(index + 1) * self.columns] = array('f', values)
+        self._next = (index + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def view(self):
+        """(timestamps, values) as new numpy arrays, oldest row first"""
+        import numpy as np
+
+        start = (self._next - self._count) % self.capacity
+        order = np.arange(start, start + self._count) % self.capacity
+        timestamps = np.frombuffer(self._timestamps, dtype=np.float64)[order]
+        values = np.frombuffer(self._values, dtype=np.float32).reshape(self.capacity, self.columns)[order]
+        return timestamps, values
+
+
+class _TrackedProcess:
+    __slots__ = ('pid', 'name', 'buffer', 'rss_trend')
+
+    def __init__(self, pid, name, capacity, trend_options):
+        self.pid = pid
+        self.name = name
+        self.buffer = _Ring(capacity, len(HISTORY_COLUMNS))
+        self.rss_trend = TrendDetector(**trend_options)
+
+
+class ProcessHistory:
+    """Bounded per-process time series for the processes worth watching.
+
+    Each tracked process gets a fixed-size float32 ring of
+    HISTORY_COLUMNS plus an RSS TrendDetector. At most `max_processes`
+    are kept; when a new one arrives the least recently updated process
+    that is not pinned is evicted, so processes that dropped out of the
+    rankings go first. A PID whose name changes is treated as a new process.
+    """
+
+    def __init__(self, capacity=1800, max_processes=64, **trend_options):
+        self.capacity = capacity
+        self.max_processes = max_processes
+        self.trend_options = trend_options
+        self._lock = threading.Lock()
+        self._tracked = OrderedDict()
+        self._pinned = set()
+
+    def __len__(self):
+        return len(self._tracked)
+
+    def pin(self, pid, pinned=True):
+        """Keep tracking `pid` even when it is not in any ranking"""
+        with self._lock:
+            if pinned:
+                self._pinned.add(pid)
+            else:
+                self._pinned.discard(pid)
+
+    def pinned(self):
+        with self._lock:
+            return set(self._pinned)
+
+    def update(self, timestamp, rows):
+        """Append one point for each row dict (pid, name and HISTORY_COLUMNS)"""
+        with self._lock:
+            for row in rows:
+                pid = row['pid']
+                tracked = self._tracked.get(pid)
+                if tracked is None or tracked.name != row['name']:
+                    tracked = _TrackedProcess(pid, row['name'], self.capacity, self.trend_options)
+                    self._tracked[pid] = tracked
+                self._tracked.move_to_end(pid)
+                tracked.buffer.append(timestamp, [row.get(column, 0) for column in HISTORY_COLUMNS])
+                tracked.rss_trend.update(timestamp, row['memory_mb'])
+            self._evict()
+
+    def _evict(self):
+        excess = len(self._tracked) - self.max_processes
+        if excess <= 0:
+            return
+        for pid in list(self._tracked):
+            if pid in self._pinned:
+                continue
+            del self._tracked[pid]
+            excess -= 1
+            if excess == 0:
+                break
+
+    def series(self, pid):
+        """Copy of a tracked process's history, or None if it is not tracked"""
+        with self._lock:
+            tracked = self._tracked.get(pid)
+            if tracked is None:
+                return None
+            timestamps, values = tracked.buffer.view()
+            return {
+                'pid': pid,
+                'name': tracked.name,
+                'pinned': pid in self._pinned,
+                'timestamps': timestamps,
+                **{column: values[:, index].copy() for index, column in enumerate(HISTORY_COLUMNS)},
+                'rss_trend': tracked.rss_trend.trend(),
+            }
+
+    def leaks(self):
+        """Tracked processes whose RSS is growing steadily, fastest first"""
+        with self._lock:
+            leaking = []
+            for tracked in self._tracked.values():
+                trend = tracked.rss_trend.trend()
+                if trend['growing']:
+                    leaking.append({
+                        'pid': tracked.pid,
+                        'name': tracked.name,
+                        'rss_trend_mb_min': trend['slope_per_min'],
+                        'r2': trend['r2'],
+                        'tracked_minutes': trend['span'] / 60,
+                    })
+        leaking.sort(key=lambda leak: -leak['rss_trend_mb_min'])
+        return leaking
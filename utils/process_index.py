@@ -0,0 +1,178 @@
+"""
+In-memory index over the full process table for the process explorer.
+
+The sampler hands over a fresh ProcessColumns every refresh; searching,
+sorting and tree grouping all run against that copy, so typing in the
+filter box or clicking a column heading never touches psutil.
+"""
+
+from array import array
+
+# Sortable column -> ProcessColumns attribute
+SORT_COLUMNS = {
+    'pid': 'pid',
+    'name': 'name',
+    'user': 'username',
+    'cpu': 'cpu_percent',
+    'memory': 'memory_percent',
+    'rss': 'rss',
+    'command': 'cmdline',
+}
+
+_TEXT_COLUMNS = ('name', 'username', 'cmdline')
+
+
+class ProcessIndex:
+    """Filtered, sorted view over one ProcessColumns.
+
+    The view is a list of (row index, depth) pairs; depth is only non-zero
+    when grouping by process tree. Sort state and the filter are kept across
+    update() calls, and ties are broken by PID, so rows keep their relative
+    order between refreshes instead of jittering.
+
+    Filtering matches a case-insensitive substring of name, user or command
+    line. When the new query extends the previous one, only the previous
+    matches are re-checked.
+    """
+
+    def __init__(self, sort_column='cpu', descending=True):
+        self.columns = None
+        self.sort_column = sort_column
+        self.descending = descending
+        self.query = ''
+        self.group_tree = False
+        self.view = []
+        self._search_text = []
+        self._text_cache = {}
+        self._matches = None
+
+    def __len__(self):
+        return len(self.view)
+
+    def update(self, columns):
+        """Swap in a new process table and rebuild the view"""
+        self.columns = columns
+
+        # Search strings only change when a PID starts a new process
+        cache = {}
+        search_text = []
+        previous = self._text_cache
+        for index in range(len(columns)):
+            pid = columns.pid[index]
+            key = (columns.name[index], columns.username[index], columns.cmdline[index])
+            cached = previous.get(pid)
+            if cached is None or cached[0] != key:
+                cached = (key, ' '.join(key).lower())
+            cache[pid] = cached
+            search_text.append(cached[1])
+        self._text_cache = cache
+        self._search_text = search_text
+
+        self._matches = self._filter(range(len(columns)), self.query)
+        self._rebuild()
+
+    def set_filter(self, query):
+        query = query.strip().lower()
+        if query == self.query:
+            return
+        if self.columns is not None:
+            # Narrowing an existing search only needs to re-check its matches
+            if self.query and query.startswith(self.query) and self._matches is not None:
+                candidates = self._matches
+            else:
+                candidates = range(len(self.columns))
+            self._matches = self._filter(candidates, query)
+        self.query = query
+        self._rebuild()
+
+    def set_sort(self, column, descending=None):
+        """Sort by `column`; re-selecting the current column flips the order"""
+        if descending is None:
+            descending = not self.descending if column == self.sort_column else column not in ('pid', 'name', 'user', 'command')
+        self.sort_column = column
+        self.descending = descending
+        self._rebuild()
+
+    def set_group_tree(self, enabled):
+        self.group_tree = bool(enabled)
+        self._rebuild()
+
+    def row(self, position):
+        """Return the row shown at `position` in the view as a dict"""
+        index, depth = self.view[position]
+        columns = self.columns
+        return {
+            'pid': columns.pid[index],
+            'ppid': columns.ppid[index],
+            'name': columns.name[index],
+            'username': columns.username[index],
+            'cmdline': columns.cmdline[index],
+            'cpu_percent': columns.cpu_percent[index],
+            'memory_percent': columns.memory_percent[index],
+            'memory_mb': columns.rss[index] / (1024 * 1024),
+            'depth': depth,
+        }
+
+    def rows(self, start, count):
+        return [self.row(position) for position in range(start, min(start + count, len(self.view)))]
+
+    def _filter(self, candidates, query):
+        if not query:
+            return None
+        search_text = self._search_text
+        return array('l', (index for index in candidates if query in search_text[index]))
+
+    def _sort_key(self):
+        columns = self.columns
+        values = getattr(columns, SORT_COLUMNS[self.sort_column])
+        pids = columns.pid
+        if SORT_COLUMNS[self.sort_column] in _TEXT_COLUMNS:
+            return lambda index: (values[index].lower(), pids[index])
+        return lambda index: (values[index], pids[index])
+
+    def _rebuild(self):
+        if self.columns is None:
+            self.view = []
+            return
+        indices = range(len(self.columns)) if self._matches is None else self._matches
+        key = self._sort_key()
+        if self.group_tree:
+            self.view = self._tree_view(indices, key)
+        else:
+            self.view = [(index, 0) for index in sorted(indices, key=key, reverse=self.descending)]
+
+    def _tree_view(self, indices, key):
+        """Depth-first order of the process tree, siblings sorted by the current column.
+
+        With a filter active, the ancestors of every match are kept too so
+        each match still shows where it sits in the tree.
+        """
+        columns = self.columns
+        position = {pid: index for index, pid in enumerate(columns.pid)}
+        shown = set(indices)
+        if self._matches is not None:
+            for index in list(shown):
+                parent = position.get(columns.ppid[index])
+                while parent is not None and parent not in shown:
+                    shown.add(parent)
+                    parent = position.get(columns.ppid[parent])
+
+        children = {}
+        roots = []
+        for index in shown:
+            parent = position.get(columns.ppid[index])
+            if parent is None or parent == index or parent not in shown:
+                roots.append(index)
+            else:
+                children.setdefault(parent, []).append(index)
+
+        view = []
+        stack = [(index, 0) for index in sorted(roots, key=key, reverse=not self.descending)]
+        while stack:
+            index, depth = stack.pop()
+            view.append((index, depth))
+            # Pushed in reverse so the first sibling is popped first
+            kids = children.get(index)
+            if kids:
+                stack.extend((child, depth + 1) for child in sorted(kids, key=key, reverse=not self.descending))
+        return view
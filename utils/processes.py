@@ -0,0 +1,268 @@
+import heapq
+import threading
+import time
+from array import array
+
+import psutil
+
+# Ranking name -> column in ProcessColumns. cpu and memory are always
+# collected; the others cost extra per-process reads and are only gathered
+# when a caller asks for that ranking.
+RANKINGS = {
+    'cpu': 'cpu_percent',
+    'memory': 'memory_percent',
+    'io': 'io_bytes',
+    'threads': 'num_threads',
+    'fds': 'num_fds',
+    'rss_growth': 'rss_growth',
+}
+
+_OPTIONAL_COLUMNS = ('io_bytes', 'num_threads', 'num_fds')
+
+
+class _ProcessEntry:
+    """Cached state for one live process, kept across ticks"""
+
+    __slots__ = ('process', 'create_time', 'name', 'cpu_time', 'sampled_at',
+                 'cpu_percent', 'rss', 'memory_percent', 'rss_growth',
+                 'io_bytes', 'num_threads', 'num_fds', 'ppid', 'username', 'cmdline')
+
+    def __init__(self, process, create_time, name):
+        self.process = process
+        self.create_time = create_time
+        self.name = name
+        self.cpu_time = 0.0
+        self.sampled_at = create_time
+        self.cpu_percent = 0.0
+        self.rss = 0
+        self.memory_percent = 0.0
+        self.rss_growth = 0.0
+        self.io_bytes = 0
+        self.num_threads = 0
+        self.num_fds = 0
+        self.ppid = 0
+        # Read once, and only for callers that ask for details (see refresh())
+        self.username = None
+        self.cmdline = None
+
+
+class ProcessColumns:
+    """Column-oriented view of the process table for one tick.
+
+    Numeric columns are array.array buffers rather than one dict per
+    process, which keeps ranking passes cheap on hosts with many processes.
+    """
+
+    __slots__ = ('pid', 'name', 'cpu_percent', 'memory_percent', 'rss',
+                 'rss_growth', 'io_bytes', 'num_threads', 'num_fds',
+                 'ppid', 'username', 'cmdline')
+
+    def __init__(self):
+        self.pid = array('l')
+        self.name = []
+        self.cpu_percent = array('d')
+        self.memory_percent = array('d')
+        self.rss = array('q')
+        self.rss_growth = array('d')
+        self.io_bytes = array('q')
+        self.num_threads = array('l')
+        self.num_fds = array('l')
+        self.ppid = array('l')
+        self.username = []
+        self.cmdline = []
+
+    def __len__(self):
+        return len(self.pid)
+
+    def append(self, pid, entry):
+        self.pid.append(pid)
+        self.name.append(entry.name)
+        self.cpu_percent.append(entry.cpu_percent)
+        self.memory_percent.append(entry.memory_percent)
+        self.rss.append(entry.rss)
+        self.rss_growth.append(entry.rss_growth)
+        self.io_bytes.append(entry.io_bytes)
+        self.num_threads.append(entry.num_threads)
+        self.num_fds.append(entry.num_fds)
+        self.ppid.append(entry.ppid)
+        self.username.append(entry.username or '')
+        self.cmdline.append(entry.cmdline or '')
+
+    def row(self, index):
+        """Return one process as the dict shape used by get_top_processes()"""
+        return {
+            'pid': self.pid[index],
+            'name': self.name[index],
+            'cpu_percent': self.cpu_percent[index],
+            'memory_percent': self.memory_percent[index],
+            'memory_mb': self.rss[index] / (1024 * 1024),
+            'rss_growth_mb_s': self.rss_growth[index] / (1024 * 1024),
+            'io_bytes': self.io_bytes[index],
+            'num_threads': self.num_threads[index],
+            'num_fds': self.num_fds[index],
+        }
+
+
+def top_k(columns, rankings, limit):
+    """Select the top `limit` row indices for each ranking in one pass.
+
+    rankings is an iterable of names from RANKINGS. Each ranking keeps a
+    bounded min-heap of (value, index), so the cost is O(n log k) instead of
+    sorting every process once per ranking. Returns {ranking: [index, ...]}
+    ordered from largest to smallest.
+    """
+    rankings = list(rankings)
+    if limit <= 0:
+        return {ranking: [] for ranking in rankings}
+
+    value_columns = [getattr(columns, RANKINGS[ranking]) for ranking in rankings]
+    heaps = [[] for _ in rankings]
+    count = len(columns)
+
+    # Seed every heap with the first `limit` rows, then only push rows that beat the current minimum
+    seed = min(limit, count)
+    for heap, values in zip(heaps, value_columns):
+        heap.extend((values[index], index) for index in range(seed))
+        heapq.heapify(heap)
+
+    pairs = list(zip(heaps, value_columns))
+    for index in range(seed, count):
+        for heap, values in pairs:
+            value = values[index]
+            if value > heap[0][0]:
+                heapq.heapreplace(heap, (value, index))
+
+    return {
+        ranking: [index for _, index in sorted(heap, reverse=True)]
+        for ranking, heap in zip(rankings, heaps)
+    }
+
+
+class ProcessTable:
+    """Persistent process index keyed by (pid, create_time).
+
+    Each refresh() only creates psutil.Process objects for PIDs that were not
+    seen before and evicts PIDs that have gone away. An entry whose PID now
+    has a different create time belongs to a process that exited, and the
+    PID was reused; it is replaced like a new PID, so the old name, details
+    and CPU baseline are never carried over. CPU usage is computed
+    from the cached per-process CPU times, so a process already has a real
+    reading on the first tick it is seen (averaged since it started) instead
+    of psutil's initial 0.0.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._total_memory = psutil.virtual_memory().total
+
+    def __len__(self):
+        return len(self._entries)
+
+    def refresh(self, fields=(), details=False):
+        """Update the index from the live process list and return ProcessColumns.
+
+        fields names optional columns ('io_bytes', 'num_threads', 'num_fds')
+        to read for every process in addition to CPU and memory. With
+        details=True the username and command line are filled in as well;
+        they are read once per process and cached.
+        """
+        fields = [field for field in fields if field in _OPTIONAL_COLUMNS]
+        with self._lock:
+            live_pids = set(psutil.pids())
+
+            # Evict processes that have exited since the last tick
+            for pid in list(self._entries):
+                if pid not in live_pids:
+                    del self._entries[pid]
+
+            for pid in live_pids:
+                entry = self._entries.get(pid)
+                try:
+                    # is_running() re-reads the create time and compares it with the cached one
+                    if entry is None or not entry.process.is_running():
+                        entry = self._add(pid)
+                    self._update(entry, fields)
+                    if details and entry.cmdline is None:
+                        self._read_details(entry)
+                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                    self._entries.pop(pid, None)
+
+            columns = ProcessColumns()
+            for pid, entry in self._entries.items():
+                columns.append(pid, entry)
+            return columns
+
+    def read_fields(self, pids, fields):
+        """Read optional columns for just these PIDs; returns {pid: {field: value}}"""
+        fields = [field for field in fields if field in _OPTIONAL_COLUMNS]
+        result = {}
+        with self._lock:
+            for pid in pids:
+                entry = self._entries.get(pid)
+                if entry is None:
+                    continue
+                try:
+                    with entry.process.oneshot():
+                        result[pid] = {field: self._read_optional(entry.process, field) for field in fields}
+                except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                    continue
+        return result
+
+    def _add(self, pid):
+        process = psutil.Process(pid)
+        with process.oneshot():
+            entry = _ProcessEntry(process, process.create_time(), process.name())
+        self._entries[pid] = entry
+        return entry
+
+    def _update(self, entry, fields=()):
+        now = time.time()
+        process = entry.process
+        with process.oneshot():
+            cpu_times = process.cpu_times()
+            memory_info = process.memory_info()
+            for field in fields:
+                setattr(entry, field, self._read_optional(process, field))
+
+            ppid = process.ppid()
+
+        cpu_time = cpu_times.user + cpu_times.system
+        elapsed = now - entry.sampled_at
+        entry.cpu_percent = (cpu_time - entry.cpu_time) / elapsed * 100 if elapsed > 0 else 0.0
+        entry.rss_growth = (memory_info.rss - entry.rss) / elapsed if elapsed > 0 and entry.rss else 0.0
+        entry.cpu_time = cpu_time
+        entry.sampled_at = now
+        entry.ppid = ppid
+        entry.rss = memory_info.rss
+        entry.memory_percent = memory_info.rss / self._total_memory * 100
+
+    @staticmethod
+    def _read_details(entry):
+        process = entry.process
+        with process.oneshot():
+            try:
+                entry.username = process.username()
+            except (psutil.AccessDenied, KeyError):
+                entry.username = ''
+            try:
+                # Kernel threads have no command line; show their name like ps does
+                entry.cmdline = ' '.join(process.cmdline()) or f"[{entry.name}]"
+            except psutil.AccessDenied:
+                entry.cmdline = ''
+
+    @staticmethod
+    def _read_optional(process, field):
+        # io_counters/num_fds are often denied for other users' processes or
+        # missing on some platforms; rank those processes as 0 rather than drop them
+        try:
+            if field == 'io_bytes':
+                io = process.io_counters()
+                return io.read_bytes + io.write_bytes
+            if field == 'num_threads':
+                return process.num_threads()
+            if field == 'num_fds':
+                return process.num_fds()
+        except (psutil.AccessDenied, AttributeError, NotImplementedError):
+            pass
+        return 0
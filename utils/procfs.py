@@ -0,0 +1,279 @@
+"""
+Linux /proc fast path for the full process scan.
+
+ProcfsProcessTable is a drop-in replacement for utils.processes.ProcessTable
+that skips psutil's per-process machinery (a Process object, oneshot
+caching, exception translation and several opens per call). Each tick reads
+just /proc/[pid]/stat and /proc/[pid]/statm into a reused buffer per worker
+and parses the few fields the rankings need; everything else (FDs, I/O,
+owner, command line) is read only when a caller asks for it. The PID list
+can be split into contiguous shards scanned by a small thread pool, which
+helps when the opens and reads dominate (e.g. a busy or slow procfs).
+
+`root` defaults to /proc and can point at a fake tree for benchmarks.
+"""
+
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import psutil
+
+try:
+    import pwd
+except ImportError:  # Not Unix; available() is False there anyway
+    pwd = None
+
+from utils.processes import ProcessColumns, _OPTIONAL_COLUMNS, _ProcessEntry
+
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+# 0-based field positions in /proc/[pid]/stat counted after the ") " that ends comm
+_STAT_PPID = 1
+_STAT_UTIME = 11
+_STAT_STIME = 12
+_STAT_NUM_THREADS = 17
+_STAT_STARTTIME = 19
+
+# The kernel truncates comm to this many characters
+_COMM_LENGTH = 15
+
+# Errors that mean the process exited (or never existed) between listing and reading it
+_GONE = (FileNotFoundError, ProcessLookupError)
+
+
+def available(root='/proc'):
+    """True when `root` is a Linux procfs this module can read"""
+    return sys.platform.startswith('linux') and os.path.exists(os.path.join(root, 'self', 'stat'))
+
+
+class _ProcReader:
+    """Reads small /proc files into one preallocated buffer.
+
+    Not thread-safe: every worker owns one reader.
+    """
+
+    def __init__(self, root, size=4096):
+        self.root = root
+        self._buffer = bytearray(size)
+        self._views = [self._buffer]
+
+    def read(self, pid, name):
+        """Bytes read into the buffer from /proc/<pid>/<name>; returns the length"""
+        fd = os.open(f"{self.root}/{pid}/{name}", os.O_RDONLY)
+        try:
+            return os.readv(fd, self._views)
+        finally:
+            os.close(fd)
+
+    def stat(self, pid):
+        """(comm, ppid, cpu ticks, starttime, num_threads) from /proc/<pid>/stat"""
+        length = self.read(pid, 'stat')
+        buffer = self._buffer
+        # comm may itself contain spaces and parentheses, so split after the last ')'
+        close = buffer.rfind(b')', 0, length)
+        fields = buffer[close + 2:length].split()
+        comm = buffer[buffer.find(b'(') + 1:close]
+        return (comm, int(fields[_STAT_PPID]),
+                int(fields[_STAT_UTIME]) + int(fields[_STAT_STIME]),
+                int(fields[_STAT_STARTTIME]), int(fields[_STAT_NUM_THREADS]))
+
+    def rss(self, pid):
+        """Resident set size in bytes from /proc/<pid>/statm"""
+        length = self.read(pid, 'statm')
+        buffer = self._buffer
+        start = buffer.index(b' ', 0, length) + 1
+        end = buffer.find(b' ', start, length)
+        return int(buffer[start:end if end >= 0 else length]) * PAGE_SIZE
+
+    def io_bytes(self, pid):
+        length = self.read(pid, 'io')
+        total = 0
+        for line in self._buffer[:length].splitlines():
+            if line.startswith((b'read_bytes:', b'write_bytes:')):
+                total += int(line.split()[1])
+        return total
+
+    def num_fds(self, pid):
+        return len(os.listdir(f"{self.root}/{pid}/fd"))
+
+    def optional(self, pid, field, num_threads):
+        # Same policy as ProcessTable: fields we may not read rank as 0
+        try:
+            if field == 'num_threads':
+                return num_threads
+            if field == 'io_bytes':
+                return self.io_bytes(pid)
+            if field == 'num_fds':
+                return self.num_fds(pid)
+        except PermissionError:
+            pass
+        return 0
+
+    def cmdline(self, pid):
+        """Arguments from /proc/<pid>/cmdline (may exceed the buffer, so read whole)"""
+        with open(f"{self.root}/{pid}/cmdline", 'rb') as f:
+            data = f.read()
+        return [arg.decode(errors='replace') for arg in data.rstrip(b'\0').split(b'\0') if arg]
+
+    def uid(self, pid):
+        length = self.read(pid, 'status')
+        for line in self._buffer[:length].splitlines():
+            if line.startswith(b'Uid:'):
+                return int(line.split()[1])
+        return None
+
+
+class ProcfsProcessTable:
+    """ProcessTable that reads /proc directly; see the module docstring.
+
+    Processes are keyed by (pid, starttime), so PID reuse is detected
+    exactly rather than from CPU time going backwards. With workers > 1 the
+    PID list is scanned in that many shards on a thread pool.
+    """
+
+    def __init__(self, root='/proc', workers=0):
+        self.root = root
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._readers = [_ProcReader(root) for _ in range(max(workers, 1))]
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix='procfs') if workers > 1 else None
+        self._boot_time = self._read_boot_time()
+        self._total_memory = self._read_total_memory()
+        self._usernames = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _read_boot_time(self):
+        with open(f"{self.root}/stat", 'rb') as f:
+            for line in f:
+                if line.startswith(b'btime'):
+                    return float(line.split()[1])
+        return psutil.boot_time()
+
+    def _read_total_memory(self):
+        try:
+            with open(f"{self.root}/meminfo", 'rb') as f:
+                for line in f:
+                    if line.startswith(b'MemTotal:'):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            pass
+        return psutil.virtual_memory().total
+
+    def _pids(self):
+        return [int(name) for name in os.listdir(self.root) if name.isdigit()]
+
+    def _scan(self, reader, pids, fields):
+        """Raw readings for a shard of PIDs: [(pid, stat tuple, rss, optional values, time)]"""
+        readings = []
+        for pid in pids:
+            try:
+                stat = reader.stat(pid)
+                rss = reader.rss(pid)
+                optional = [reader.optional(pid, field, stat[4]) for field in fields]
+            except _GONE:
+                continue
+            except (PermissionError, ValueError, IndexError):
+                # Unreadable or mid-exec garbage: skip it this tick like psutil's AccessDenied
+                continue
+            readings.append((pid, stat, rss, optional, time.time()))
+        return readings
+
+    def refresh(self, fields=(), details=False):
+        """Same contract as ProcessTable.refresh()"""
+        fields = [field for field in fields if field in _OPTIONAL_COLUMNS]
+        with self._lock:
+            pids = self._pids()
+            if self._pool is not None and len(pids) > len(self._readers):
+                size = -(-len(pids) // len(self._readers))
+                shards = [pids[start:start + size] for start in range(0, len(pids), size)]
+                results = self._pool.map(lambda reader, shard: self._scan(reader, shard, fields),
+                                         self._readers, shards)
+                readings = [reading for shard in results for reading in shard]
+            else:
+                readings = self._scan(self._readers[0], pids, fields)
+
+            entries = {}
+            for pid, (comm, ppid, cpu_ticks, starttime, num_threads), rss, optional, now in readings:
+                create_time = self._boot_time + starttime / CLOCK_TICKS
+                entry = self._entries.get(pid)
+                if entry is None or entry.create_time != create_time:
+                    entry = _ProcessEntry(None, create_time, self._name(pid, comm))
+                self._update(entry, cpu_ticks / CLOCK_TICKS, rss, ppid, now)
+                for field, value in zip(fields, optional):
+                    setattr(entry, field, value)
+                entries[pid] = entry
+                if details and entry.cmdline is None:
+                    self._read_details(pid, entry)
+            # Anything not read this tick has exited
+            self._entries = entries
+
+            columns = ProcessColumns()
+            for pid, entry in entries.items():
+                columns.append(pid, entry)
+            return columns
+
+    def read_fields(self, pids, fields):
+        """Read optional columns for just these PIDs; returns {pid: {field: value}}"""
+        fields = [field for field in fields if field in _OPTIONAL_COLUMNS]
+        reader = self._readers[0]
+        result = {}
+        with self._lock:
+            for pid in pids:
+                if pid not in self._entries:
+                    continue
+                try:
+                    num_threads = reader.stat(pid)[4] if 'num_threads' in fields else 0
+                    result[pid] = {field: reader.optional(pid, field, num_threads) for field in fields}
+                except _GONE:
+                    continue
+        return result
+
+    def _update(self, entry, cpu_time, rss, ppid, now):
+        elapsed = now - entry.sampled_at
+        entry.cpu_percent = (cpu_time - entry.cpu_time) / elapsed * 100 if elapsed > 0 else 0.0
+        entry.rss_growth = (rss - entry.rss) / elapsed if elapsed > 0 and entry.rss else 0.0
+        entry.cpu_time = cpu_time
+        entry.sampled_at = now
+        entry.ppid = ppid
+        entry.rss = rss
+        entry.memory_percent = rss / self._total_memory * 100
+
+    def _name(self, pid, comm):
+        name = comm.decode(errors='replace')
+        if len(name) < _COMM_LENGTH:
+            return name
+        # comm was truncated: recover the full name from argv[0] like psutil does
+        try:
+            cmdline = self._readers[0].cmdline(pid)
+        except (OSError, ValueError):
+            return name
+        if cmdline:
+            extended = os.path.basename(cmdline[0])
+            if extended.startswith(name):
+                return extended
+        return name
+
+    def _read_details(self, pid, entry):
+        reader = self._readers[0]
+        try:
+            uid = reader.uid(pid)
+            if uid not in self._usernames:
+                try:
+                    self._usernames[uid] = pwd.getpwuid(uid).pw_name
+                except KeyError:
+                    self._usernames[uid] = str(uid)
+            entry.username = self._usernames[uid]
+        except (OSError, TypeError):
+            entry.username = ''
+        try:
+            # Kernel threads have no command line; show their name like ps does
+            entry.cmdline = ' '.join(reader.cmdline(pid)) or f"[{entry.name}]"
+        except OSError:
+            entry.cmdline = ''
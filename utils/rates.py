@@ -0,0 +1,115 @@
+import threading
+from collections import namedtuple
+
+# Per-second rates for one network interface / block device
+InterfaceRates = namedtuple("InterfaceRates", [
+    "name", "bytes_sent", "bytes_recv", "packets_sent", "packets_recv", "errors", "drops",
+])
+DeviceRates = namedtuple("DeviceRates", [
+    "name", "read_bytes", "write_bytes", "read_iops", "write_iops",
+    "read_latency_ms", "write_latency_ms", "busy_percent",
+])
+
+_WRAP_32 = 2 ** 32
+
+# Fastest a 32-bit counter plausibly advances, per second: bytes on a
+# 10 Gbit/s link. Faster hardware exposes 64-bit counters.
+MAX_COUNTER_RATE = 10e9 / 8
+
+
+def counter_delta(previous, current, max_delta=None):
+    """Difference between two readings of a monotonic kernel counter.
+
+    A decrease is a 32-bit wrap when the previous value fits in 32 bits
+    (some NIC drivers still expose 32-bit counters) and the wrapped
+    difference is at most `max_delta`; anything else is a reset, e.g. a
+    device that was removed and re-added or a driver reload, and counts as 0.
+    """
+    if current >= previous:
+        return current - previous
+    if previous < _WRAP_32:
+        wrapped = current + _WRAP_32 - previous
+        if max_delta is None or wrapped <= max_delta:
+            return wrapped
+    return 0
+
+
+class CounterDeltas:
+    """Tracks the previous reading of keyed counter tuples between ticks.
+
+    update() takes {key: namedtuple of counters} (e.g. the result of
+    net_io_counters(pernic=True)) and returns the per-field deltas for every
+    key seen on both ticks plus the elapsed seconds. Keys appearing for the
+    first time (hot-plugged devices) produce no delta until their second
+    reading, and keys that disappear are forgotten.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._previous = {}
+        self._previous_time = None
+
+    def update(self, counters, timestamp):
+        with self._lock:
+            previous = self._previous
+            elapsed = timestamp - self._previous_time if self._previous_time is not None else 0.0
+            self._previous = dict(counters)
+            self._previous_time = timestamp
+
+        deltas = {}
+        if elapsed <= 0:
+            return deltas, elapsed
+        # A wrap implying more than this is a counter reset, not traffic
+        max_delta = elapsed * MAX_COUNTER_RATE
+        for key, current in counters.items():
+            before = previous.get(key)
+            if before is None:
+                continue
+            deltas[key] = {field: counter_delta(getattr(before, field), getattr(current, field), max_delta)
+                           for field in current._fields}
+        return deltas, elapsed
+
+
+def interface_rates(name, delta, elapsed):
+    return InterfaceRates(
+        name=name,
+        bytes_sent=delta['bytes_sent'] / elapsed,
+        bytes_recv=delta['bytes_recv'] / elapsed,
+        packets_sent=delta['packets_sent'] / elapsed,
+        packets_recv=delta['packets_recv'] / elapsed,
+        errors=(delta.get('errin', 0) + delta.get('errout', 0)) / elapsed,
+        drops=(delta.get('dropin', 0) + delta.get('dropout', 0)) / elapsed,
+    )
+
+
+def device_rates(name, delta, elapsed):
+    reads = delta.get('read_count', 0)
+    writes = delta.get('write_count', 0)
+    # read_time/write_time are total milliseconds spent on completed requests
+    read_latency = delta.get('read_time', 0) / reads if reads else 0.0
+    write_latency = delta.get('write_time', 0) / writes if writes else 0.0
+    busy = min(delta['busy_time'] / (elapsed * 1000) * 100, 100.0) if 'busy_time' in delta else 0.0
+    return DeviceRates(
+        name=name,
+        read_bytes=delta['read_bytes'] / elapsed,
+        write_bytes=delta['write_bytes'] / elapsed,
+        read_iops=reads / elapsed,
+        write_iops=writes / elapsed,
+        read_latency_ms=read_latency,
+        write_latency_ms=write_latency,
+        busy_percent=busy,
+    )
+
+
+def is_partition(name, names):
+    """True for 'sda1' / 'nvme0n1p1' style names whose parent disk is also listed"""
+    for other in names:
+        if name == other or not name.startswith(other):
+            continue
+        suffix = name[len(other):]
+        # Disks ending in a digit number their partitions with a 'p' (nvme0n1p1, mmcblk0p2)
+        if other[-1].isdigit():
+            suffix = suffix[1:] if suffix.startswith('p') else ''
+        if suffix.isdigit():
+            return True
+    return False
@@ -0,0 +1,595 @@
+"""
+Record and replay the raw psutil results the collectors consume.
+
+RecordingBackend wraps the real psutil module and writes every result
+the collectors asked for on a tick, including per-process reads, to a
+gzip JSON lines file. ReplayBackend and SyntheticBackend expose the
+same psutil-shaped API from a recording or from generated data, so the
+unmodified collectors, Sampler, exporter and dashboard run against a
+reproducible host and as fast as they can.
+
+    backend = open_backend("capture.jsonl.gz")    # or "synthetic:processes=5000,mounts=20"
+    install(backend)
+    ...
+    uninstall()
+
+Every call inside a tick sees the tick's single recorded timestamp, so
+rates computed from a replay match the ones the live host produced.
+"""
+
+import gzip
+import json
+import random
+import threading
+import time as _time
+from collections import namedtuple
+from contextlib import contextmanager
+
+import psutil as _psutil
+
+from utils import disks, processes, system_info
+from utils.scheduler import CHEAP, CollectorSpec
+
+FORMAT_VERSION = 1
+
+# Modules whose `psutil` / `time` globals a backend replaces
+_PSUTIL_MODULES = (system_info, processes, disks)
+_CLOCK_MODULES = (system_info, processes)
+
+# Collectors that read cgroupfs or sysfs directly
+UNREPLAYABLE = ("cgroups", "sensors")
+
+# Process backend in use before install(), restored by uninstall()
+_live_process_backend = None
+
+# Process methods the collectors call
+PROCESS_METHODS = ("create_time", "name", "cpu_times", "memory_info", "ppid", "username", "cmdline",
+                   "io_counters", "num_threads", "num_fds")
+
+_ERRORS = {
+    "NoSuchProcess": _psutil.NoSuchProcess,
+    "AccessDenied": _psutil.AccessDenied,
+    "ZombieProcess": _psutil.ZombieProcess,
+}
+
+
+def call_key(name, args=(), kwargs=None):
+    """Canonical name for one psutil call, e.g. "cpu_times(percpu=True)" """
+    parts = [repr(arg) for arg in args]
+    parts.extend(f"{key}={value!r}" for key, value in sorted((kwargs or {}).items()))
+    return f"{name}({', '.join(parts)})"
+
+
+_tuple_types = {}
+
+
+def _tuple_type(name, fields):
+    key = (name, tuple(fields))
+    cls = _tuple_types.get(key)
+    if cls is None:
+        cls = _tuple_types[key] = namedtuple(name, fields)
+    return cls
+
+
+def encode(value):
+    """Make psutil results JSON-serializable, keeping namedtuple type and field names"""
+    if isinstance(value, tuple) and hasattr(value, "_fields"):
+        return {"__tuple__": type(value).__name__, "fields": list(value._fields), "values": [encode(v) for v in value]}
+    if isinstance(value, (list, tuple)):
+        return [encode(v) for v in value]
+    if isinstance(value, dict):
+        return {"__dict__": [[encode(k), encode(v)] for k, v in value.items()]}
+    return value
+
+
+def decode(value):
+    if isinstance(value, list):
+        return [decode(v) for v in value]
+    if isinstance(value, dict):
+        if "__tuple__" in value:
+            return _tuple_type(value["__tuple__"], value["fields"])(*(decode(v) for v in value["values"]))
+        if "__dict__" in value:
+            return {decode(k): decode(v) for k, v in value["__dict__"]}
+    return value
+
+
+class _Clock:
+    """Stands in for the `time` module; time() returns the current tick's timestamp"""
+
+    def __init__(self, backend):
+        self._backend = backend
+
+    def time(self):
+        return self._backend.now()
+
+    def __getattr__(self, name):
+        return getattr(_time, name)
+
+
+class _ReplayProcess:
+    """psutil.Process look-alike that answers from the backend's current tick"""
+
+    def __init__(self, backend, pid):
+        self.pid = pid
+        self._backend = backend
+        self._data(None)
+        self._create_time = self._backend.process_data()[pid].get("create_time")
+
+    def _data(self, method):
+        data = self._backend.process_data().get(self.pid)
+        if data is None:
+            raise _psutil.NoSuchProcess(self.pid)
+        if method is None:
+            return None
+        if method not in data:
+            # Never read while recording; treat it like a permission error
+            raise _psutil.AccessDenied(self.pid)
+        result = data[method]
+        if isinstance(result, dict) and "__error__" in result:
+            raise _ERRORS[result["__error__"]](self.pid)
+        return result
+
+    @contextmanager
+    def oneshot(self):
+        yield
+
+    def is_running(self):
+        # A tick where the PID was reused recorded the new process's create time
+        data = self._backend.process_data().get(self.pid)
+        if data is None:
+            return False
+        created = data.get("create_time")
+        return created is None or self._create_time is None or created == self._create_time
+
+    def __getattr__(self, method):
+        if method not in PROCESS_METHODS:
+            raise AttributeError(method)
+        return lambda: self._data(method)
+
+
+class _FakePsutil:
+    """Shared psutil-shaped API over a stream of ticks.
+
+    A tick is {"time": t, "calls": {call_key: result}, "processes": {pid:
+    {method: result}}}. Calls missing from a tick fall back to the most
+    recent tick that had them (slow collectors do not run every tick), and
+    the process table likewise falls back to the last tick that listed PIDs.
+    """
+
+    NoSuchProcess = _psutil.NoSuchProcess
+    AccessDenied = _psutil.AccessDenied
+    ZombieProcess = _psutil.ZombieProcess
+
+    def __init__(self):
+        self.clock = _Clock(self)
+        self._lock = threading.Lock()
+        self._time = _time.time()
+        self._calls = {}
+        self._processes = {}
+
+    def apply_tick(self, tick):
+        with self._lock:
+            self._time = tick["time"]
+            self._calls.update(tick.get("calls", {}))
+            if "processes" in tick:
+                self._processes = tick["processes"]
+
+    def now(self):
+        return self._time
+
+    def process_data(self):
+        return self._processes
+
+    def _call(self, name, *args, **kwargs):
+        key = call_key(name, args, kwargs)
+        with self._lock:
+            if key not in self._calls:
+                raise NotImplementedError(f"{key} was not recorded")
+            result = self._calls[key]
+        if isinstance(result, dict) and "__error__" in result:
+            raise OSError(result["__error__"])
+        return result
+
+    def Process(self, pid):
+        return _ReplayProcess(self, pid)
+
+    def pids(self):
+        return list(self._processes)
+
+    # Keys are built from the arguments exactly as the collectors pass them,
+    # matching how RecordingBackend stored them
+    def cpu_times(self, *args, **kwargs):
+        return self._call("cpu_times", *args, **kwargs)
+
+    def cpu_count(self, *args, **kwargs):
+        return self._call("cpu_count", *args, **kwargs)
+
+    def cpu_freq(self):
+        return self._call("cpu_freq")
+
+    def boot_time(self):
+        return self._call("boot_time")
+
+    def virtual_memory(self):
+        return self._call("virtual_memory")
+
+    def disk_usage(self, path):
+        return self._call("disk_usage", path)
+
+    def disk_partitions(self, *args, **kwargs):
+        return self._call("disk_partitions", *args, **kwargs)
+
+    def net_io_counters(self, *args, **kwargs):
+        return self._call("net_io_counters", *args, **kwargs)
+
+    def disk_io_counters(self, *args, **kwargs):
+        return self._call("disk_io_counters", *args, **kwargs)
+
+    def sensors_temperatures(self):
+        return {}
+
+
+class ReplayBackend(_FakePsutil):
+    """Replays a file written by RecordingBackend, one tick per advance()"""
+
+    def __init__(self, path, loop=True):
+        super().__init__()
+        self.path = path
+        self.loop = loop
+        self.ticks = load_recording(path)
+        if not self.ticks:
+            raise ValueError(f"{path} contains no ticks")
+        self._position = 0
+        # Loops replay later passes shifted forward so time keeps increasing
+        self._offset = 0.0
+        self.advance()
+
+    def __len__(self):
+        return len(self.ticks)
+
+    def advance(self):
+        """Move to the next recorded tick; returns False once a non-looping replay is exhausted"""
+        if self._position >= len(self.ticks):
+            if not self.loop:
+                return False
+            span = self.ticks[-1]["time"] - self.ticks[0]["time"]
+            self._offset += span + (span / max(len(self.ticks) - 1, 1) or 1.0)
+            self._position = 0
+        tick = self.ticks[self._position]
+        self._position += 1
+        self.apply_tick(dict(tick, time=tick["time"] + self._offset))
+        return True
+
+
+def load_recording(path):
+    opener = gzip.open if path.endswith(".gz") else open
+    ticks = []
+    known = {}
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            if "version" in entry:
+                if entry["version"] != FORMAT_VERSION:
+                    raise ValueError(f"{path}: unsupported recording version {entry['version']}")
+                continue
+            tick = {
+                "time": entry["time"],
+                "calls": {key: decode(value) for key, value in entry["calls"].items()},
+            }
+            if "processes" in entry:
+                # name/create_time are only read when a process is first seen; carry them forward
+                current = {}
+                for pid, data in entry["processes"].items():
+                    pid = int(pid)
+                    data = {method: decode(value) for method, value in data.items()}
+                    if "create_time" not in data and pid in known:
+                        data = {**known[pid], **data}
+                    current[pid] = data
+                known = current
+                tick["processes"] = current
+            ticks.append(tick)
+    return ticks
+
+
+class _RecordingProcess:
+    """Wraps a real psutil.Process and records what each method returned"""
+
+    def __init__(self, recorder, pid):
+        self._recorder = recorder
+        self._process = _psutil.Process(pid)
+        self.pid = pid
+
+    def oneshot(self):
+        return self._process.oneshot()
+
+    def __getattr__(self, method):
+        if method not in PROCESS_METHODS:
+            return getattr(self._process, method)
+        real = getattr(self._process, method)
+
+        def call():
+            try:
+                result = real()
+            except (_psutil.NoSuchProcess, _psutil.AccessDenied) as e:
+                self._recorder.record_process(self.pid, method, {"__error__": type(e).__name__})
+                raise
+            self._recorder.record_process(self.pid, method, encode(result))
+            return result
+        return call
+
+
+class RecordingBackend:
+    """Pass-through to psutil that captures every result into the current tick.
+
+    Use it as a Sampler listener or agent sink: each call closes the tick
+    and appends it to `path` (gzip-compressed if it ends in .gz).
+    """
+
+    NoSuchProcess = _psutil.NoSuchProcess
+    AccessDenied = _psutil.AccessDenied
+    ZombieProcess = _psutil.ZombieProcess
+
+    def __init__(self, path):
+        self.path = path
+        self.clock = _Clock(self)
+        self._lock = threading.Lock()
+        opener = gzip.open if path.endswith(".gz") else open
+        self._file = opener(path, "wt", encoding="utf-8")
+        self._file.write(json.dumps({"version": FORMAT_VERSION, "platform": _psutil.__version__}) + "\n")
+        self._new_tick()
+
+    def _new_tick(self):
+        self._tick = {"time": None, "calls": {}}
+
+    def now(self):
+        with self._lock:
+            if self._tick["time"] is None:
+                self._tick["time"] = _time.time()
+            return self._tick["time"]
+
+    def _record(self, name, args, kwargs):
+        try:
+            result = getattr(_psutil, name)(*args, **kwargs)
+        except OSError as e:
+            with self._lock:
+                self._tick["calls"][call_key(name, args, kwargs)] = {"__error__": str(e)}
+            raise
+        with self._lock:
+            self._tick["calls"][call_key(name, args, kwargs)] = encode(result)
+        return result
+
+    def record_process(self, pid, method, value):
+        with self._lock:
+            self._tick.setdefault("processes", {}).setdefault(str(pid), {})[method] = value
+
+    def __getattr__(self, name):
+        if name in ("cpu_times", "cpu_count", "cpu_freq", "boot_time", "virtual_memory", "disk_usage",
+                    "disk_partitions", "net_io_counters", "disk_io_counters", "sensors_temperatures"):
+            return lambda *args, **kwargs: self._record(name, args, kwargs)
+        return getattr(_psutil, name)
+
+    def Process(self, pid):
+        return _RecordingProcess(self, pid)
+
+    def pids(self):
+        pids = _psutil.pids()
+        with self._lock:
+            # A tick that lists PIDs carries the full process table, even if empty
+            self._tick.setdefault("processes", {})
+        return pids
+
+    def __call__(self, sample):
+        """Close the current tick and write it out"""
+        with self._lock:
+            tick = self._tick
+            self._new_tick()
+        if tick["time"] is None:
+            tick["time"] = sample["timestamp"]
+        self._file.write(json.dumps(tick, separators=(",", ":")) + "\n")
+
+    def close(self):
+        self._file.close()
+
+
+# Field layouts matching psutil's Linux results
+_scputimes = _tuple_type("scputimes", ["user", "nice", "system", "idle", "iowait", "irq", "softirq", "steal",
+                                       "guest", "guest_nice"])
+_svmem = _tuple_type("svmem", ["total", "available", "percent", "used", "free"])
+_sdiskusage = _tuple_type("sdiskusage", ["total", "used", "free", "percent"])
+_sdiskpart = _tuple_type("sdiskpart", ["device", "mountpoint", "fstype", "opts"])
+_snetio = _tuple_type("snetio", ["bytes_sent", "bytes_recv", "packets_sent", "packets_recv",
+                                 "errin", "errout", "dropin", "dropout"])
+_sdiskio = _tuple_type("sdiskio", ["read_count", "write_count", "read_bytes", "write_bytes",
+                                   "read_time", "write_time", "busy_time"])
+_scpufreq = _tuple_type("scpufreq", ["current", "min", "max"])
+_pcputimes = _tuple_type("pcputimes", ["user", "system", "children_user", "children_system"])
+_pmem = _tuple_type("pmem", ["rss", "vms"])
+_pio = _tuple_type("pio", ["read_count", "write_count", "read_bytes", "write_bytes"])
+
+
+class SyntheticBackend(_FakePsutil):
+    """Generated host with `processes` processes, `mounts` mounts, `nics` NICs and `disks` disks.
+
+    Counters advance by random but plausible amounts every tick and a
+    fraction `churn` of the processes exits and is replaced each tick, so
+    the collectors exercise their delta, eviction and new-process paths.
+    Seeded, so two runs with the same parameters see identical data.
+    """
+
+    def __init__(self, processes=500, mounts=5, nics=2, disks=2, cores=8, interval=1.0, churn=0.01, seed=0):
+        super().__init__()
+        # The root filesystem always exists; collect_snapshot reads it directly
+        mounts = max(mounts, 1)
+        self.interval = interval
+        self.cores = cores
+        self.churn = churn
+        self._random = random.Random(seed)
+        self._time = 1_700_000_000.0
+        self._next_pid = 1000
+        self._memory_total = 64 * 1024 ** 3
+
+        self._core_times = [[0.0] * len(_scputimes._fields) for _ in range(cores)]
+        self._nics = {f"eth{index}": [0] * len(_snetio._fields) for index in range(nics)}
+        self._disks = {}
+        for index in range(disks):
+            name = f"sd{chr(ord('a') + index)}"
+            self._disks[name] = [0] * len(_sdiskio._fields)
+            self._disks[f"{name}1"] = [0] * len(_sdiskio._fields)
+        self._mounts = [_sdiskpart(f"/dev/sd{chr(ord('a') + index % 26)}{index + 1}",
+                                   "/" if index == 0 else f"/mnt/volume{index}", "ext4", "rw,relatime")
+                        for index in range(mounts)]
+        self._mount_usage = {}
+        for partition in self._mounts:
+            total = self._random.randint(50, 2000) * 1024 ** 3
+            used = int(total * self._random.uniform(0.1, 0.95))
+            self._mount_usage[partition.mountpoint] = _sdiskusage(total, used, total - used,
+                                                                  round(used / total * 100, 1))
+
+        self._live = {}
+        for _ in range(processes):
+            self._spawn(parent=1)
+
+        self.apply_tick({"time": self._time, "calls": {
+            call_key("cpu_count", (), {"logical": True}): cores,
+            call_key("cpu_count", (), {"logical": False}): max(cores // 2, 1),
+            call_key("boot_time"): self._time - 86400,
+            call_key("cpu_freq"): _scpufreq(2400.0, 800.0, 3600.0),
+            call_key("disk_partitions", (), {"all": True}): list(self._mounts),
+        }})
+        self.advance()
+
+    def _spawn(self, parent):
+        pid = self._next_pid
+        self._next_pid += 1
+        self._live[pid] = {
+            "create_time": self._time - self._random.uniform(0, 3600),
+            "name": f"worker-{pid % 97}",
+            "ppid": parent if parent in self._live or parent == 1 else 1,
+            "username": self._random.choice(("root", "www-data", "postgres", "app")),
+            "cmdline": [f"/usr/bin/worker-{pid % 97}", "--id", str(pid)],
+            "cpu": 0.0,
+            "rss": self._random.randint(1, 500) * 1024 ** 2,
+            "io": 0,
+            "load": self._random.expovariate(20),
+        }
+
+    def advance(self):
+        rand = self._random
+        self._time += self.interval
+
+        # Process churn: some exit, the same number start under random parents
+        for pid in rand.sample(list(self._live), min(len(self._live), int(len(self._live) * self.churn))):
+            del self._live[pid]
+            self._spawn(parent=rand.choice(list(self._live)) if self._live else 1)
+
+        process_data = {}
+        for pid, proc in self._live.items():
+            proc["cpu"] += min(proc["load"], 1.0) * self.interval * rand.uniform(0.5, 1.5)
+            proc["rss"] = max(proc["rss"] + rand.randint(-2, 3) * 4096, 4096)
+            proc["io"] += rand.randint(0, 64) * 4096
+            cpu = proc["cpu"]
+            process_data[pid] = {
+                "create_time": proc["create_time"],
+                "name": proc["name"],
+                "ppid": proc["ppid"],
+                "username": proc["username"],
+                "cmdline": proc["cmdline"],
+                "cpu_times": _pcputimes(cpu * 0.8, cpu * 0.2, 0.0, 0.0),
+                "memory_info": _pmem(proc["rss"], proc["rss"] * 3),
+                "io_counters": _pio(proc["io"] // 8192, proc["io"] // 16384, proc["io"] // 2, proc["io"] // 2),
+                "num_threads": 1 + pid % 16,
+                "num_fds": 4 + pid % 64,
+            }
+
+        for core in self._core_times:
+            busy = rand.uniform(0.05, 0.9) * self.interval
+            core[0] += busy * 0.7
+            core[2] += busy * 0.25
+            core[4] += busy * 0.05
+            core[3] += self.interval - busy
+        per_core = [_scputimes(*core) for core in self._core_times]
+        total = _scputimes(*(sum(column) for column in zip(*self._core_times)))
+
+        for counters in self._nics.values():
+            packets = rand.randint(10, 5000)
+            counters[0] += packets * 800
+            counters[1] += packets * 1200
+            counters[2] += packets
+            counters[3] += packets
+        for counters in self._disks.values():
+            reads, writes = rand.randint(0, 200), rand.randint(0, 200)
+            counters[0] += reads
+            counters[1] += writes
+            counters[2] += reads * 16384
+            counters[3] += writes * 16384
+            counters[4] += reads // 4
+            counters[5] += writes // 4
+            counters[6] += int(self.interval * 1000 * rand.uniform(0, 0.5))
+
+        used = sum(proc["rss"] for proc in self._live.values()) % self._memory_total
+        calls = {
+            call_key("cpu_times"): total,
+            call_key("cpu_times", (), {"percpu": True}): per_core,
+            call_key("virtual_memory"): _svmem(self._memory_total, self._memory_total - used,
+                                               round(used / self._memory_total * 100, 1), used, self._memory_total - used),
+            call_key("net_io_counters", (), {"pernic": True, "nowrap": True}):
+                {name: _snetio(*counters) for name, counters in self._nics.items()},
+            call_key("disk_io_counters", (), {"perdisk": True, "nowrap": True}):
+                {name: _sdiskio(*counters) for name, counters in self._disks.items()},
+        }
+        for mountpoint, usage in self._mount_usage.items():
+            calls[call_key("disk_usage", (mountpoint,))] = usage
+        self.apply_tick({"time": self._time, "calls": calls, "processes": process_data})
+        return True
+
+
+def open_backend(source, loop=True):
+    """Build a backend from a recording path or "synthetic[:key=value,...]" """
+    if source.startswith("synthetic"):
+        _, _, spec = source.partition(":")
+        options = {}
+        for item in filter(None, spec.split(",")):
+            key, _, value = item.partition("=")
+            options[key.strip()] = float(value) if key.strip() in ("interval", "churn") else int(value)
+        return SyntheticBackend(**options)
+    return ReplayBackend(source, loop=loop)
+
+
+def replay_collectors(backend, collectors, interval):
+    """Prepend a collector that advances `backend` one tick, ahead of every other collector.
+
+    Collectors that read the host without going through psutil are dropped,
+    since they would show the live host rather than the replayed one.
+    """
+    collectors = {name: spec for name, spec in collectors.items() if name not in UNREPLAYABLE}
+    return {"replay": CollectorSpec(backend.advance, interval, CHEAP), **collectors}
+
+
+def install(backend):
+    """Route the collectors' psutil and clock reads through `backend`"""
+    global _live_process_backend
+    for module in _PSUTIL_MODULES:
+        module.psutil = backend
+    for module in _CLOCK_MODULES:
+        module.time = backend.clock
+    # The /proc fast path would bypass the backend
+    if _live_process_backend is None:
+        _live_process_backend = system_info.get_process_backend()
+    system_info.set_process_backend('psutil')
+    system_info.reset_state()
+
+
+def uninstall():
+    """Restore the live psutil module and clock"""
+    global _live_process_backend
+    for module in _PSUTIL_MODULES:
+        module.psutil = _psutil
+    for module in _CLOCK_MODULES:
+        module.time = _time
+    if _live_process_backend is not None:
+        system_info.set_process_backend(*_live_process_backend)
+        _live_process_backend = None
+    system_info.reset_state()
@@ -0,0 +1,184 @@
+import threading
+import time
+
+from utils.instrumentation import ProfileCapture, instrumentation
+from utils.scheduler import CHEAP, EXPENSIVE, CollectorSpec, Scheduler
+from utils.system_info import collect_snapshot, get_cgroup_usage, get_mount_usage, get_sensor_readings, get_top_processes
+
+
+def default_collectors(process_limit=10, interval=1.0):
+    """Return the collectors the dashboard samples, keyed by name.
+
+    Host-wide gauges run every `interval`; the full process scan, the
+    per-cgroup reads and the per-mount statvfs calls run less often and
+    back off under load.
+    """
+    return {
+        "snapshot": CollectorSpec(collect_snapshot, interval, CHEAP),
+        "mounts": CollectorSpec(get_mount_usage, max(interval, 10.0), EXPENSIVE, max_backoff=6),
+        # rss_growth feeds the process leak alerts; it is computed anyway, so ranking it is cheap
+        "processes": CollectorSpec(lambda: get_top_processes(limit=process_limit, rankings=('cpu', 'memory', 'rss_growth')),
+                                   interval * 2, EXPENSIVE),
+        "cgroups": CollectorSpec(get_cgroup_usage, interval * 2, EXPENSIVE),
+        # Only copies the sensor thread's cached values
+        "sensors": CollectorSpec(get_sensor_readings, max(interval, 5.0), CHEAP),
+        "self": CollectorSpec(instrumentation.self_usage, max(interval, 2.0), CHEAP),
+    }
+
+
+class Sampler:
+    """Runs the system_info collectors on a background thread.
+
+    Each tick produces a sample dict that is published into a single
+    latest-value slot. Readers (the Tk event loop) call latest() and compare
+    the sequence number to find out whether anything new has arrived, so
+    they never block on collection.
+
+    Collectors are CollectorSpecs (plain callables run every `interval`) and
+    a Scheduler decides which of them are due on each tick. A sample's
+    'data' always holds the latest value of every collector; 'fresh' names
+    the ones that were actually re-run for that sample.
+    """
+
+    def __init__(self, collectors=None, interval=1.0):
+        collectors = collectors if collectors is not None else default_collectors(interval=interval)
+        self.collectors = {
+            name: spec if isinstance(spec, CollectorSpec) else CollectorSpec(spec, interval)
+            for name, spec in collectors.items()
+        }
+        self.interval = interval
+        self.scheduler = Scheduler(self.collectors)
+        self._data = {name: None for name in self.collectors}
+
+        self._lock = threading.Lock()
+        self._latest = None
+        self._sequence = 0
+        self._listeners = []
+        self._wakeup = threading.Event()
+        self._force = False
+        self._profile = None
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the sampling thread (no-op if already running)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="health-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """Ask the sampling thread to exit and wait for it"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def trigger(self):
+        """Wake the sampling thread and re-run every collector immediately"""
+        self._force = True
+        self._wakeup.set()
+
+    def start_profile(self, ticks, path):
+        """Profile the sampling thread for the next `ticks` ticks; see ProfileCapture"""
+        self._profile = ProfileCapture(ticks, path)
+        return self._profile
+
+    def set_active(self, name, active):
+        """Tell the scheduler whether a collector's data is currently on screen"""
+        if name in self.collectors:
+            self.scheduler.set_active(name, active)
+            if active:
+                self._wakeup.set()
+
+    def add_listener(self, callback):
+        """Call callback(sample) on the sampling thread after every sample.
+
+        Listeners are for work that must see every sample (persistence,
+        exporters); they should be quick, since they delay the next tick.
+        """
+        self._listeners.append(callback)
+
+    def latest(self):
+        """Return (sequence, sample) for the most recent sample.
+
+        sequence is 0 and sample is None until the first tick completes.
+        """
+        with self._lock:
+            return self._sequence, self._latest
+
+    def sample_once(self, names=None):
+        """Run the given collectors (all by default), publish and return the sample"""
+        names = list(self.collectors) if names is None else names
+        timings = {}
+        errors = {}
+        started = time.perf_counter()
+
+        for name in names:
+            collector_started = time.perf_counter()
+            try:
+                self._data[name] = self.collectors[name].func()
+            except Exception as e:
+                self._data[name] = None
+                errors[name] = str(e)
+            timings[name] = time.perf_counter() - collector_started
+            self.scheduler.record(name, timings[name])
+            instrumentation.record(f"collector.{name}", timings[name])
+
+        # Expensive collectors back off while the host is busy
+        snapshot = self._data.get('snapshot')
+        if 'snapshot' in names and snapshot is not None:
+            self.scheduler.update_load(snapshot.cpu_percent / 100)
+
+        sample = {
+            "timestamp": time.time(),
+            "data": dict(self._data),
+            "fresh": frozenset(names),
+            "timings": timings,
+            "errors": errors,
+            "duration": time.perf_counter() - started,
+        }
+
+        with self._lock:
+            self._sequence += 1
+            self._latest = sample
+
+        for listener in self._listeners:
+            listener_name = getattr(listener, '__name__', type(listener).__name__)
+            try:
+                with instrumentation.timer(f"listener.{listener_name}"):
+                    listener(sample)
+            except Exception as e:
+                sample['errors'][listener_name] = str(e)
+        instrumentation.record("sampler.tick", time.perf_counter() - started)
+        return sample
+
+    def run_due(self):
+        """Run whichever collectors are due (all of them after trigger()).
+
+        Returns the new sample, or None if nothing was due.
+        """
+        force, self._force = self._force, False
+        names = self.scheduler.due(force=force)
+        if not names:
+            return None
+        if self._profile is not None:
+            self._profile.tick()
+            if self._profile.done:
+                self._profile = None
+        return self.sample_once(names)
+
+    def seconds_until_due(self):
+        return self.scheduler.seconds_until_due()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self.run_due()
+
+            # Sleep until the next collector is due, waking early on trigger()/stop()/set_active()
+            remaining = self.seconds_until_due()
+            if remaining > 0:
+                self._wakeup.wait(remaining)
+            self._wakeup.clear()
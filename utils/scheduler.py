@@ -0,0 +1,98 @@
+import threading
+import time
+
+CHEAP = "cheap"
+EXPENSIVE = "expensive"
+
+
+class CollectorSpec:
+    """A collector plus how often it should run and how costly it is.
+
+    interval is the nominal period in seconds. Expensive collectors are the
+    ones the scheduler slows down when the host is busy, when nobody is
+    looking at their data, or when they eat more than their share of time.
+    """
+
+    __slots__ = ("func", "interval", "cost", "max_backoff")
+
+    def __init__(self, func, interval=1.0, cost=CHEAP, max_backoff=8):
+        self.func = func
+        self.interval = interval
+        self.cost = cost
+        self.max_backoff = max_backoff
+
+
+class Scheduler:
+    """Decides which collectors are due on each tick.
+
+    Every collector has a backoff factor multiplying its interval. For
+    expensive collectors the factor doubles (up to max_backoff) each time
+    they run while the host CPU load is above `load_threshold` or while
+    their own run time exceeds `max_duty` of their interval, and halves
+    again once conditions recover. Collectors marked inactive (e.g. the
+    dashboard tab showing them is hidden) run at max_backoff.
+    """
+
+    def __init__(self, specs, load_threshold=0.85, max_duty=0.05):
+        self.specs = dict(specs)
+        self.load_threshold = load_threshold
+        self.max_duty = max_duty
+        self._lock = threading.Lock()
+        self._next_due = {name: 0.0 for name in self.specs}
+        self._backoff = {name: 1 for name in self.specs}
+        self._inactive = set()
+        self._load = 0.0
+
+    def set_active(self, name, active):
+        """Mark whether anyone currently consumes a collector's data"""
+        with self._lock:
+            if active:
+                if name in self._inactive:
+                    self._inactive.discard(name)
+                    # Refresh right away instead of waiting out the idle interval
+                    self._next_due[name] = 0.0
+            else:
+                self._inactive.add(name)
+
+    def update_load(self, load):
+        """Report host CPU load as a fraction (1.0 == all cores busy)"""
+        self._load = load
+
+    def effective_interval(self, name):
+        spec = self.specs[name]
+        if spec.cost == EXPENSIVE and name in self._inactive:
+            return spec.interval * spec.max_backoff
+        return spec.interval * self._backoff[name]
+
+    def due(self, now=None, force=False):
+        """Return the names of collectors that should run now"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if force:
+                return list(self.specs)
+            # Small tolerance so collectors on multiples of the base tick don't slip a whole tick
+            return [name for name, due in self._next_due.items() if due <= now + 0.01]
+
+    def record(self, name, duration, now=None):
+        """Record that a collector ran and schedule its next run"""
+        now = time.monotonic() if now is None else now
+        spec = self.specs[name]
+        with self._lock:
+            if spec.cost == EXPENSIVE:
+                budget = spec.interval * self._backoff[name] * self.max_duty
+                if self._load >= self.load_threshold or duration > budget:
+                    self._backoff[name] = min(self._backoff[name] * 2, spec.max_backoff)
+                elif duration < budget / 2:
+                    # Only speed back up with headroom, so it doesn't flap at the boundary
+                    self._backoff[name] = max(self._backoff[name] // 2, 1)
+            self._next_due[name] = now + self.effective_interval(name)
+
+    def seconds_until_due(self, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            return max(0.0, min(self._next_due.values(), default=now + 1.0) - now)
+
+    def backoff(self):
+        """Return {name: current interval multiplier} for diagnostics"""
+        with self._lock:
+            return {name: self.effective_interval(name) / self.specs[name].interval for name in self.specs}
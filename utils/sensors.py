@@ -0,0 +1,271 @@
+"""
+Hardware sensors (temperatures and fans) read off the sampling tick.
+
+psutil.sensors_temperatures() walks every hwmon and thermal sysfs node on
+each call, which takes tens of milliseconds and can block on a flaky
+driver. SensorMonitor instead discovers the sensor files (and their
+static thresholds) once, then re-reads just the value files on its own
+thread every `interval` seconds, each read with a timeout. Collectors only
+ever call readings(), which serves the last good value of every sensor
+from memory and marks values older than `ttl` as stale.
+
+Off Linux the monitor falls back to psutil's sensor functions, run on the
+same thread with the same timeout.
+"""
+
+import glob
+import os
+import sys
+import threading
+import time
+from collections import namedtuple
+
+import psutil
+
+# One discovered sensor; values are divided by `scale` (millidegrees -> degrees)
+Sensor = namedtuple("Sensor", ["kind", "chip", "label", "path", "scale", "low", "high", "critical"])
+
+# Temperatures are in degrees Celsius, fans in RPM. A fan's `low` is its
+# minimum speed alarm; temperatures have no `low`. status is one of ok,
+# low, high, critical, stale (older than the TTL), timeout or error.
+SensorReading = namedtuple("SensorReading", [
+    "kind", "chip", "label", "value", "low", "high", "critical", "status", "age",
+])
+
+DEFAULT_ROOT = "/sys/class"
+
+
+def _read_text(path):
+    with open(path, encoding="utf-8", errors="replace") as f:
+        return f.read().strip()
+
+
+def _read_number(path, scale=1):
+    """Number in a sysfs file divided by `scale`, or None if missing/unreadable/zero"""
+    try:
+        value = float(_read_text(path)) / scale
+    except (OSError, ValueError):
+        return None
+    return value or None
+
+
+def _hwmon_sensors(root):
+    sensors = []
+    for directory in sorted(glob.glob(os.path.join(root, "hwmon", "hwmon*"))):
+        try:
+            chip = _read_text(os.path.join(directory, "name"))
+        except OSError:
+            chip = os.path.basename(directory)
+        for kind, prefix, scale in (("temperature", "temp", 1000), ("fan", "fan", 1)):
+            for path in sorted(glob.glob(os.path.join(directory, f"{prefix}*_input"))):
+                base = path[:-len("_input")]
+                try:
+                    label = _read_text(base + "_label")
+                except OSError:
+                    label = os.path.basename(base)
+                if kind == "temperature":
+                    sensors.append(Sensor(kind, chip, label, path, scale, None,
+                                          _read_number(base + "_max", scale), _read_number(base + "_crit", scale)))
+                else:
+                    sensors.append(Sensor(kind, chip, label, path, scale,
+                                          _read_number(base + "_min"), _read_number(base + "_max"), None))
+    return sensors
+
+
+def _thermal_sensors(root, known_chips):
+    sensors = []
+    for directory in sorted(glob.glob(os.path.join(root, "thermal", "thermal_zone*"))):
+        try:
+            chip = _read_text(os.path.join(directory, "type"))
+        except OSError:
+            continue
+        # hwmon usually exposes the same zone already
+        if chip in known_chips:
+            continue
+        high = critical = None
+        for trip in glob.glob(os.path.join(directory, "trip_point_*_type")):
+            try:
+                trip_type = _read_text(trip)
+            except OSError:
+                continue
+            value = _read_number(trip.replace("_type", "_temp"), 1000)
+            if trip_type == "critical":
+                critical = value
+            elif trip_type == "hot" or (trip_type == "passive" and high is None):
+                high = value
+        sensors.append(Sensor("temperature", chip, os.path.basename(directory),
+                              os.path.join(directory, "temp"), 1000, None, high, critical))
+    return sensors
+
+
+def discover_sensors(root=DEFAULT_ROOT):
+    """Every temperature and fan sensor under a sysfs class directory, with its thresholds"""
+    sensors = _hwmon_sensors(root)
+    return sensors + _thermal_sensors(root, {sensor.chip for sensor in sensors})
+
+
+def _status(sensor, value):
+    if sensor.critical is not None and value >= sensor.critical:
+        return "critical"
+    if sensor.high is not None and value >= sensor.high:
+        return "high"
+    if sensor.low is not None and value < sensor.low:
+        return "low"
+    return "ok"
+
+
+def hottest_temperature(readings):
+    """Highest current temperature among readings, or None"""
+    values = [reading.value for reading in readings or ()
+              if reading.kind == "temperature" and reading.value is not None]
+    return max(values) if values else None
+
+
+class _Read:
+    """One call on its own daemon thread.
+
+    A read stuck in a driver can then neither stall the poll (it waits with
+    a timeout) nor keep the process from exiting, which a thread pool
+    worker would.
+    """
+
+    __slots__ = ("done", "_value", "_error")
+
+    def __init__(self, func, *args):
+        self.done = threading.Event()
+        self._value = self._error = None
+        threading.Thread(target=self._run, args=(func, args), name="sensor-read", daemon=True).start()
+
+    def _run(self, func, args):
+        try:
+            self._value = func(*args)
+        except Exception as e:
+            self._error = e
+        finally:
+            self.done.set()
+
+    def result(self):
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+
+class SensorMonitor:
+    """Reads sensors in the background and serves the last good values; see the module docstring"""
+
+    def __init__(self, root=DEFAULT_ROOT, interval=10.0, timeout=1.0, ttl=60.0):
+        self.root = root
+        self.interval = interval
+        self.timeout = timeout
+        self.ttl = ttl
+        self._use_sysfs = sys.platform.startswith("linux") and os.path.isdir(root)
+        self._lock = threading.Lock()
+        self._sensors = None
+        self._pending = {}
+        # sensor key -> [sensor, last good value, monotonic time it was read, last failure]
+        self._cache = {}
+        self._polled = False
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="sensors", daemon=True)
+            self._thread.start()
+
+    def close(self):
+        self._stopped.set()
+
+    def readings(self):
+        """Cached SensorReading for every sensor, or None before the first poll; never touches the hardware"""
+        if not self._polled:
+            return None
+        now = time.monotonic()
+        readings = []
+        with self._lock:
+            for sensor, value, read_at, failure in self._cache.values():
+                age = now - read_at if read_at is not None else None
+                if value is None:
+                    status = failure or "error"
+                elif age > self.ttl:
+                    status = "stale"
+                    value = None
+                else:
+                    status = _status(sensor, value)
+                readings.append(SensorReading(sensor.kind, sensor.chip, sensor.label, value,
+                                              sensor.low, sensor.high, sensor.critical, status, age))
+        return readings
+
+    def _run(self):
+        # The one slow walk of the sensor tree happens here, never on a caller's thread
+        if self._use_sysfs:
+            self._sensors = discover_sensors(self.root)
+        while not self._stopped.is_set():
+            self.poll()
+            self._polled = True
+            self._stopped.wait(self.interval)
+
+    def poll(self):
+        """Read every sensor once (called by the background thread)"""
+        if not self._use_sysfs:
+            self._poll_psutil()
+            return
+        reads = {}
+        for sensor in self._sensors or ():
+            # Two chips of one kind (e.g. per-socket coretemp) can share labels, so key by file
+            key = sensor.path
+            read = self._pending.get(key)
+            if read is None or read.done.is_set():
+                read = self._pending[key] = _Read(_read_text, sensor.path)
+            reads[key] = (sensor, read)
+
+        deadline = time.monotonic() + self.timeout
+        for key, (sensor, read) in reads.items():
+            if not read.done.wait(max(0.0, deadline - time.monotonic())):
+                self._store(key, sensor, None, "timeout")
+                continue
+            try:
+                value = float(read.result()) / sensor.scale
+            except (OSError, ValueError):
+                self._store(key, sensor, None, "error")
+            else:
+                self._store(key, sensor, value)
+
+    def _poll_psutil(self):
+        def read_all():
+            temperatures = getattr(psutil, "sensors_temperatures", dict)()
+            fans = getattr(psutil, "sensors_fans", dict)()
+            return temperatures, fans
+
+        read = self._pending.get("psutil")
+        if read is None or read.done.is_set():
+            read = self._pending["psutil"] = _Read(read_all)
+        if not read.done.wait(self.timeout):
+            with self._lock:
+                for entry in self._cache.values():
+                    entry[3] = "timeout"
+            return
+        try:
+            temperatures, fans = read.result()
+        except Exception:
+            return
+        for kind, chips in (("temperature", temperatures), ("fan", fans)):
+            for chip, entries in chips.items():
+                for index, entry in enumerate(entries):
+                    label = entry.label or f"{kind}{index + 1}"
+                    high = getattr(entry, "high", None)
+                    critical = getattr(entry, "critical", None)
+                    sensor = Sensor(kind, chip, label, None, 1, None, high or None, critical or None)
+                    self._store((kind, chip, label), sensor, entry.current)
+
+    def _store(self, key, sensor, value, failure=None):
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                entry = self._cache[key] = [sensor, None, None, None]
+            entry[0] = sensor
+            entry[3] = failure
+            # Failed reads keep serving the last good value until it goes stale
+            if value is not None:
+                entry[1] = value
+                entry[2] = time.monotonic()
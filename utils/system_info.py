@@ -1,118 +1,355 @@
 import psutil
 import datetime
+import functools
 import time
+import threading
+from collections import namedtuple
 
-# Global variables for caching CPU data
-_cpu_cache = None
-_last_cpu_update = 0
+from utils.cgroups import CgroupMonitor, find_cgroup2_root
+from utils.disks import DiskMonitor
+from utils.process_history import ProcessHistory
+from utils.processes import ProcessTable, RANKINGS, top_k
+from utils import procfs
+from utils.sensors import SensorMonitor
+from utils.rates import CounterDeltas, device_rates, interface_rates, is_partition
 
-def get_cpu_info():
-    global _cpu_cache, _last_cpu_update
-    current_time = time.time()
-    
-    # Use cached value if recent (within 1 second)
-    if _cpu_cache is not None and current_time - _last_cpu_update < 1:
-        cpu_usage_percentage = _cpu_cache
-    else:
-        # Get fresh CPU reading
-        cpu_usage_percentage = psutil.cpu_percent(interval=0.1)
-        _cpu_cache = cpu_usage_percentage
-        _last_cpu_update = current_time
-    
-    logical_cores = psutil.cpu_count(logical=True)
-    physical_cores = psutil.cpu_count(logical=False)
-    
+GB = 1024 ** 3
+MB = 1024 ** 2
+
+# Processes from the top of each ranking that get a history (plus pinned ones)
+HISTORY_TOP_N = 20
+
+# One consistent reading of every host-wide gauge. Raw byte counts are kept so
+# views can pick their own units; the get_*_info() functions below format them.
+Snapshot = namedtuple("Snapshot", [
+    "timestamp",
+    "cpu_percent", "cpu_per_core", "cpu_user", "cpu_system", "cpu_iowait", "cpu_steal",
+    "logical_cores", "physical_cores", "cpu_freq_mhz",
+    "memory_total", "memory_used", "memory_free", "memory_percent",
+    "disk_total", "disk_used", "disk_free", "disk_percent",
+    "net_bytes_sent", "net_bytes_recv", "net_packets_sent", "net_packets_recv",
+    "net_send_rate", "net_recv_rate", "net_packets_sent_rate", "net_packets_recv_rate",
+    "disk_read_rate", "disk_write_rate", "disk_read_iops", "disk_write_iops",
+    "net_interfaces", "disk_devices",
+    "boot_time",
+])
+
+def _cpu_total(times):
+    # guest/guest_nice are already accounted for in user/nice on Linux
+    total = sum(times)
+    total -= getattr(times, 'guest', 0)
+    total -= getattr(times, 'guest_nice', 0)
+    return total
+
+def _cpu_busy(times):
+    return _cpu_total(times) - times.idle - getattr(times, 'iowait', 0)
+
+class CpuSampler:
+    """Computes CPU utilisation from the delta between successive cpu_times.
+
+    Unlike psutil.cpu_percent(interval=...) this never sleeps: each call
+    compares the current counters with the ones kept from the previous call.
+    The very first call compares against zero, i.e. reports the average
+    since boot.
+    """
+
+    BREAKDOWN_FIELDS = ('user', 'system', 'iowait', 'steal')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_total = None
+        self._last_per_core = None
+
+    def sample(self):
+        """Return a dict with overall, per-core and per-state percentages"""
+        total_times = psutil.cpu_times()
+        per_core_times = psutil.cpu_times(percpu=True)
+        
+        with self._lock:
+            previous_total = self._last_total
+            previous_per_core = self._last_per_core
+            self._last_total = total_times
+            self._last_per_core = per_core_times
+        
+        overall, breakdown = self._percentages(previous_total, total_times)
+        per_core = []
+        for index, core_times in enumerate(per_core_times):
+            # Cores can appear when CPUs are hot-plugged; treat them as new
+            previous = previous_per_core[index] if previous_per_core and index < len(previous_per_core) else None
+            per_core.append(self._percentages(previous, core_times)[0])
+        
+        return {
+            'percent': overall,
+            'per_core': tuple(per_core),
+            'breakdown': breakdown,
+        }
+
+    def _percentages(self, previous, current):
+        total_delta = _cpu_total(current) - (_cpu_total(previous) if previous else 0)
+        if total_delta <= 0:
+            # No time elapsed (or counters went backwards); nothing to report
+            return 0.0, {field: 0.0 for field in self.BREAKDOWN_FIELDS}
+        
+        busy_delta = _cpu_busy(current) - (_cpu_busy(previous) if previous else 0)
+        overall = min(max(busy_delta / total_delta * 100, 0.0), 100.0)
+        
+        breakdown = {}
+        for field in self.BREAKDOWN_FIELDS:
+            delta = getattr(current, field, 0) - (getattr(previous, field, 0) if previous else 0)
+            breakdown[field] = min(max(delta / total_delta * 100, 0.0), 100.0)
+        return overall, breakdown
+
+# How the full process scan reads the process table: 'auto' (the /proc fast
+# path on Linux, psutil elsewhere), 'procfs' or 'psutil'
+PROCESS_BACKENDS = ('auto', 'procfs', 'psutil')
+_process_backend = ('auto', 0)
+
+def _make_process_table():
+    backend, workers = _process_backend
+    if backend != 'psutil' and procfs.available():
+        return procfs.ProcfsProcessTable(workers=workers)
+    return ProcessTable()
+
+def set_process_backend(backend, workers=0):
+    """Choose the process table implementation; `workers` > 1 shards the /proc scan"""
+    global _process_backend, _process_table, _process_list_table
+    if backend not in PROCESS_BACKENDS:
+        raise ValueError(f"Unknown process backend {backend!r}; expected one of {', '.join(PROCESS_BACKENDS)}")
+    if backend == 'procfs' and not procfs.available():
+        raise ValueError("The procfs process backend needs a Linux /proc")
+    _process_backend = (backend, workers)
+    _process_table = _make_process_table()
+    _process_list_table = None
+
+def get_process_backend():
+    """(backend, workers) as last passed to set_process_backend()"""
+    return _process_backend
+
+_cpu_sampler = CpuSampler()
+_process_table = _make_process_table()
+# The explorer's full listing keeps its own table: every refresh moves the
+# per-process CPU and growth baselines, which the top-N table measures against
+_process_list_table = None
+_net_deltas = CounterDeltas()
+_disk_deltas = CounterDeltas()
+_whole_disk_cache = (None, frozenset())
+_disk_monitor = None
+_cgroup_monitor = None
+_sensor_monitor = None
+_process_history = ProcessHistory()
+_last_snapshot = None
+
+# How old the last snapshot may be for a get_*_info() call without one to reuse it
+SNAPSHOT_REUSE_SECONDS = 2.0
+
+def reset_state():
+    """Forget everything carried between ticks (CPU/counter baselines, process
+    index, mount cache), e.g. after switching to a replay backend"""
+    global _cpu_sampler, _process_table, _net_deltas, _disk_deltas, _whole_disk_cache, _disk_monitor, _process_history
+    global _cgroup_monitor, _sensor_monitor, _last_snapshot, _process_list_table
+    if _disk_monitor is not None:
+        _disk_monitor.close()
+    if _sensor_monitor is not None:
+        _sensor_monitor.close()
+    _static_facts.cache_clear()
+    _cpu_sampler = CpuSampler()
+    _process_table = _make_process_table()
+    _process_list_table = None
+    _net_deltas = CounterDeltas()
+    _disk_deltas = CounterDeltas()
+    _whole_disk_cache = (None, frozenset())
+    _disk_monitor = None
+    _cgroup_monitor = None
+    _sensor_monitor = None
+    _process_history = ProcessHistory()
+    _last_snapshot = None
+
+def _read_cpu_freq():
     # Handle CPU frequency (not available on all systems like macOS)
     try:
         cpu_freq = psutil.cpu_freq()
-        frequency_mhz = cpu_freq.current if cpu_freq else 0
+        return cpu_freq.current if cpu_freq else 0
     except (AttributeError, FileNotFoundError, OSError):
-        frequency_mhz = 0  # CPU frequency not available on this system
+        return 0  # CPU frequency not available on this system
+
+def _read_disk_io():
+    # Not available on every platform/container (e.g. no /proc/diskstats)
+    try:
+        return psutil.disk_io_counters(perdisk=True, nowrap=True) or {}
+    except (RuntimeError, NotImplementedError, OSError):
+        return {}
+
+def _whole_disks(names):
+    global _whole_disk_cache
+    names = frozenset(names)
+    if _whole_disk_cache[0] != names:
+        _whole_disk_cache = (names, frozenset(name for name in names if not is_partition(name, names)))
+    return _whole_disk_cache[1]
+
+def _io_rates(timestamp, nics, disks):
+    """Turn this tick's per-NIC and per-disk counters into per-second rates"""
+    net_deltas, net_elapsed = _net_deltas.update(nics, timestamp)
+    disk_deltas, disk_elapsed = _disk_deltas.update(disks, timestamp)
+    interfaces = tuple(interface_rates(name, delta, net_elapsed) for name, delta in sorted(net_deltas.items()))
+    devices = tuple(device_rates(name, delta, disk_elapsed) for name, delta in sorted(disk_deltas.items()))
+    return interfaces, devices
+
+@functools.lru_cache(maxsize=None)
+def _static_facts():
+    """Core counts and boot time never change while the host is up; read them once"""
+    return psutil.cpu_count(logical=True), psutil.cpu_count(logical=False), psutil.boot_time()
+
+def collect_snapshot():
+    """Read each kernel source exactly once and return a Snapshot"""
+    global _last_snapshot
+    cpu = _cpu_sampler.sample()
+    memory = psutil.virtual_memory()
+    disk = psutil.disk_usage('/')
+    nics = psutil.net_io_counters(pernic=True, nowrap=True)
+    disks = _read_disk_io()
+    timestamp = time.time()
+    logical_cores, physical_cores, boot_time = _static_facts()
     
+    interfaces, devices = _io_rates(timestamp, nics, disks)
+    # Partitions are already counted in their parent disk
+    whole_disks = [device for device in devices if device.name in _whole_disks(disks)]
+    
+    _last_snapshot = Snapshot(
+        timestamp=timestamp,
+        cpu_percent=cpu['percent'],
+        cpu_per_core=cpu['per_core'],
+        cpu_user=cpu['breakdown']['user'],
+        cpu_system=cpu['breakdown']['system'],
+        cpu_iowait=cpu['breakdown']['iowait'],
+        cpu_steal=cpu['breakdown']['steal'],
+        logical_cores=logical_cores,
+        physical_cores=physical_cores,
+        cpu_freq_mhz=_read_cpu_freq(),
+        memory_total=memory.total,
+        memory_used=memory.used,
+        memory_free=memory.free,
+        memory_percent=memory.percent,
+        disk_total=disk.total,
+        disk_used=disk.used,
+        disk_free=disk.free,
+        disk_percent=disk.percent,
+        net_bytes_sent=sum(nic.bytes_sent for nic in nics.values()),
+        net_bytes_recv=sum(nic.bytes_recv for nic in nics.values()),
+        net_packets_sent=sum(nic.packets_sent for nic in nics.values()),
+        net_packets_recv=sum(nic.packets_recv for nic in nics.values()),
+        net_send_rate=sum(nic.bytes_sent for nic in interfaces),
+        net_recv_rate=sum(nic.bytes_recv for nic in interfaces),
+        net_packets_sent_rate=sum(nic.packets_sent for nic in interfaces),
+        net_packets_recv_rate=sum(nic.packets_recv for nic in interfaces),
+        disk_read_rate=sum(device.read_bytes for device in whole_disks),
+        disk_write_rate=sum(device.write_bytes for device in whole_disks),
+        disk_read_iops=sum(device.read_iops for device in whole_disks),
+        disk_write_iops=sum(device.write_iops for device in whole_disks),
+        net_interfaces=interfaces,
+        disk_devices=devices,
+        boot_time=boot_time,
+    )
+    return _last_snapshot
+
+def _recent_snapshot():
+    """The last snapshot if it is recent enough, otherwise a new one.
+
+    CPU and I/O rates are deltas against the previous snapshot, so a getter
+    taking its own snapshot between the sampler's ticks would cut short the
+    window the sampler's next snapshot measures.
+    """
+    snapshot = _last_snapshot
+    if snapshot is None or time.time() - snapshot.timestamp > SNAPSHOT_REUSE_SECONDS:
+        snapshot = collect_snapshot()
+    return snapshot
+
+def get_cpu_info(snapshot=None):
+    snapshot = snapshot or _recent_snapshot()
     return {
-        "CPU Usage (%)": cpu_usage_percentage,
-        "Logical Cores": logical_cores,
-        "Physical Cores": physical_cores,
-        "Frequency (MHz)": frequency_mhz
+        "CPU Usage (%)": snapshot.cpu_percent,
+        "Logical Cores": snapshot.logical_cores,
+        "Physical Cores": snapshot.physical_cores,
+        "Frequency (MHz)": snapshot.cpu_freq_mhz,
+        "Per-Core Usage (%)": snapshot.cpu_per_core,
+        "User (%)": snapshot.cpu_user,
+        "System (%)": snapshot.cpu_system,
+        "I/O Wait (%)": snapshot.cpu_iowait,
+        "Steal (%)": snapshot.cpu_steal
     }
 
-def get_memory_info():
-    total_memory = psutil.virtual_memory().total / (1024 ** 3)
-    used_memory = psutil.virtual_memory().used / (1024 ** 3)
-    free_memory = psutil.virtual_memory().free / (1024 ** 3)
-    memory_usage = psutil.virtual_memory().percent
+def get_memory_info(snapshot=None):
+    snapshot = snapshot or _recent_snapshot()
     return {
-        "Total Memory (GB)": total_memory,
-        "Used Memory (GB)": used_memory,
-        "Free Memory (GB)": free_memory,
-        "Memory Usage (%)": memory_usage
+        "Total Memory (GB)": snapshot.memory_total / GB,
+        "Used Memory (GB)": snapshot.memory_used / GB,
+        "Free Memory (GB)": snapshot.memory_free / GB,
+        "Memory Usage (%)": snapshot.memory_percent
     }
 
-def get_disk_info():    
-    total_disk = psutil.disk_usage('/').total / (1024 ** 3)
-    used_disk = psutil.disk_usage('/').used / (1024 ** 3)
-    free_disk = psutil.disk_usage('/').free / (1024 ** 3)
-    disk_usage = psutil.disk_usage('/').percent
-
+def get_disk_info(snapshot=None):
+    snapshot = snapshot or _recent_snapshot()
     return {
-        "Total Disk (GB)": total_disk,
-        "Used Disk (GB)": used_disk,
-        "Free Disk (GB)": free_disk,
-        "Disk Usage (%)": disk_usage
+        "Total Disk (GB)": snapshot.disk_total / GB,
+        "Used Disk (GB)": snapshot.disk_used / GB,
+        "Free Disk (GB)": snapshot.disk_free / GB,
+        "Disk Usage (%)": snapshot.disk_percent
     }
 
-def get_network_info():
-    total_network_sent = psutil.net_io_counters().bytes_sent / (1024 ** 3)
-    total_network_recv = psutil.net_io_counters().bytes_recv / (1024 ** 3)
-    network_usage = (psutil.net_io_counters().bytes_sent / (1024 ** 3) + psutil.net_io_counters().bytes_recv / (1024 ** 3))
+def get_network_info(snapshot=None):
+    snapshot = snapshot or _recent_snapshot()
+    return {
+        "Total Network Sent (GB)": snapshot.net_bytes_sent / GB,
+        "Total Network Received (GB)": snapshot.net_bytes_recv / GB,
+        "Network Usage (%)": (snapshot.net_bytes_sent + snapshot.net_bytes_recv) / GB,
+        "Send Rate (MB/s)": snapshot.net_send_rate / MB,
+        "Receive Rate (MB/s)": snapshot.net_recv_rate / MB,
+        "Packets Sent (/s)": snapshot.net_packets_sent_rate,
+        "Packets Received (/s)": snapshot.net_packets_recv_rate,
+        "Interfaces": snapshot.net_interfaces
+    }
 
+def get_disk_io_info(snapshot=None):
+    snapshot = snapshot or _recent_snapshot()
     return {
-        "Total Network Sent (GB)": total_network_sent,
-        "Total Network Received (GB)": total_network_recv,
-        "Network Usage (%)": network_usage
+        "Read Rate (MB/s)": snapshot.disk_read_rate / MB,
+        "Write Rate (MB/s)": snapshot.disk_write_rate / MB,
+        "Read IOPS": snapshot.disk_read_iops,
+        "Write IOPS": snapshot.disk_write_iops,
+        "Devices": snapshot.disk_devices
     }
 
-def get_uptime_info():
-    current_time = datetime.datetime.now()
-    uptime = current_time - datetime.datetime.fromtimestamp(psutil.boot_time())
+def get_uptime_info(snapshot=None):
+    snapshot = snapshot or _recent_snapshot()
+    uptime = datetime.datetime.fromtimestamp(snapshot.timestamp) - datetime.datetime.fromtimestamp(snapshot.boot_time)
     return {
         "Uptime (seconds)": uptime
     }
 
-def get_top_processes(limit=10):
+def get_mount_usage():
+    """Usage of every real mount, worst first; see utils.disks.DiskMonitor"""
+    global _disk_monitor
+    if _disk_monitor is None:
+        _disk_monitor = DiskMonitor()
+    return _disk_monitor.sample()
+
+def get_top_processes(limit=10, rankings=('cpu', 'memory')):
     try:
-        # Get all processes with their CPU and memory info (fast approach for GUI)
-        process_list = []
-        
-        # Get CPU percentages for all processes without blocking
-        for proc in psutil.process_iter(['pid', 'name', 'memory_percent', 'memory_info']):
-            try:
-                process_info = proc.info
-                if process_info['memory_percent'] is not None:
-                    # Get CPU percentage without blocking for GUI
-                    cpu_percent = proc.cpu_percent()
-                    
-                    process_list.append({
-                        'pid': process_info['pid'],
-                        'name': process_info['name'],
-                        'cpu_percent': cpu_percent,
-                        'memory_percent': process_info['memory_percent'],
-                        'memory_mb': process_info['memory_info'].rss / (1024 * 1024) if process_info['memory_info'] else 0
-                    })
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                continue
+        # Only read the per-process attributes the requested rankings need
+        rankings = tuple(dict.fromkeys(('cpu', 'memory') + tuple(rankings)))
+        columns = _process_table.refresh(fields=[RANKINGS[ranking] for ranking in rankings])
         
-        # Sort by CPU usage (descending)
-        top_cpu_processes = sorted(process_list, key=lambda x: x['cpu_percent'], reverse=True)[:limit]
+        # Bounded heap selection for every ranking in a single pass
+        selected = top_k(columns, rankings, limit)
         
-        # Sort by memory usage (descending)
-        top_memory_processes = sorted(process_list, key=lambda x: x['memory_percent'], reverse=True)[:limit]
-        
-        return {
-            "top_cpu_processes": top_cpu_processes,
-            "top_memory_processes": top_memory_processes,
-            "total_processes": len(process_list)
+        result = {
+            f"top_{ranking}_processes": [columns.row(index) for index in indices]
+            for ranking, indices in selected.items()
         }
+        result["total_processes"] = len(columns)
+        
+        _record_history(columns, selected)
+        result["leaking_processes"] = _process_history.leaks()
+        return result
     except Exception as e:
         return {
             "error": f"Failed to get top processes: {str(e)}",
@@ -121,6 +358,65 @@ def get_top_processes(limit=10):
             "total_processes": 0
         }
 
+def _record_history(columns, selected):
+    """Append this tick to the history of the top processes and any pinned ones"""
+    tracked = {}
+    for indices in selected.values():
+        for index in indices[:HISTORY_TOP_N]:
+            tracked[columns.pid[index]] = index
+    pinned = _process_history.pinned() - tracked.keys()
+    if pinned:
+        for index, pid in enumerate(columns.pid):
+            if pid in pinned:
+                tracked[pid] = index
+    
+    # FDs and threads are only worth reading for the handful of tracked processes
+    extra = _process_table.read_fields(tracked, ('num_fds', 'num_threads'))
+    rows = []
+    for pid, index in tracked.items():
+        row = columns.row(index)
+        row.update(extra.get(pid, {}))
+        rows.append(row)
+    _process_history.update(time.time(), rows)
+
+def get_process_history(pid):
+    """History of one tracked process (see ProcessHistory.series), or None"""
+    return _process_history.series(pid)
+
+def pin_process(pid, pinned=True):
+    """Keep (or stop keeping) a history for `pid` whatever its ranking"""
+    _process_history.pin(pid, pinned)
+
+def get_cgroup_usage():
+    """Per-cgroup usage, worst first (see utils.cgroups.CgroupMonitor); empty without cgroup v2"""
+    global _cgroup_monitor
+    if _cgroup_monitor is None:
+        root = find_cgroup2_root()
+        if root is None:
+            return []
+        _cgroup_monitor = CgroupMonitor(root)
+    return _cgroup_monitor.sample()
+
+def get_process_list():
+    """Return ProcessColumns for every process, with usernames and command lines"""
+    global _process_list_table
+    if _process_list_table is None:
+        _process_list_table = _make_process_table()
+    return _process_list_table.refresh(details=True)
+
+def get_sensor_readings():
+    """Cached temperature and fan readings (see utils.sensors.SensorMonitor).
+
+    The sensors are read on their own thread; this only copies the last
+    good values, so it adds no latency to the tick. None until the first
+    read has finished.
+    """
+    global _sensor_monitor
+    if _sensor_monitor is None:
+        _sensor_monitor = SensorMonitor()
+        _sensor_monitor.start()
+    return _sensor_monitor.readings()
+
 def get_temperature_info():
     temperature = psutil.sensors_temperatures()
     return {
@@ -0,0 +1,184 @@
+"""
+Process termination off the UI thread.
+
+ProcessTerminator.submit() hands a batch of PIDs to a background thread and
+returns at once. The thread optionally expands every PID to its whole
+process tree, sends SIGTERM to all of them, waits for the lot with a single
+psutil.wait_procs() call, then sends SIGKILL to whatever outlived the grace
+period. Finished jobs are queued as KillReport objects for the caller to
+collect with completed(), so a Tk loop can poll for them like it polls the
+sampler.
+"""
+
+import itertools
+import os
+import threading
+from collections import deque, namedtuple
+
+import psutil
+
+# outcome is one of terminated, killed, gone (exited before we got to it),
+# access_denied, survived (still alive even after SIGKILL) or error
+KillResult = namedtuple("KillResult", ["pid", "name", "outcome", "error"])
+
+# One finished submit(): the requested PIDs and a KillResult per signalled process
+KillReport = namedtuple("KillReport", ["job", "pids", "tree", "results"])
+
+DEFAULT_GRACE = 3.0
+
+# How long to wait for processes to disappear after SIGKILL
+KILL_TIMEOUT = 1.0
+
+
+def _name(process):
+    try:
+        return process.name()
+    except psutil.Error:
+        return ""
+
+
+def _wait(processes, timeout):
+    """psutil.wait_procs(), counting zombies as exited.
+
+    A zombie has already died; it lingers only until its parent (or an
+    init that does not reap promptly, as in some containers) collects it.
+    """
+    gone, alive = psutil.wait_procs(processes, timeout=timeout)
+    still_alive = []
+    for process in alive:
+        try:
+            zombie = process.status() == psutil.STATUS_ZOMBIE
+        except psutil.NoSuchProcess:
+            zombie = True
+        except psutil.AccessDenied:
+            zombie = False
+        (gone if zombie else still_alive).append(process)
+    return gone, still_alive
+
+
+def collect_targets(pids, tree=False, exclude=()):
+    """psutil.Process objects for `pids`, plus all their descendants when `tree` is set.
+
+    Descendants are listed before their ancestors and each process appears
+    once. PIDs in `exclude` (and the calling process) are never included.
+    Returns (processes, results) where results are KillResults for PIDs
+    that could not be looked up.
+    """
+    exclude = set(exclude) | {os.getpid()}
+    processes = {}
+    results = []
+    for pid in pids:
+        try:
+            process = psutil.Process(pid)
+            # Gather the children first: once the parent dies they are reparented
+            children = process.children(recursive=True) if tree else []
+        except psutil.NoSuchProcess:
+            results.append(KillResult(pid, "", "gone", None))
+            continue
+        except psutil.AccessDenied as e:
+            results.append(KillResult(pid, "", "access_denied", str(e)))
+            continue
+        for target in reversed(children):
+            processes.setdefault(target.pid, target)
+        processes.setdefault(pid, process)
+    return [process for pid, process in processes.items() if pid not in exclude], results
+
+
+def terminate(processes, grace=DEFAULT_GRACE):
+    """SIGTERM every process, SIGKILL the ones still alive after `grace` seconds.
+
+    All processes are signalled before any waiting, so a batch takes at most
+    grace + KILL_TIMEOUT seconds however large it is. Returns a KillResult
+    per process.
+    """
+    names = {process.pid: _name(process) for process in processes}
+    results = []
+    signalled = []
+    for process in processes:
+        try:
+            process.terminate()
+            signalled.append(process)
+        except psutil.NoSuchProcess:
+            results.append(KillResult(process.pid, names[process.pid], "gone", None))
+        except psutil.AccessDenied as e:
+            results.append(KillResult(process.pid, names[process.pid], "access_denied", str(e)))
+
+    gone, alive = _wait(signalled, grace)
+    results.extend(KillResult(process.pid, names[process.pid], "terminated", None) for process in gone)
+
+    killed = []
+    for process in alive:
+        try:
+            process.kill()
+            killed.append(process)
+        except psutil.NoSuchProcess:
+            results.append(KillResult(process.pid, names[process.pid], "terminated", None))
+        except psutil.AccessDenied as e:
+            results.append(KillResult(process.pid, names[process.pid], "survived", str(e)))
+    gone, alive = _wait(killed, KILL_TIMEOUT)
+    results.extend(KillResult(process.pid, names[process.pid], "killed", None) for process in gone)
+    results.extend(KillResult(process.pid, names[process.pid], "survived", None) for process in alive)
+    return results
+
+
+class ProcessTerminator:
+    """Runs kill jobs on background threads; see the module docstring.
+
+    Every job gets its own daemon thread, so a slow job (a process that
+    ignores SIGTERM) never delays the next one.
+    """
+
+    def __init__(self, grace=DEFAULT_GRACE):
+        self.grace = grace
+        self._lock = threading.Lock()
+        self._jobs = itertools.count(1)
+        self._running = set()
+        self._completed = deque()
+
+    def submit(self, pids, tree=False):
+        """Start terminating `pids` (and their descendants if `tree`); returns the job number"""
+        pids = list(pids)
+        job = next(self._jobs)
+        with self._lock:
+            self._running.add(job)
+        threading.Thread(target=self._run, args=(job, pids, tree), name=f"terminator-{job}", daemon=True).start()
+        return job
+
+    def pending(self):
+        """Number of jobs still running"""
+        with self._lock:
+            return len(self._running)
+
+    def completed(self):
+        """Return and forget the KillReports of jobs finished since the last call"""
+        with self._lock:
+            reports = list(self._completed)
+            self._completed.clear()
+        return reports
+
+    def _run(self, job, pids, tree):
+        try:
+            processes, results = collect_targets(pids, tree=tree)
+            results += terminate(processes, self.grace)
+        except Exception as e:
+            results = [KillResult(pid, "", "error", str(e)) for pid in pids]
+        with self._lock:
+            self._running.discard(job)
+            self._completed.append(KillReport(job, pids, tree, results))
+
+
+def summarize(report):
+    """Count of each outcome in a KillReport, one per line, for showing to the user"""
+    counts = {}
+    for result in report.results:
+        counts[result.outcome] = counts.get(result.outcome, 0) + 1
+    descriptions = {
+        "terminated": "terminated",
+        "killed": "killed (SIGKILL after the grace period)",
+        "gone": "already exited",
+        "access_denied": "access denied",
+        "survived": "still running after SIGKILL",
+        "error": "failed",
+    }
+    return "\n".join(f"{counts[outcome]} {description}" for outcome, description in descriptions.items()
+                     if outcome in counts)
@@ -0,0 +1,241 @@
+import threading
+
+import numpy as np
+
+
+class RingBuffer:
+    """Fixed-capacity time series of float rows backed by preallocated NumPy arrays.
+
+    Every row is written twice, at i and i + capacity, so the most recent N
+    rows (N <= capacity) always form one contiguous slice. view() therefore
+    returns NumPy views into the buffer rather than copies; callers must not
+    hold on to them across appends if they need a stable snapshot.
+    """
+
+    def __init__(self, capacity, columns):
+        self.capacity = capacity
+        self.columns = columns
+        self._timestamps = np.zeros(capacity * 2, dtype=np.float64)
+        self._values = np.zeros((capacity * 2, columns), dtype=np.float64)
+        self._next = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, timestamp, values):
+        index = self._next
+        self._timestamps[index] = self._timestamps[index + self.capacity] = timestamp
+        self._values[index] = self._values[index + self.capacity] = values
+        self._next = (index + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def extend(self, timestamps, values):
+        """Append many rows at once; only the newest `capacity` rows are kept"""
+        timestamps = np.asarray(timestamps, dtype=np.float64)[-self.capacity:]
+        values = np.asarray(values, dtype=np.float64)[-self.capacity:]
+        count = len(timestamps)
+        if count == 0:
+            return
+        positions = (self._next + np.arange(count)) % self.capacity
+        self._timestamps[positions] = self._timestamps[positions + self.capacity] = timestamps
+        self._values[positions] = self._values[positions + self.capacity] = values
+        self._next = (self._next + count) % self.capacity
+        self._count = min(self._count + count, self.capacity)
+
+    def view(self, count=None):
+        """Return (timestamps, values) views of the last `count` rows, oldest first"""
+        count = self._count if count is None else min(count, self._count)
+        end = self._next + self.capacity if self._count == self.capacity else self._next
+        start = end - count
+        return self._timestamps[start:end], self._values[start:end]
+
+    def since(self, start_timestamp):
+        """Return views of every row with timestamp >= start_timestamp"""
+        timestamps, values = self.view()
+        first = np.searchsorted(timestamps, start_timestamp, side='left')
+        return timestamps[first:], values[first:]
+
+    def last_timestamp(self):
+        if self._count == 0:
+            return None
+        return self._timestamps[(self._next - 1) % self.capacity]
+
+
+def _bucket_rows(minimum, total, counts, maximum):
+    """[min..., avg..., max...] from per-bucket aggregates; NaN for metrics with no readings"""
+    empty = counts == 0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rows = np.concatenate((minimum, total / counts, maximum), axis=-1)
+    rows[np.concatenate((empty, empty, empty), axis=-1)] = np.nan
+    return rows
+
+
+class _Tier:
+    """One downsampled resolution: min/avg/max of each metric per bucket.
+
+    Missing readings (NaN) are left out of a bucket's aggregates rather than
+    poisoning them, so a sensor that drops out for a sample still charts.
+    """
+
+    def __init__(self, bucket_seconds, retention_seconds, metric_count):
+        self.bucket_seconds = bucket_seconds
+        self.retention_seconds = retention_seconds
+        self.metric_count = metric_count
+        # Columns are laid out [min..., avg..., max...] for the metrics in order
+        self.buffer = RingBuffer(max(1, int(retention_seconds // bucket_seconds)), metric_count * 3)
+        self._bucket = None
+        self._min = np.full(metric_count, np.inf)
+        self._max = np.full(metric_count, -np.inf)
+        self._sum = np.zeros(metric_count)
+        self._counts = np.zeros(metric_count, dtype=np.int64)
+        self._samples = 0
+
+    def add(self, timestamp, values):
+        bucket = int(timestamp // self.bucket_seconds)
+        if self._bucket is not None and bucket != self._bucket:
+            self.flush()
+        self._bucket = bucket
+        valid = ~np.isnan(values)
+        np.fmin(self._min, values, out=self._min)
+        np.fmax(self._max, values, out=self._max)
+        np.add(self._sum, values, out=self._sum, where=valid)
+        self._counts += valid
+        self._samples += 1
+
+    def extend(self, timestamps, values):
+        """Bucket many rows at once; the newest bucket stays open for add()"""
+        if len(timestamps) == 0:
+            return
+        buckets = (timestamps // self.bucket_seconds).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+
+        # The first bucket may continue the one currently being accumulated
+        if self._bucket is not None and buckets[0] != self._bucket:
+            self.flush()
+
+        closed = starts[:-1]
+        if len(closed):
+            # Every bucket but the last is complete and can be written straight away
+            head = values[:starts[-1]]
+            valid = ~np.isnan(head)
+            counts = np.add.reduceat(valid.astype(np.int64), closed)
+            minimum = np.fmin.reduceat(head, closed)
+            maximum = np.fmax.reduceat(head, closed)
+            total = np.add.reduceat(np.where(valid, head, 0.0), closed)
+            if self._samples:
+                minimum[0] = np.fmin(minimum[0], self._min)
+                maximum[0] = np.fmax(maximum[0], self._max)
+                total[0] += self._sum
+                counts[0] += self._counts
+                self._reset()
+            rows = _bucket_rows(minimum, total, counts, maximum)
+            self.buffer.extend((buckets[closed] + 1) * self.bucket_seconds, rows)
+
+        for timestamp, row in zip(timestamps[starts[-1]:], values[starts[-1]:]):
+            self.add(timestamp, row)
+
+    def _reset(self):
+        self._min.fill(np.inf)
+        self._max.fill(-np.inf)
+        self._sum.fill(0)
+        self._counts.fill(0)
+        self._samples = 0
+
+    def flush(self):
+        if self._samples == 0:
+            return
+        row = _bucket_rows(self._min, self._sum, self._counts, self._max)
+        # Buckets are stamped with their end time so they line up with raw samples
+        self.buffer.append((self._bucket + 1) * self.bucket_seconds, row)
+        self._reset()
+
+
+class MetricsStore:
+    """Chart history for a fixed set of metrics with configurable retention.
+
+    Raw samples are kept for `retention` seconds at `resolution` seconds per
+    sample. Each entry in `tiers` is (bucket_seconds, retention_seconds) and
+    keeps min/avg/max per bucket, so an hour or a day can be charted from a
+    few hundred rows instead of every raw sample.
+    """
+
+    DEFAULT_TIERS = ((10, 24 * 3600), (60, 7 * 24 * 3600))
+
+    def __init__(self, metrics, retention=3600, resolution=1.0, tiers=DEFAULT_TIERS):
+        self.metrics = list(metrics)
+        self.retention = retention
+        self.resolution = resolution
+        self._index = {metric: column for column, metric in enumerate(self.metrics)}
+        self._lock = threading.Lock()
+        self._raw = RingBuffer(max(1, int(retention // resolution)), len(self.metrics))
+        self._tiers = [_Tier(bucket, tier_retention, len(self.metrics)) for bucket, tier_retention in tiers]
+
+    def __len__(self):
+        return len(self._raw)
+
+    def append(self, timestamp, values):
+        """Add one sample; values is a dict keyed by metric name or a sequence in metric order"""
+        if isinstance(values, dict):
+            row = np.array([values.get(metric, np.nan) for metric in self.metrics], dtype=np.float64)
+        else:
+            row = np.asarray(values, dtype=np.float64)
+        with self._lock:
+            self._raw.append(timestamp, row)
+            for tier in self._tiers:
+                tier.add(timestamp, row)
+
+    def extend(self, timestamps, columns):
+        """Bulk-load history, e.g. from the metrics log.
+
+        columns is a dict of {metric: array} aligned with timestamps; metrics
+        not present are stored as NaN. Rows must be in time order and newer
+        than anything already stored.
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        rows = np.full((len(timestamps), len(self.metrics)), np.nan)
+        for metric, column in self._index.items():
+            if metric in columns:
+                rows[:, column] = columns[metric]
+        with self._lock:
+            self._raw.extend(timestamps, rows)
+            for tier in self._tiers:
+                tier.extend(timestamps, rows)
+
+    def latest(self, count=None):
+        """Return (timestamps, values) views of the newest raw samples"""
+        with self._lock:
+            return self._raw.view(count)
+
+    def series(self, metric, seconds, max_points=None, stat='avg'):
+        """Return (timestamps, values) for one metric over the last `seconds`.
+
+        Uses raw samples when they cover the window and fit in max_points,
+        otherwise the finest tier that does. stat picks 'min', 'avg' or 'max'
+        from a tier and is ignored for raw samples.
+        """
+        column = self._index[metric]
+        with self._lock:
+            end = self._raw.last_timestamp()
+            if end is None:
+                return np.empty(0), np.empty(0)
+            start = end - seconds
+
+            raw_covers = seconds <= self.retention
+            if raw_covers and (max_points is None or seconds / self.resolution <= max_points):
+                timestamps, values = self._raw.since(start)
+                return timestamps, values[:, column]
+
+            offset = ('min', 'avg', 'max').index(stat) * len(self.metrics)
+            for tier in self._tiers:
+                fits = max_points is None or seconds / tier.bucket_seconds <= max_points
+                if seconds <= tier.retention_seconds and fits:
+                    timestamps, values = tier.buffer.since(start)
+                    return timestamps, values[:, offset + column]
+
+            # Nothing fits the point budget; fall back to the coarsest tier available
+            if self._tiers:
+                timestamps, values = self._tiers[-1].buffer.since(start)
+                return timestamps, values[:, offset + column]
+            timestamps, values = self._raw.since(start)
+            return timestamps, values[:, column]